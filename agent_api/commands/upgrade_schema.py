@@ -0,0 +1,52 @@
+"""Bring an existing agent_api database up to the current schema.
+
+Usage: ``python -m agent_api.commands.upgrade_schema``
+
+``infra/db/init.sql`` only runs when the Postgres volume is created, so databases
+initialized before the conversation memory and session lifecycle columns (and the
+``media_cache`` table) existed need this once. Every statement is idempotent; it is
+safe to run at any time.
+"""
+
+import asyncio
+
+from sqlalchemy import text
+
+from agent_api.core.database import engine
+from agent_api.core.logger import get_logger
+from agent_api.models.media_cache import MediaCacheEntry
+
+logger = get_logger(__name__)
+
+# Keep in sync with infra/db/init.sql
+UPGRADE_STATEMENTS = (
+    "ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS summary TEXT",
+    "ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS state JSONB NOT NULL DEFAULT '{}'::jsonb",
+    "ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS summarized_through INTEGER NOT NULL"
+    " DEFAULT 0",
+    "ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS last_activity_at TIMESTAMP WITHOUT TIME"
+    " ZONE NOT NULL DEFAULT now()",
+    "ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS completed_at TIMESTAMP WITHOUT TIME ZONE",
+    "CREATE INDEX IF NOT EXISTS ix_chat_sessions_last_activity_at"
+    " ON chat_sessions (last_activity_at)",
+    "CREATE INDEX IF NOT EXISTS ix_chat_sessions_completed_at ON chat_sessions (completed_at)",
+    "CREATE INDEX IF NOT EXISTS ix_chat_messages_session_id_created_at"
+    " ON chat_messages (session_id, created_at)",
+    "DROP INDEX IF EXISTS ix_chat_messages_session_id",
+)
+
+
+async def upgrade_schema() -> None:
+    async with engine.begin() as conn:
+        for statement in UPGRADE_STATEMENTS:
+            await conn.execute(text(statement))
+        await conn.run_sync(MediaCacheEntry.__table__.create, checkfirst=True)
+
+
+def main() -> None:
+    asyncio.run(upgrade_schema())
+    logger.info(f"agent_api schema upgraded ({len(UPGRADE_STATEMENTS)} statements applied)")
+
+
+if __name__ == "__main__":
+    main()
@@ -57,6 +57,8 @@ def handle_llm_errors(func: Callable[..., Any]) -> Callable[..., Any]:
             raise LLMParsingError(f"Failed to parse LLM response: {str(e)}")
         except GoogleAPIError as e:
             raise LLMProviderError(f"Google Gemini Error: {str(e)}")
+        except (LLMProviderError, LLMParsingError):
+            raise
         except Exception as e:
             logger.error(f"Unexpected LLM error: {e}", exc_info=True)
             raise ServiceError(f"Unexpected LLM Error: {str(e)}")
@@ -74,7 +76,7 @@ def handle_service_errors(func: Callable[..., Any]) -> Callable[..., Any]:
         except SQLAlchemyError as e:
             raise DatabaseError(f"Database operation failed: {str(e)}")
         except Exception as e:
-            if isinstance(e, (DatabaseError, ServiceError, HTTPException)):
+            if isinstance(e, (DatabaseError, ServiceError, LLMProviderError, HTTPException)):
                 raise
             logger.error(f"Unexpected service error: {e}", exc_info=True)
             raise ServiceError(f"Unexpected error: {str(e)}")
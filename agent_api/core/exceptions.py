@@ -68,3 +68,15 @@ class InvalidAudioError(ServiceError):
     def __init__(self, message="Invalid or corrupted audio file"):
         self.message = message
         super().__init__(self.message)
+
+
+class OCRBusyError(ServiceError):
+    def __init__(self, message="OCR queue is full"):
+        self.message = message
+        super().__init__(self.message)
+
+
+class TranscriptionBusyError(ServiceError):
+    def __init__(self, message="Transcription queue is full"):
+        self.message = message
+        super().__init__(self.message)
@@ -71,3 +71,19 @@ async def invalid_audio_handler(request: Request, exc):
         status_code=400,
         content={"message": "Invalid Audio", "detail": str(exc)},
     )
+
+
+async def transcription_busy_handler(request: Request, exc):
+    return JSONResponse(
+        status_code=503,
+        content={"message": "Transcription Service Busy", "detail": str(exc)},
+        headers={"Retry-After": "5"},
+    )
+
+
+async def ocr_busy_handler(request: Request, exc):
+    return JSONResponse(
+        status_code=503,
+        content={"message": "OCR Service Busy", "detail": str(exc)},
+        headers={"Retry-After": "5"},
+    )
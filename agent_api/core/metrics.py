@@ -0,0 +1,68 @@
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+
+
+@dataclass
+class Timing:
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def observe(self, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+
+class Metrics:
+    """Process-wide counters and phase timings, exposed by ``GET /metrics``."""
+
+    def __init__(self):
+        self.counters: dict[str, int] = {}
+        self.gauges: dict[str, float] = {}
+        self.timings: dict[str, Timing] = {}
+
+    def incr(self, name: str, value: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        self.gauges[name] = value
+
+    def observe(self, name: str, elapsed_ms: float) -> None:
+        self.timings.setdefault(name, Timing()).observe(elapsed_ms)
+
+    @contextmanager
+    def timer(self, name: str, phases: dict[str, float] | None = None) -> Iterator[None]:
+        """Time a block into ``name``; also store the elapsed ms in ``phases`` if given."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.observe(name, elapsed_ms)
+            if phases is not None:
+                phases[name.rsplit(".", 1)[-1]] = round(elapsed_ms, 2)
+
+    def snapshot(self) -> dict:
+        return {
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+            "timings": {
+                name: {
+                    "count": timing.count,
+                    "avg_ms": round(timing.total_ms / timing.count, 2) if timing.count else 0.0,
+                    "max_ms": round(timing.max_ms, 2),
+                }
+                for name, timing in self.timings.items()
+            },
+        }
+
+    def reset(self) -> None:
+        self.counters.clear()
+        self.gauges.clear()
+        self.timings.clear()
+
+
+metrics = Metrics()
@@ -1,4 +1,7 @@
+import asyncio
 import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from agent_api.core.exceptions import (
@@ -11,6 +14,8 @@ from agent_api.core.exceptions import (
     InvalidImageError,
     AudioProcessingError,
     InvalidAudioError,
+    TranscriptionBusyError,
+    OCRBusyError,
 )
 from agent_api.core.handlers import (
     finance_unreachable_handler,
@@ -22,15 +27,42 @@ from agent_api.core.handlers import (
     invalid_image_handler,
     audio_processing_handler,
     invalid_audio_handler,
+    transcription_busy_handler,
+    ocr_busy_handler,
 )
 
+from agent_api.core.http_client import http_client_manager
 from agent_api.routers.chat import router as chat_router
+from agent_api.routers.metrics import router as metrics_router
 from agent_api.routers.ocr import router as ocr_router
 from agent_api.routers.audio import router as audio_router
+from agent_api.routers.reference_data import router as reference_data_router
+
+from agent_api.services.chat import chat_write_behind
+from agent_api.services.session_purge import session_purge_job
+from agent_api.services.audio import transcription_engine
+from agent_api.services.ocr import ocr_pool
+from agent_api.services.llm import llm_registry
+from agent_api.settings import settings
 
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI(title="Flauzino Assistant Agent API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    llm_registry.warm_up()
+    if settings.WHISPER_PRELOAD:
+        await asyncio.to_thread(transcription_engine.preload)
+    session_purge_job.start()
+    yield
+    await session_purge_job.stop()
+    transcription_engine.shutdown()
+    ocr_pool.shutdown()
+    await chat_write_behind.drain()
+    await http_client_manager.stop()
+
+
+app = FastAPI(title="Flauzino Assistant Agent API", lifespan=lifespan)
 
 allowed_origins = os.getenv(
     "ALLOWED_ORIGINS",
@@ -54,7 +86,11 @@ app.add_exception_handler(OCRProcessingError, ocr_processing_handler)
 app.add_exception_handler(InvalidImageError, invalid_image_handler)
 app.add_exception_handler(AudioProcessingError, audio_processing_handler)
 app.add_exception_handler(InvalidAudioError, invalid_audio_handler)
+app.add_exception_handler(TranscriptionBusyError, transcription_busy_handler)
+app.add_exception_handler(OCRBusyError, ocr_busy_handler)
 
 app.include_router(chat_router)
 app.include_router(ocr_router)
 app.include_router(audio_router)
+app.include_router(reference_data_router)
+app.include_router(metrics_router)
@@ -1,18 +1,33 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import ForeignKey, String, Text, DateTime
+from sqlalchemy import ForeignKey, Index, Integer, String, Text, DateTime
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 
 from agent_api.core.database import Base
 
 
 class ChatSession(Base):
     __tablename__ = "chat_sessions"
+    __table_args__ = (
+        Index("ix_chat_sessions_last_activity_at", "last_activity_at"),
+        Index("ix_chat_sessions_completed_at", "completed_at"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    # Conversation memory: running summary of older turns, extracted slots and the
+    # id of the last message already folded into the summary
+    summary: Mapped[str | None] = mapped_column(Text, nullable=True)
+    state: Mapped[dict] = mapped_column(JSONB, default=dict, nullable=False)
+    summarized_through: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Lifecycle: sessions expire after a period without turns and are closed once a flow
+    # completes; both are deleted later by the purge job
+    last_activity_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
     messages: Mapped[list["ChatMessage"]] = relationship(
         "ChatMessage", back_populates="session", cascade="all, delete-orphan"
@@ -21,9 +36,12 @@ class ChatSession(Base):
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __table_args__ = (Index("ix_chat_messages_session_id_created_at", "session_id", "created_at"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    session_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("chat_sessions.id"), nullable=False)
+    session_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("chat_sessions.id", ondelete="CASCADE"), nullable=False
+    )
     role: Mapped[str] = mapped_column(String(50), nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
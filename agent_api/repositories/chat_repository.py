@@ -1,10 +1,9 @@
 import uuid
+from datetime import datetime
 from typing import List
 
-from sqlalchemy import select
+from sqlalchemy import delete, insert, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-
 from agent_api.models.chat import ChatMessage, ChatSession
 from agent_api.core.logger import get_logger
 
@@ -24,11 +23,8 @@ class ChatRepository:
         return chat_session
 
     async def get_session(self, session_id: uuid.UUID) -> ChatSession | None:
-        query = (
-            select(ChatSession)
-            .where(ChatSession.id == session_id)
-            .options(selectinload(ChatSession.messages))
-        )
+        """Session header (summary and state) only; messages are read with ``get_messages``."""
+        query = select(ChatSession).where(ChatSession.id == session_id)
         result = await self.session.execute(query)
         session = result.scalar_one_or_none()
         if session:
@@ -54,3 +50,68 @@ class ChatRepository:
         messages = result.scalars().all()
         logger.info(f"Retrieved {len(messages)} messages for session {session_id}")
         return messages
+
+    async def save_turn(
+        self,
+        session_id: uuid.UUID,
+        messages: List[dict],
+        memory: dict | None = None,
+        create_session: bool = False,
+        completed: bool = False,
+    ) -> List[ChatMessage]:
+        """Persist one chat turn in a single transaction (one commit, no refreshes).
+
+        ``messages`` are ``role``/``content``/``created_at`` rows inserted with one
+        multi-row ``INSERT ... RETURNING``, so ids come back without extra round trips.
+        ``memory`` holds the session's ``summary``/``state``/``summarized_through`` when
+        they changed; with ``create_session`` the session row is inserted along with them.
+        The session's ``last_activity_at`` is bumped and, with ``completed``, the session
+        is closed.
+        """
+        now = datetime.utcnow()
+        values = {"last_activity_at": now, **(memory or {})}
+        if completed:
+            values["completed_at"] = now
+
+        if create_session:
+            await self.session.execute(insert(ChatSession).values(id=session_id, **values))
+        else:
+            await self.session.execute(
+                update(ChatSession).where(ChatSession.id == session_id).values(**values)
+            )
+
+        stmt = insert(ChatMessage).returning(ChatMessage, sort_by_parameter_order=True)
+        result = await self.session.scalars(
+            stmt, [{"session_id": session_id, **message} for message in messages]
+        )
+        saved = list(result.all())
+        await self.session.commit()
+        logger.info(f"Saved {len(saved)} messages to session {session_id}")
+        return saved
+
+    async def purge_sessions(
+        self, idle_before: datetime, completed_before: datetime, batch_size: int
+    ) -> int:
+        """Delete up to ``batch_size`` expired sessions; their messages go by cascade.
+
+        A session is expired when it has been idle since before ``idle_before`` or was
+        completed before ``completed_before``. Rows locked by an in-flight turn are skipped.
+        """
+        expired = (
+            select(ChatSession.id)
+            .where(
+                or_(
+                    ChatSession.last_activity_at < idle_before,
+                    ChatSession.completed_at < completed_before,
+                )
+            )
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.session.execute(
+            delete(ChatSession).where(ChatSession.id.in_(expired.scalar_subquery()))
+        )
+        await self.session.commit()
+        if result.rowcount:
+            logger.info(f"Purged {result.rowcount} expired chat sessions")
+        return result.rowcount
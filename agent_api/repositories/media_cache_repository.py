@@ -0,0 +1,42 @@
+from datetime import datetime
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from agent_api.core.logger import get_logger
+from agent_api.models.media_cache import MediaCacheEntry
+
+logger = get_logger(__name__)
+
+
+class MediaCacheRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get(self, key: str) -> dict | None:
+        query = select(MediaCacheEntry.value).where(
+            MediaCacheEntry.key == key, MediaCacheEntry.expires_at > datetime.utcnow()
+        )
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def put(self, keys: list[str], kind: str, value: dict, expires_at: datetime) -> None:
+        stmt = insert(MediaCacheEntry).values(
+            [{"key": key, "kind": kind, "value": value, "expires_at": expires_at} for key in keys]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[MediaCacheEntry.key],
+            set_={"value": stmt.excluded.value, "expires_at": stmt.excluded.expires_at},
+        )
+        await self.session.execute(stmt)
+        await self.session.commit()
+
+    async def purge_expired(self) -> int:
+        result = await self.session.execute(
+            delete(MediaCacheEntry).where(MediaCacheEntry.expires_at <= datetime.utcnow())
+        )
+        await self.session.commit()
+        if result.rowcount:
+            logger.info(f"Purged {result.rowcount} expired media cache entries")
+        return result.rowcount
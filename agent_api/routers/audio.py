@@ -1,11 +1,15 @@
 """Audio Router for processing voice messages and audio files."""
 
+import json
+from typing import AsyncIterator, Optional
+
 import httpx
-from fastapi import APIRouter, File, UploadFile, Form, Depends
+from fastapi import APIRouter, File, UploadFile, Form, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
 
 from agent_api.core.database import get_db
+from agent_api.core.exceptions import LLMProviderError, ServiceError
 from agent_api.core.http_client import get_http_client
 from agent_api.core.logger import get_logger
 from agent_api.services.audio import audio_service, AudioService
@@ -17,11 +21,44 @@ logger = get_logger(__name__)
 router = APIRouter(prefix="/audio", tags=["Audio"])
 
 
+def _ndjson(event: dict) -> str:
+    return json.dumps(event, ensure_ascii=False) + "\n"
+
+
+async def _stream_audio_events(
+    first: Optional[str],
+    partials: AsyncIterator[str],
+    chat_service: ChatService,
+    session_id: Optional[str],
+    platform: Optional[str],
+) -> AsyncIterator[str]:
+    parts = []
+    try:
+        if first is not None:
+            parts.append(first)
+            yield _ndjson({"type": "partial", "index": 0, "text": first})
+        async for text in partials:
+            parts.append(text)
+            yield _ndjson({"type": "partial", "index": len(parts) - 1, "text": text})
+
+        response = await chat_service.process_message(" ".join(parts), session_id, platform)
+        yield _ndjson({"type": "result", **response.model_dump(mode="json")})
+    except (ServiceError, LLMProviderError) as e:
+        # Headers are already sent, so errors after the first chunk become an event
+        logger.error(f"Audio stream failed after {len(parts)} chunks: {e}")
+        yield _ndjson({"type": "error", "detail": e.message})
+    except HTTPException as e:
+        # e.g. the session expired while transcribing; the status lets the client recover
+        logger.warning(f"Audio stream rejected after {len(parts)} chunks: {e.detail}")
+        yield _ndjson({"type": "error", "status": e.status_code, "detail": e.detail})
+
+
 @router.post("/process-audio", response_model=ChatResponse)
 async def process_audio_file(
     file: UploadFile = File(..., description="Audio file"),
     session_id: Optional[str] = Form(None, description="Chat session ID for context"),
     platform: Optional[str] = Form(None, description="Platform originating the request"),
+    stream: bool = Form(False, description="Stream partial transcriptions as NDJSON"),
     client: httpx.AsyncClient = Depends(get_http_client),
     db: AsyncSession = Depends(get_db),
 ):
@@ -33,6 +70,10 @@ async def process_audio_file(
     2. Creates or continues a chat session
     3. Processes the transcribed text through the chat service
     4. Returns the assistant's response and session ID
+
+    With ``stream=true`` the response is NDJSON: one ``partial`` event per transcribed
+    chunk (long audio is split on silence and decoded in parallel), then a ``result`` event
+    with the chat response, or an ``error`` event if something fails midway.
     """
     logger.info(
         f"Received audio processing request: {file.filename}, session: {session_id}, content_type: {file.content_type}"
@@ -44,6 +85,20 @@ async def process_audio_file(
 
     mime_type = file.content_type or "audio/ogg"
 
+    if stream:
+        chat_service = ChatService(db, client)
+        if session_id:
+            # An expired session must fail with 404 before transcribing and streaming
+            await chat_service.get_open_session(session_id)
+        partials = audio_service.transcribe_audio_stream(audio_bytes, mime_type)
+        # Pull the first chunk before committing to a 200 so decode/busy errors keep
+        # their status codes
+        first = await anext(partials, None)
+        return StreamingResponse(
+            _stream_audio_events(first, partials, chat_service, session_id, platform),
+            media_type="application/x-ndjson",
+        )
+
     transcribed_text = await audio_service.transcribe_audio(audio_bytes, mime_type)
 
     logger.info(f"Audio transcription successful. Extracted {len(transcribed_text)} characters.")
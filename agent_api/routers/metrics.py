@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+
+from agent_api.core.metrics import metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def get_metrics() -> dict:
+    """Counters and per-phase timings (LLM, transcription, OCR) since the process started."""
+    return metrics.snapshot()
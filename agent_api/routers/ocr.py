@@ -8,9 +8,11 @@ from typing import Optional
 from agent_api.core.database import get_db
 from agent_api.core.http_client import get_http_client
 from agent_api.core.logger import get_logger
+from agent_api.services.nfce import format_nfce_summary
 from agent_api.services.ocr import ocr_service, OCRService
 from agent_api.services.chat import ChatService
 from agent_api.schemas.dtos import ChatResponse
+from agent_api.settings import settings
 
 logger = get_logger(__name__)
 
@@ -62,6 +64,10 @@ async def process_receipt_image(
 
     You can then continue the conversation using the /chat endpoint
     with the returned session_id to provide missing information.
+
+    NFC-e coupons are read from their QR code first. When the code carries the total
+    (offline emission), OCR is skipped and only the structured fields go to the chat;
+    otherwise they are sent along with the OCR text.
     """
     logger.info(f"Received receipt processing request: {file.filename}, session: {session_id}")
 
@@ -69,19 +75,27 @@ async def process_receipt_image(
     image_bytes = await file.read()
     OCRService.validate_image_file(file.filename, len(image_bytes))
 
-    extracted_text, confidence = await ocr_service.extract_text(image_bytes)
-
-    logger.info(
-        f"OCR successful. Extracted {len(extracted_text)} characters "
-        f"with {confidence:.2f}% confidence"
-    )
-
-    # Process through chat service
-    message = (
-        f"Aqui está o texto extraído de um recibo/nota fiscal:\n\n"
-        f"{extracted_text}\n\n"
-        f"Por favor, extraia as informações de gastos."
-    )
+    receipt = await ocr_service.read_qr_code(image_bytes) if settings.OCR_QR_FAST_PATH else None
+
+    if receipt is not None and receipt.total is not None:
+        logger.info("Using NFC-e QR code fields, skipping OCR")
+        message = f"{format_nfce_summary(receipt)}\n\nPor favor, extraia as informações de gastos."
+    else:
+        extracted_text, confidence = await ocr_service.extract_text(image_bytes)
+
+        logger.info(
+            f"OCR successful. Extracted {len(extracted_text)} characters "
+            f"with {confidence:.2f}% confidence"
+        )
+
+        # Process through chat service
+        message = (
+            f"Aqui está o texto extraído de um recibo/nota fiscal:\n\n"
+            f"{extracted_text}\n\n"
+            f"Por favor, extraia as informações de gastos."
+        )
+        if receipt is not None:
+            message = f"{format_nfce_summary(receipt)}\n\n{message}"
 
     # Use ChatService to handle session and LLM processing
     chat_service = ChatService(db, client)
@@ -0,0 +1,12 @@
+from fastapi import APIRouter, status
+
+from agent_api.services.reference_data import reference_data_cache
+
+router = APIRouter()
+
+
+@router.post("/reference-data/invalidate", status_code=status.HTTP_202_ACCEPTED)
+async def invalidate_reference_data() -> dict:
+    """Called by finance_api after category or payment-method writes."""
+    reference_data_cache.invalidate()
+    return {"status": "accepted"}
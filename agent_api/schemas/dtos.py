@@ -1,3 +1,4 @@
+from datetime import date
 from typing import List
 
 from pydantic import BaseModel
@@ -19,3 +20,19 @@ class ChatResponse(BaseModel):
     session_id: str
     history: List[ChatMessage]
     is_complete: bool = False
+
+
+class NFCeReceipt(BaseModel):
+    """Fields read from the QR code of an NFC-e (consumer fiscal receipt)."""
+
+    access_key: str
+    state_code: str
+    issue_year_month: str
+    issuer_cnpj: str
+    model: str
+    series: str
+    number: str
+    emission_type: str
+    issue_date: date | None = None
+    total: float | None = None
+    url: str
@@ -1,11 +1,389 @@
-import tempfile
-import os
+import asyncio
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+import av
+import numpy as np
 from faster_whisper import WhisperModel
+from faster_whisper.vad import VadOptions, get_speech_timestamps
 
+from agent_api.core.exceptions import (
+    AudioProcessingError,
+    InvalidAudioError,
+    TranscriptionBusyError,
+)
 from agent_api.core.logger import get_logger
+from agent_api.core.metrics import metrics
+from agent_api.services.result_cache import result_cache
+from agent_api.settings import settings
 
 logger = get_logger(__name__)
 
+SAMPLE_RATE = 16000
+
+# Container hints for the mime types telegram and the web recorder send
+_CONTAINER_FORMATS = {
+    "audio/ogg": "ogg",
+    "audio/opus": "ogg",
+    "audio/oga": "ogg",
+    "audio/mpeg": "mp3",
+    "audio/mp3": "mp3",
+    "audio/mp4": "mp4",
+    "audio/m4a": "mp4",
+    "audio/x-m4a": "mp4",
+    "audio/aac": "aac",
+    "audio/wav": "wav",
+    "audio/x-wav": "wav",
+    "audio/wave": "wav",
+    "audio/webm": "webm",
+    "audio/flac": "flac",
+}
+
+
+def _container_format(mime_type: str | None) -> str | None:
+    return _CONTAINER_FORMATS.get((mime_type or "").split(";")[0].strip().lower())
+
+
+def _decode_container(audio_bytes: bytes, container_format: str | None) -> list[np.ndarray]:
+    chunks = []
+    with av.open(io.BytesIO(audio_bytes), format=container_format) as container:
+        resampler = av.AudioResampler(format="fltp", layout="mono", rate=SAMPLE_RATE)
+        for frame in container.decode(audio=0):
+            for resampled in resampler.resample(frame):
+                chunks.append(resampled.to_ndarray()[0])
+        for resampled in resampler.resample(None):
+            chunks.append(resampled.to_ndarray()[0])
+    return chunks
+
+
+def decode_audio_bytes(audio_bytes: bytes, mime_type: str | None = None) -> np.ndarray:
+    """Decode an uploaded audio file into a 16 kHz mono float32 array, entirely in memory.
+
+    Downmixing and resampling are done by libswresample on whole frames while decoding,
+    producing float samples directly (no int16 round trip and nothing written to disk).
+    The mime type is only a hint: if it is wrong the container format is probed instead.
+    """
+    container_format = _container_format(mime_type)
+    try:
+        try:
+            chunks = _decode_container(audio_bytes, container_format)
+        except av.error.FFmpegError:
+            if container_format is None:
+                raise
+            logger.debug(f"Could not decode audio as {container_format}, probing the format")
+            chunks = _decode_container(audio_bytes, None)
+    except (av.error.FFmpegError, IndexError, ValueError) as e:
+        raise InvalidAudioError(f"Não foi possível decodificar o áudio: {e}")
+
+    if not chunks:
+        raise InvalidAudioError("O áudio não contém amostras")
+    return np.concatenate(chunks).astype(np.float32, copy=False)
+
+
+def split_on_speech(samples: np.ndarray, max_chunk_seconds: float) -> list[tuple[int, int]]:
+    """Split audio into ``(start, end)`` sample ranges of at most ``max_chunk_seconds``.
+
+    Silero VAD finds the speech regions; neighbouring regions are packed together until a
+    chunk would exceed the limit, so cuts always fall on silence and leading/trailing
+    silence is dropped. Audio with no detected speech yields no chunks.
+    """
+    max_samples = int(max_chunk_seconds * SAMPLE_RATE)
+    speech = get_speech_timestamps(
+        samples,
+        VadOptions(max_speech_duration_s=max_chunk_seconds, min_silence_duration_ms=500),
+    )
+
+    chunks: list[tuple[int, int]] = []
+    for region in speech:
+        start, end = region["start"], region["end"]
+        if chunks and end - chunks[-1][0] <= max_samples:
+            chunks[-1] = (chunks[-1][0], end)
+        else:
+            chunks.append((start, end))
+    return chunks
+
+
+# Rough seconds of CPU per second of audio for int8 on a Raspberry Pi class board; the
+# policy refines these from observed decode times
+_DEFAULT_REAL_TIME_FACTORS = {
+    "tiny": 0.15,
+    "base": 0.3,
+    "small": 0.9,
+    "medium": 2.5,
+}
+
+
+@dataclass(frozen=True)
+class WhisperProfile:
+    size: str
+    compute_type: str = "int8"
+
+    @property
+    def name(self) -> str:
+        return f"{self.size}:{self.compute_type}"
+
+    @classmethod
+    def parse(cls, raw: str) -> "WhisperProfile":
+        size, _, compute_type = raw.strip().partition(":")
+        return cls(size, compute_type or "int8")
+
+
+@dataclass(frozen=True)
+class Transcript:
+    text: str
+    language: str
+    avg_logprob: float = 0.0
+    no_speech_prob: float = 0.0
+
+
+class ModelSelectionPolicy:
+    """Pick a Whisper model per clip from a ladder of profiles (smallest first).
+
+    The chosen profile is the largest one whose estimated latency (clip duration x the
+    profile's real time factor, scaled by the work queued ahead) fits ``target_latency``;
+    if none fits, the smallest one. Clips up to ``short_clip_seconds`` are decoded greedily.
+    A result with low ``avg_logprob`` or high ``no_speech_prob`` is redone one step up.
+    """
+
+    def __init__(
+        self,
+        profiles: list[WhisperProfile],
+        target_latency: float = 5.0,
+        short_clip_seconds: float = 10.0,
+        min_avg_logprob: float = -1.0,
+        max_no_speech_prob: float = 0.6,
+    ):
+        self.profiles = profiles
+        self.target_latency = target_latency
+        self.short_clip_seconds = short_clip_seconds
+        self.min_avg_logprob = min_avg_logprob
+        self.max_no_speech_prob = max_no_speech_prob
+        self._rtf = {profile: self._default_rtf(profile) for profile in profiles}
+
+    @staticmethod
+    def _default_rtf(profile: WhisperProfile) -> float:
+        rtf = _DEFAULT_REAL_TIME_FACTORS.get(profile.size.split(".")[0], 1.0)
+        return rtf if profile.compute_type.startswith("int8") else rtf * 2
+
+    def estimate_latency(
+        self, profile: WhisperProfile, duration: float, queue_depth: int, workers: int
+    ) -> float:
+        backlog = max(queue_depth - 1, 0) / max(workers, 1)
+        return duration * self._rtf[profile] * (1 + backlog)
+
+    def select(self, duration: float | None, queue_depth: int, workers: int) -> WhisperProfile:
+        if duration is None:
+            return self.profiles[-1]
+        for profile in reversed(self.profiles):
+            if (
+                self.estimate_latency(profile, duration, queue_depth, workers)
+                <= self.target_latency
+            ):
+                return profile
+        return self.profiles[0]
+
+    def beam_size(self, duration: float | None) -> int:
+        return 1 if duration is not None and duration <= self.short_clip_seconds else 5
+
+    def is_low_confidence(self, transcript: Transcript) -> bool:
+        return (
+            transcript.avg_logprob < self.min_avg_logprob
+            or transcript.no_speech_prob > self.max_no_speech_prob
+        )
+
+    def fallback(self, profile: WhisperProfile) -> WhisperProfile | None:
+        idx = self.profiles.index(profile)
+        return self.profiles[idx + 1] if idx + 1 < len(self.profiles) else None
+
+    def record(self, profile: WhisperProfile, duration: float, elapsed: float) -> None:
+        """Fold an observed decode time into the profile's real time factor (EWMA)."""
+        if duration > 0:
+            self._rtf[profile] = 0.8 * self._rtf[profile] + 0.2 * (elapsed / duration)
+
+
+class TranscriptionEngine:
+    """Owns the Whisper models and the threads that run decoding.
+
+    Models are loaded once (at startup with ``WHISPER_PRELOAD`` or on first use) and
+    shared by ``workers`` decoding threads, so the event loop never runs a decode. At most
+    ``workers + max_queue`` transcriptions are admitted at once; beyond that callers get
+    ``TranscriptionBusyError`` (HTTP 503) instead of waiting behind a long queue.
+
+    Audio longer than ``chunk_seconds`` is split on silence and its chunks are decoded in
+    parallel on the same threads; ``transcribe_stream`` yields their text in order as soon
+    as each one (and every chunk before it) is done. Each clip or chunk goes to the model
+    picked by ``policy`` (see ``ModelSelectionPolicy``).
+    """
+
+    def __init__(
+        self,
+        model_size: str = "base",
+        compute_type: str = "int8",
+        workers: int = 1,
+        max_queue: int = 4,
+        chunk_seconds: float = 30,
+        policy: ModelSelectionPolicy | None = None,
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.chunk_seconds = chunk_seconds
+        self.policy = policy or ModelSelectionPolicy([WhisperProfile(model_size, compute_type)])
+        self._models: dict[WhisperProfile, WhisperModel] = {}
+        self._load_lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._admitted = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Admitted transcriptions not yet finished (running + waiting)."""
+        return self._admitted
+
+    def load(self, profile: WhisperProfile | None = None) -> WhisperModel:
+        profile = profile or self.policy.profiles[-1]
+        if profile not in self._models:
+            with self._load_lock:
+                if profile not in self._models:
+                    start = time.perf_counter()
+                    # int8 on CPU: the assistant runs on a Raspberry Pi or similar boards
+                    self._models[profile] = WhisperModel(
+                        profile.size,
+                        device="cpu",
+                        compute_type=profile.compute_type,
+                        num_workers=self.workers,
+                    )
+                    load_ms = (time.perf_counter() - start) * 1000
+                    metrics.observe("audio.model_load", load_ms)
+                    logger.info(f"Whisper model '{profile.name}' loaded in {load_ms:.0f} ms")
+        return self._models[profile]
+
+    def preload(self) -> None:
+        for profile in self.policy.profiles:
+            self.load(profile)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="whisper"
+            )
+        return self._executor
+
+    def _run_model(
+        self, profile: WhisperProfile, audio, beam_size: int, vad_filter: bool
+    ) -> Transcript:
+        model = self.load(profile)
+        with metrics.timer("audio.decode"):
+            segments, info = model.transcribe(
+                audio, beam_size=beam_size, language="pt", vad_filter=vad_filter
+            )
+            segments = list(segments)
+        metrics.incr(f"audio.model.{profile.name}")
+        if not segments:
+            return Transcript("", info.language)
+        return Transcript(
+            text=" ".join(segment.text for segment in segments).strip(),
+            language=info.language,
+            avg_logprob=sum(segment.avg_logprob for segment in segments) / len(segments),
+            no_speech_prob=sum(segment.no_speech_prob for segment in segments) / len(segments),
+        )
+
+    def _decode(self, audio, vad_filter: bool = True) -> tuple[str, str]:
+        duration = len(audio) / SAMPLE_RATE if isinstance(audio, np.ndarray) else None
+        profile = self.policy.select(duration, self._admitted, self.workers)
+
+        # Load first so a cold model's load time is not recorded as decode speed
+        self.load(profile)
+        start = time.perf_counter()
+        transcript = self._run_model(profile, audio, self.policy.beam_size(duration), vad_filter)
+        if duration is not None:
+            self.policy.record(profile, duration, time.perf_counter() - start)
+
+        fallback = self.policy.fallback(profile)
+        if fallback is not None and transcript.text and self.policy.is_low_confidence(transcript):
+            logger.info(
+                f"Low confidence with '{profile.name}' (avg_logprob={transcript.avg_logprob:.2f}, "
+                f"no_speech_prob={transcript.no_speech_prob:.2f}), retrying with '{fallback.name}'"
+            )
+            metrics.incr("audio.fallbacks")
+            transcript = self._run_model(fallback, audio, 5, vad_filter)
+
+        return transcript.text, transcript.language
+
+    def _split(self, audio) -> list:
+        if not isinstance(audio, np.ndarray) or len(audio) <= self.chunk_seconds * SAMPLE_RATE:
+            return [audio]
+        with metrics.timer("audio.vad"):
+            bounds = split_on_speech(audio, self.chunk_seconds)
+        metrics.incr("audio.chunks", len(bounds))
+        logger.info(f"Split {len(audio) / SAMPLE_RATE:.1f}s of audio into {len(bounds)} chunks")
+        return [audio[start:end] for start, end in bounds]
+
+    async def transcribe_stream(self, audio) -> AsyncIterator[str]:
+        """Yield the transcription chunk by chunk, in order, while later chunks still decode."""
+        if self._admitted >= self.workers + self.max_queue:
+            metrics.incr("audio.rejected")
+            raise TranscriptionBusyError(
+                "Muitos áudios sendo transcritos no momento. Tente novamente em instantes."
+            )
+
+        self._admitted += 1
+        metrics.set_gauge("audio.queue_depth", self._admitted)
+        pending: list[asyncio.Future] = []
+        try:
+            loop = asyncio.get_running_loop()
+            chunks = await loop.run_in_executor(self._get_executor(), self._split, audio)
+            # Chunks were already trimmed by VAD; only a single whole clip still needs it
+            vad_filter = len(chunks) == 1 and chunks[0] is audio
+            pending = [
+                loop.run_in_executor(self._get_executor(), self._decode, chunk, vad_filter)
+                for chunk in chunks
+            ]
+            language = None
+            for future in pending:
+                text, language = await future
+                if text:
+                    yield text
+        finally:
+            for future in pending:
+                future.cancel()
+            self._admitted -= 1
+            metrics.set_gauge("audio.queue_depth", self._admitted)
+
+        metrics.incr("audio.transcriptions")
+        logger.info(f"Transcription successful. Detected language: {language}")
+
+    async def transcribe(self, audio) -> str:
+        return " ".join([text async for text in self.transcribe_stream(audio)])
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def _configured_profiles() -> list[WhisperProfile]:
+    ladder = [raw for raw in settings.WHISPER_MODELS.split(",") if raw.strip()]
+    if not ladder:
+        return [WhisperProfile(settings.WHISPER_MODEL, settings.WHISPER_COMPUTE_TYPE)]
+    return [WhisperProfile.parse(raw) for raw in ladder]
+
+
+transcription_engine = TranscriptionEngine(
+    workers=settings.WHISPER_WORKERS,
+    max_queue=settings.WHISPER_MAX_QUEUE,
+    chunk_seconds=settings.WHISPER_CHUNK_SECONDS,
+    policy=ModelSelectionPolicy(
+        _configured_profiles(),
+        target_latency=settings.WHISPER_TARGET_LATENCY_SECONDS,
+        short_clip_seconds=settings.WHISPER_SHORT_CLIP_SECONDS,
+        min_avg_logprob=settings.WHISPER_MIN_AVG_LOGPROB,
+        max_no_speech_prob=settings.WHISPER_MAX_NO_SPEECH_PROB,
+    ),
+)
+
 
 class AudioService:
     @staticmethod
@@ -20,42 +398,50 @@ class AudioService:
             )
 
     @staticmethod
-    async def transcribe_audio(audio_bytes: bytes, mime_type: str) -> str:
-        """Transcribe audio using faster-whisper locally."""
-        try:
-            logger.info(
-                f"Writing audio ({len(audio_bytes)} bytes) to temporary file for Whisper transcription."
-            )
-
-            # Write audio to a temporary file for faster-whisper to read
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".ogg") as tmp_file:
-                tmp_file.write(audio_bytes)
-                tmp_file_path = tmp_file.name
+    async def _decode_upload(audio_bytes: bytes, mime_type: str) -> np.ndarray:
+        logger.info(f"Decoding audio ({len(audio_bytes)} bytes, {mime_type}) in memory.")
+        with metrics.timer("audio.load"):
+            samples = await asyncio.to_thread(decode_audio_bytes, audio_bytes, mime_type)
+        logger.info(f"Transcribing {len(samples) / SAMPLE_RATE:.1f}s of audio...")
+        return samples
 
-            logger.info("Initializing Faster Whisper model...")
-            # Using int8 for CPU, assuming running on Raspberry Pi or similar light environments
-            model = WhisperModel("base", device="cpu", compute_type="int8")
-
-            logger.info("Transcribing audio...")
-            segments, info = model.transcribe(
-                tmp_file_path, beam_size=5, language="pt", vad_filter=True
-            )
-
-            # Combine all transcribed segments
-            transcribed_text = " ".join([segment.text for segment in segments]).strip()
-
-            logger.info(f"Transcription successful. Detected language: {info.language}")
+    @staticmethod
+    async def transcribe_audio_stream(audio_bytes: bytes, mime_type: str) -> AsyncIterator[str]:
+        """Transcribe audio using faster-whisper locally, yielding text as chunks finish.
 
-            # Clean up the temp file
-            os.remove(tmp_file_path)
+        Resent voice notes are answered from the result cache with their stored chunks.
+        """
+        kind = "transcript:" + ",".join(
+            profile.name for profile in transcription_engine.policy.profiles
+        )
+        keys, cached = await result_cache.lookup(kind, audio_bytes)
+        if cached is not None:
+            for text in cached["parts"]:
+                yield text
+            return
 
-            return transcribed_text
+        parts = []
+        try:
+            samples = await AudioService._decode_upload(audio_bytes, mime_type)
+            async for text in transcription_engine.transcribe_stream(samples):
+                parts.append(text)
+                yield text
 
+        except (TranscriptionBusyError, InvalidAudioError):
+            raise
         except Exception as e:
             logger.error(f"Error transcribing audio with Whisper: {e}", exc_info=True)
-            from agent_api.core.exceptions import AudioProcessingError
-
             raise AudioProcessingError(f"Falha ao transcrever o áudio: {str(e)}")
 
+        await result_cache.store(kind, keys, {"parts": parts})
+
+    @staticmethod
+    async def transcribe_audio(audio_bytes: bytes, mime_type: str) -> str:
+        """Transcribe audio using faster-whisper locally, without touching disk."""
+        parts = [
+            text async for text in AudioService.transcribe_audio_stream(audio_bytes, mime_type)
+        ]
+        return " ".join(parts)
+
 
 audio_service = AudioService()
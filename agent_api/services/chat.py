@@ -1,40 +1,101 @@
+import asyncio
 import uuid
+from datetime import datetime, timedelta
 import httpx
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 
 from typing import List, Dict, Any, Tuple
 
+from agent_api.core.database import AsyncSessionLocal
 from agent_api.core.decorators import handle_service_errors
+from agent_api.core.metrics import metrics
+from agent_api.models.chat import ChatMessage as StoredMessage, ChatSession
 from agent_api.repositories.chat_repository import ChatRepository
 from agent_api.schemas.assistant import AssistantResponse
 from agent_api.schemas.dtos import ChatMessage, ChatResponse
+from agent_api.services.conversation_memory import conversation_memory
+from agent_api.services.expense_parser import expense_fast_path
 from agent_api.services.finance import FinanceService
 from agent_api.services.llm import get_llm_response
+from agent_api.settings import settings
 from agent_api.core.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+class ChatWriteBehind:
+    """Background persistence of chat turns, for acknowledging before the commit.
+
+    Turns are written with their own database session after the response is sent.
+    Writes of the same chat session are chained in order, and ``flush`` lets the next
+    turn of that session wait for them before reading its history. A failed write is
+    logged and counted in ``chat.write_behind_errors``; the turn is lost, which is the
+    trade-off of this mode. ``drain`` waits for everything pending (on shutdown).
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self._session_factory = session_factory
+        self._pending: dict[uuid.UUID, asyncio.Task] = {}
+
+    def submit(self, session_id: uuid.UUID, turn: dict) -> None:
+        task = asyncio.create_task(self._write(self._pending.get(session_id), session_id, turn))
+        self._pending[session_id] = task
+        metrics.set_gauge("chat.write_behind_pending", len(self._pending))
+        task.add_done_callback(lambda done: self._forget(session_id, done))
+
+    def _forget(self, session_id: uuid.UUID, task: asyncio.Task) -> None:
+        if self._pending.get(session_id) is task:
+            del self._pending[session_id]
+        metrics.set_gauge("chat.write_behind_pending", len(self._pending))
+
+    async def _write(
+        self, previous: asyncio.Task | None, session_id: uuid.UUID, turn: dict
+    ) -> None:
+        if previous is not None:
+            await asyncio.wait([previous])
+        try:
+            async with self._session_factory() as db:
+                await ChatRepository(db).save_turn(session_id, **turn)
+        except Exception as e:
+            metrics.incr("chat.write_behind_errors")
+            logger.error(f"Write-behind of chat turn failed for session {session_id}: {e}")
+
+    async def flush(self, session_id: uuid.UUID) -> None:
+        task = self._pending.get(session_id)
+        if task is not None:
+            await asyncio.wait([task])
+
+    async def drain(self) -> None:
+        if self._pending:
+            await asyncio.wait(list(self._pending.values()))
+
+
+chat_write_behind = ChatWriteBehind()
+
+
 class ChatService:
     def __init__(self, db_session: AsyncSession, http_client: httpx.AsyncClient):
         self.repository = ChatRepository(db_session)
         self.http_client = http_client
+        self.memory = conversation_memory
+        self.write_behind = chat_write_behind if settings.CHAT_WRITE_BEHIND else None
+        self.fast_path = expense_fast_path if settings.CHAT_LOCAL_PARSER else None
 
     @handle_service_errors
     async def process_message(
         self, message: str, session_id_str: str | None, platform: str | None = None
     ) -> ChatResponse:
         logger.info(f"Processing message for session: {session_id_str}")
-        session_id = await self._get_or_create_session(session_id_str)
+        received_at = datetime.utcnow()
+        session, is_new = await self._get_or_create_session(session_id_str)
+        session_id = session.id
 
-        await self._save_message(session_id, "user", message)
+        history_dicts, messages, folded = await self._get_chat_history(session, message, is_new)
+        summary = self.memory.fold(session.summary, folded)
+        state = session.state or {}
 
-        history_dicts, messages = await self._get_chat_history(session_id)
-
-        response = await get_llm_response(history_dicts, platform)
-
-        await self._save_message(session_id, "assistant", response.response_message)
+        response, slots = await self._answer(message, history_dicts, platform, summary, state)
 
         await self._handle_finance_action(response)
 
@@ -45,35 +106,118 @@ class ChatService:
         # For now, let's use the flags from AssistantResponse.
         is_flow_complete = response.is_complete and response.is_confirmed
 
+        # The whole turn (new session, both messages, memory, completion) is written at
+        # once, after the finance action, so a failed registration leaves the session open
+        turn = {
+            "messages": [
+                {"role": "user", "content": message, "created_at": received_at},
+                {
+                    "role": "assistant",
+                    "content": response.response_message,
+                    "created_at": datetime.utcnow(),
+                },
+            ],
+            "memory": self._memory_changes(session, summary, state, response, folded, slots),
+            "create_session": is_new,
+            "completed": is_flow_complete,
+        }
+        if self.write_behind:
+            self.write_behind.submit(session_id, turn)
+        else:
+            await self.repository.save_turn(session_id, **turn)
+
         return self._build_response(
             session_id, response.response_message, messages, is_flow_complete
         )
 
-    async def _get_or_create_session(self, session_id_str: str | None) -> uuid.UUID:
+    @handle_service_errors
+    async def get_open_session(self, session_id_str: str) -> ChatSession:
+        """Return the session or raise 400/404 when it is malformed, unknown or closed.
+
+        Streaming routes call this before sending their headers, so an expired session
+        still answers with a 404 the client can recover from.
+        """
+        try:
+            session_id = uuid.UUID(session_id_str)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid session_id format")
+
+        if self.write_behind:
+            await self.write_behind.flush(session_id)
+        session = await self.repository.get_session(session_id)
+        if not session or self._is_expired(session):
+            raise HTTPException(status_code=404, detail="Session not found")
+        return session
+
+    async def _get_or_create_session(self, session_id_str: str | None) -> Tuple[ChatSession, bool]:
+        """Return the session and whether it is new (only inserted with the turn)."""
         if session_id_str:
-            try:
-                session_id = uuid.UUID(session_id_str)
-            except ValueError:
-                raise HTTPException(status_code=400, detail="Invalid session_id format")
-
-            session = await self.repository.get_session(session_id)
-            if not session:
-                raise HTTPException(status_code=404, detail="Session not found")
-            return session.id
+            return await self.get_open_session(session_id_str), False
         else:
-            session = await self.repository.create_session()
+            session = ChatSession(id=uuid.uuid4(), state={}, summarized_through=0)
             logger.info(f"Created new session: {session.id}")
-            return session.id
-
-    async def _save_message(self, session_id: uuid.UUID, role: str, content: str) -> None:
-        await self.repository.add_message(session_id, role, content)
+            return session, True
+
+    @staticmethod
+    def _is_expired(session: ChatSession) -> bool:
+        """Completed and idle sessions are closed, even before the purge job removes them."""
+        if session.completed_at is not None:
+            return True
+        idle_ttl = timedelta(seconds=settings.CHAT_SESSION_IDLE_TTL_SECONDS)
+        return (
+            session.last_activity_at is not None
+            and session.last_activity_at < datetime.utcnow() - idle_ttl
+        )
 
     async def _get_chat_history(
-        self, session_id: uuid.UUID
-    ) -> Tuple[List[Dict[str, Any]], List[ChatMessage]]:
-        messages = await self.repository.get_messages(session_id)
-        history_dicts = [{"role": m.role, "content": m.content} for m in reversed(messages)]
-        return history_dicts, messages
+        self, session: ChatSession, message: str, is_new: bool
+    ) -> Tuple[List[Dict[str, Any]], List[StoredMessage], List[StoredMessage]]:
+        """Recent messages (with the incoming one) plus the older ones to fold into the summary."""
+        stored = []
+        if not is_new:
+            stored = await self.repository.get_messages(session.id, limit=self.memory.fetch_limit)
+        messages = [StoredMessage(role="user", content=message), *stored]
+        recent, folded = self.memory.split(messages, session.summarized_through or 0)
+        history_dicts = [{"role": m.role, "content": m.content} for m in reversed(recent)]
+        return history_dicts, recent, folded
+
+    async def _answer(
+        self,
+        message: str,
+        history_dicts: List[Dict[str, Any]],
+        platform: str | None,
+        summary: str | None,
+        state: dict,
+    ) -> Tuple[AssistantResponse, dict | None]:
+        """Answer locally when the expense parser is confident, otherwise ask the LLM."""
+        if self.fast_path:
+            local = await self.fast_path.answer(message, state)
+            if local is not None:
+                return local
+        response = await get_llm_response(
+            history_dicts, platform, context=self.memory.render(summary, state)
+        )
+        return response, None
+
+    def _memory_changes(
+        self,
+        session: ChatSession,
+        summary: str | None,
+        state: dict,
+        response: AssistantResponse,
+        folded: List[StoredMessage],
+        slots: dict | None = None,
+    ) -> dict | None:
+        new_state = self.memory.update_state(state, response, slots)
+        if not folded and new_state == state:
+            return None
+        return {
+            "summary": summary,
+            "state": new_state,
+            "summarized_through": max(
+                (m.id for m in folded), default=session.summarized_through or 0
+            ),
+        }
 
     async def _handle_finance_action(self, response: AssistantResponse) -> None:
         if response.is_complete and response.is_confirmed:
@@ -84,7 +228,7 @@ class ChatService:
         self,
         session_id: uuid.UUID,
         response_text: str,
-        previous_messages: list[ChatMessage],
+        previous_messages: list[StoredMessage],
         is_complete: bool = False,
     ) -> ChatResponse:
         updated_history_dtos = [
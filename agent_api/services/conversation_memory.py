@@ -0,0 +1,114 @@
+from typing import Sequence
+
+from agent_api.core.logger import get_logger
+from agent_api.models.chat import ChatMessage
+from agent_api.schemas.assistant import AssistantResponse
+from agent_api.settings import settings
+
+logger = get_logger(__name__)
+
+# Each turn writes a user and an assistant message; fetching this many messages past the
+# window guarantees every message is folded into the summary before it is out of reach.
+FOLD_MARGIN = 2
+
+_ROLE_LABELS = {"user": "Usuário", "assistant": "Assistente"}
+_SLOT_LABELS = {"spending": "Gasto em andamento", "limit": "Limite em andamento"}
+
+
+class ConversationMemory:
+    """Constant-size view of a chat session for the LLM prompt.
+
+    The prompt carries the last ``window`` messages verbatim, a running summary of the
+    older ones and the slots already extracted in the current flow (spending or limit
+    details), so neither the prompt nor the history query grows with the conversation.
+    Older turns are compressed without an extra LLM call: each becomes one clipped
+    ``role: text`` line and the oldest lines are dropped once the summary exceeds
+    ``summary_max_chars``.
+    """
+
+    def __init__(self, window: int = 10, summary_max_chars: int = 1500, line_max_chars: int = 200):
+        self.window = window
+        self.summary_max_chars = summary_max_chars
+        self.line_max_chars = line_max_chars
+
+    @property
+    def fetch_limit(self) -> int:
+        return self.window + FOLD_MARGIN
+
+    def split(
+        self, messages: Sequence[ChatMessage], summarized_through: int
+    ) -> tuple[list[ChatMessage], list[ChatMessage]]:
+        """Split newest-first ``messages`` into the recent window and the ones to fold.
+
+        Messages to fold come back oldest first and exclude those already summarized.
+        """
+        recent = list(messages[: self.window])
+        to_fold = [
+            m for m in messages[self.window :] if m.id is not None and m.id > summarized_through
+        ]
+        return recent, to_fold[::-1]
+
+    def _line(self, message: ChatMessage) -> str:
+        text = " ".join(message.content.split())
+        if len(text) > self.line_max_chars:
+            text = text[: self.line_max_chars - 1].rstrip() + "…"
+        return f"{_ROLE_LABELS.get(message.role, message.role)}: {text}"
+
+    def fold(self, summary: str | None, messages: Sequence[ChatMessage]) -> str | None:
+        if not messages:
+            return summary
+        lines = (summary.splitlines() if summary else []) + [self._line(m) for m in messages]
+        while len(lines) > 1 and sum(len(line) + 1 for line in lines) > self.summary_max_chars:
+            lines.pop(0)
+        return "\n".join(lines)
+
+    def update_state(
+        self, state: dict, response: AssistantResponse, slots: dict | None = None
+    ) -> dict:
+        """Merge the slots extracted in this turn; a confirmed action starts a new flow.
+
+        ``slots`` are spending fields found without the LLM (possibly partial).
+        ``awaiting_confirmation`` names the kind of complete flow ("spending" or "limit")
+        waiting for the user's "sim".
+        """
+        if response.is_complete and response.is_confirmed:
+            return {}
+        updated = dict(state)
+        if response.spending_details is None and not slots:
+            # The LLM left the expense (cancelled it, or moved to a limit or a question), so
+            # a later "sim" must not confirm the old draft
+            updated.pop("spending", None)
+        for kind, details in (
+            ("spending", response.spending_details),
+            ("limit", response.limit_details),
+        ):
+            if details is not None:
+                updated[kind] = {**state.get(kind, {}), **details.model_dump(exclude_none=True)}
+        if slots:
+            updated["spending"] = {**updated.get("spending", {}), **slots}
+        if response.is_complete and response.spending_details is not None:
+            updated["awaiting_confirmation"] = "spending"
+        elif response.is_complete and response.limit_details is not None:
+            updated["awaiting_confirmation"] = "limit"
+        else:
+            updated.pop("awaiting_confirmation", None)
+        return updated
+
+    def render(self, summary: str | None, state: dict) -> str | None:
+        """Context message for the LLM, or ``None`` when there is nothing to add."""
+        parts = []
+        if summary:
+            parts.append(f"Resumo das mensagens anteriores da conversa:\n{summary}")
+        for kind, label in _SLOT_LABELS.items():
+            slots = state.get(kind)
+            if slots:
+                fields = "\n".join(f"- {name}: {value}" for name, value in slots.items())
+                parts.append(f"{label} (dados já informados):\n{fields}")
+        return "\n\n".join(parts) or None
+
+
+conversation_memory = ConversationMemory(
+    window=settings.CHAT_HISTORY_WINDOW,
+    summary_max_chars=settings.CHAT_SUMMARY_MAX_CHARS,
+    line_max_chars=settings.CHAT_SUMMARY_LINE_MAX_CHARS,
+)
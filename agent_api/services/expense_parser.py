@@ -0,0 +1,373 @@
+"""Deterministic extraction of expenses from short chat messages.
+
+Most texts and transcriptions look like "gastei 42,90 no mercado no nubank da lailla":
+an amount plus reference keys (category, payment method, owner) and free-text item and
+location introduced by prepositions. Those are parsed locally against the cached
+reference data; anything the parser is not sure about is left to the LLM.
+"""
+
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from difflib import get_close_matches
+
+from pydantic import ValidationError
+
+from agent_api.core.logger import get_logger
+from agent_api.core.metrics import metrics
+from agent_api.schemas.assistant import AssistantResponse
+from agent_api.schemas.spending import SpendingDetails
+from agent_api.services.reference_data import (
+    ReferenceData,
+    ReferenceDataCache,
+    reference_data_cache,
+)
+
+logger = get_logger(__name__)
+
+# SpendingDetails fields, in the order they are listed to the user
+SLOT_LABELS = {
+    "categoria": "categoria",
+    "item_comprado": "item comprado",
+    "valor": "valor",
+    "metodo_pagamento": "método de pagamento",
+    "proprietário": "proprietário",
+    "local_compra": "local da compra",
+}
+_KIND_SLOTS = {
+    "category": "categoria",
+    "payment_method": "metodo_pagamento",
+    "owner": "proprietário",
+}
+
+# Common words for categories; only used when the target key exists. Unlike the keys
+# themselves they also count as item/location text ("de gasolina", "na drogaria").
+CATEGORY_ALIASES = {
+    "supermercado": "mercado",
+    "restaurante": "comer_fora",
+    "lanchonete": "comer_fora",
+    "ifood": "comer_fora",
+    "uber": "transporte",
+    "gasolina": "transporte",
+    "combustivel": "transporte",
+    "remedio": "farmacia",
+    "remedios": "farmacia",
+    "drogaria": "farmacia",
+    "aluguel": "moradia",
+    "roupa": "vestuario",
+    "roupas": "vestuario",
+}
+
+# Words that split a message into chunks, and what free text after them means
+_LOCATION_WORDS = {"no", "na", "nos", "nas", "em", "num", "numa"}
+_ITEM_WORDS = {"de", "com", "comprei"}
+_CONTINUATION_WORDS = {"do", "da", "dos", "das"}
+_OTHER_SEPARATORS = {"gastei", "paguei", "custou", "foi", "deu", "pelo", "pela", "via", "e"}
+_OTHER_SEPARATORS |= {"por", "para", "pra"}
+_FILLER = {"o", "a", "os", "as", "um", "uma", "uns", "umas", "meu", "minha", "eu", "hoje"}
+_FILLER |= {"reais", "real", "conto", "contos", "r", "cartao", "credito", "debito"}
+
+# Messages with these words (corrections, limits, installments...) always go to the LLM
+_LLM_WORDS = {"nao", "limite", "cancela", "cancelar", "errado", "errada", "corrige"}
+_LLM_WORDS |= {"corrigir", "parcela", "parcelas", "parcelado", "parcelada", "vezes"}
+_LLM_WORDS |= {"assinatura", "mensalidade"}
+# Purchase dates other than today are not parsed; left in, they would be read as text
+_LLM_WORDS |= {"ontem", "anteontem", "semana", "passada", "passado", "dia", "mes"}
+_INSTALLMENTS = re.compile(r"\d+\s*x\b")
+
+_AFFIRMATIVES = {"sim", "s", "isso", "isso mesmo", "confirmo", "confirmado", "confirma"}
+_AFFIRMATIVES |= {"pode", "pode registrar", "pode salvar", "ok", "certo", "correto"}
+_AFFIRMATIVES |= {"perfeito", "tudo certo", "esta certo", "ta certo", "sim pode registrar"}
+_AFFIRMATIVES |= {"sim pode", "sim esta certo", "sim confirmo", "sim correto"}
+
+_AMOUNT = re.compile(r"(?:r\$\s*)?(?<![^\W\d_])(\d[\d.,]*)(?![^\W\d_])")
+_TOKEN = re.compile(r"<valor>|\w+")
+_WORD = re.compile(r"\w+")
+_VALUE = "<valor>"
+FUZZY_CUTOFF = 0.8
+FUZZY_MIN_LENGTH = 4
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip accents ("Crédito" -> "credito")."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def parse_amount(raw: str) -> float | None:
+    """Brazilian or plain number: "42,90", "1.500", "1.500,00", "42.90"."""
+    raw = raw.rstrip(".,")
+    if "," in raw:
+        raw = raw.replace(".", "").replace(",", ".")
+    elif raw.count(".") > 1 or (raw.count(".") == 1 and len(raw.split(".")[1]) == 3):
+        raw = raw.replace(".", "")
+    try:
+        return round(float(raw), 2)
+    except ValueError:
+        return None
+
+
+class Vocabulary:
+    """Normalized forms of the reference keys, for exact and fuzzy lookups."""
+
+    def __init__(self, data: ReferenceData):
+        self.version = data.version
+        self._forms: dict[str, set[tuple[str, str]]] = {}
+        self._aliases: dict[str, str] = {}
+        for kind, keys in (
+            ("category", data.categories),
+            ("payment_method", data.payment_methods),
+            ("owner", data.owners),
+        ):
+            for key in keys:
+                form = fold(key).replace("_", " ")
+                self._add(form, kind, key)
+                if kind == "owner" and " " in form:
+                    self._add(form.split()[0], kind, key)  # "joao" for joao_lucas
+        for alias, key in CATEGORY_ALIASES.items():
+            if key in data.categories:
+                self._aliases[alias] = key
+        self._fuzzy_forms = [
+            form for form in (*self._forms, *self._aliases) if len(form) >= FUZZY_MIN_LENGTH
+        ]
+
+    def _add(self, form: str, kind: str, key: str) -> None:
+        self._forms.setdefault(form, set()).add((kind, key))
+
+    def exact(self, phrase: str) -> set[tuple[str, str]]:
+        return self._forms.get(phrase, set())
+
+    def alias(self, word: str) -> str | None:
+        return self._aliases.get(word)
+
+    def fuzzy(self, word: str) -> list[str]:
+        """Close forms of ``word``; more than one means it is ambiguous."""
+        if len(word) < FUZZY_MIN_LENGTH:
+            return []
+        return get_close_matches(word, self._fuzzy_forms, n=2, cutoff=FUZZY_CUTOFF)
+
+
+@dataclass
+class ParsedExpense:
+    slots: dict = field(default_factory=dict)
+    # Free text in no item/location position, e.g. a bare answer to "qual o item?"
+    free_text: list[str] = field(default_factory=list)
+    ambiguous: bool = False
+
+    def set(self, slot: str, value) -> None:
+        if self.slots.get(slot, value) != value:
+            self.ambiguous = True
+        self.slots[slot] = value
+
+
+@dataclass
+class _Chunk:
+    context: str  # "location", "item", "continuation" or "other"
+    separator: str = ""
+    words: list[tuple[str, str]] = field(default_factory=list)  # (folded, original)
+
+
+@dataclass
+class _Phrase:
+    context: str
+    words: list[str]
+    has_free_text: bool
+
+
+def _chunks(tokens: list[tuple[str, str]]) -> list[_Chunk]:
+    chunks = [_Chunk("other")]
+    for folded, original in tokens:
+        if folded in _LOCATION_WORDS:
+            chunks.append(_Chunk("location"))
+        elif folded in _ITEM_WORDS:
+            chunks.append(_Chunk("item"))
+        elif folded in _CONTINUATION_WORDS:
+            chunks.append(_Chunk("continuation", original))
+        elif folded in _OTHER_SEPARATORS:
+            chunks.append(_Chunk("other"))
+        elif folded not in _FILLER and folded != _VALUE:
+            chunks[-1].words.append((folded, original))
+    return [chunk for chunk in chunks if chunk.words]
+
+
+def _match_chunk(
+    chunk: _Chunk, vocabulary: Vocabulary, parsed: ParsedExpense
+) -> tuple[list[str], bool]:
+    """Assign the reference keys found in ``chunk``; returns its remaining words.
+
+    Payment methods and owners are consumed. Category words stay in the text, which
+    only counts as item/location when it has other words too ("no mercado" only sets
+    the category, "na farmácia central" also gives the location). The flag tells
+    whether there are such words.
+    """
+    words, text, has_free_text = chunk.words, [], False
+    i = 0
+    while i < len(words):
+        folded = words[i][0]
+        size, matches = 2, set()
+        if i + 1 < len(words):
+            matches = vocabulary.exact(f"{folded} {words[i + 1][0]}")
+        if not matches:
+            size, matches = 1, vocabulary.exact(folded)
+        alias = None if matches else vocabulary.alias(folded)
+        if not matches and not alias:
+            close = vocabulary.fuzzy(folded)
+            if len(close) > 1:
+                parsed.ambiguous = True
+            elif close:
+                matches, alias = vocabulary.exact(close[0]), vocabulary.alias(close[0])
+
+        if len(matches) > 1:
+            parsed.ambiguous = True
+        for kind, key in matches:
+            parsed.set(_KIND_SLOTS[kind], key)
+        if alias:
+            parsed.set("categoria", alias)
+        if not matches or all(kind == "category" for kind, _ in matches):
+            text.extend(original for _, original in words[i : i + size])
+            has_free_text = has_free_text or not matches
+        i += size
+    return text, has_free_text
+
+
+def parse_expense(message: str, vocabulary: Vocabulary) -> ParsedExpense:
+    """Extract the SpendingDetails slots of ``message`` that can be read unambiguously."""
+    parsed = ParsedExpense()
+    lowered = message.lower()
+
+    amounts = [parse_amount(match.group(1)) for match in _AMOUNT.finditer(lowered)]
+    if len(amounts) > 1 or None in amounts:
+        parsed.ambiguous = True
+    elif amounts:
+        parsed.set("valor", amounts[0])
+    lowered = _AMOUNT.sub(f" {_VALUE} ", lowered)
+
+    tokens = [(fold(token), token) for token in _TOKEN.findall(lowered)]
+    phrases: list[_Phrase] = []
+
+    for chunk in _chunks(tokens):
+        text, has_free_text = _match_chunk(chunk, vocabulary, parsed)
+        if chunk.context != "continuation":
+            phrases.append(_Phrase(chunk.context, text, has_free_text))
+        elif text and phrases and phrases[-1].words:
+            # "padaria do zé", "compras do mês": extends the previous phrase
+            phrases[-1].words.extend([chunk.separator, *text])
+            phrases[-1].has_free_text = phrases[-1].has_free_text or has_free_text
+        elif text:
+            parsed.ambiguous = True
+
+    texts: dict[str, list[str]] = {"location": [], "item": [], "other": []}
+    for phrase in phrases:
+        if phrase.words and phrase.has_free_text:
+            texts[phrase.context].append(" ".join(phrase.words))
+    for context, slot in (("location", "local_compra"), ("item", "item_comprado")):
+        if len(texts[context]) > 1:
+            parsed.ambiguous = True
+        elif texts[context]:
+            parsed.set(slot, texts[context][0])
+    parsed.free_text = texts["other"]
+    return parsed
+
+
+def _format_value(slot: str, value) -> str:
+    if slot == "valor":
+        return f"R$ {value:.2f}".replace(".", ",")
+    return str(value)
+
+
+class ExpenseFastPath:
+    """Answers well-formed expense messages without calling the LLM.
+
+    Slots parsed from the message are merged with the draft kept in the session state
+    (see ConversationMemory). A complete draft gets the usual confirmation list, a
+    partial one a question for the missing fields, and an affirmative reply to a
+    pending confirmation confirms it. Questions, corrections, limits, installments,
+    conflicting or unrecognized text return ``None`` so the message goes to the LLM.
+    """
+
+    def __init__(self, reference_data: ReferenceDataCache = reference_data_cache):
+        self.reference_data = reference_data
+        self._vocabulary: Vocabulary | None = None
+
+    async def vocabulary(self) -> Vocabulary:
+        data = await self.reference_data.get()
+        if self._vocabulary is None or self._vocabulary.version != data.version:
+            self._vocabulary = Vocabulary(data)
+        return self._vocabulary
+
+    async def answer(self, message: str, state: dict) -> tuple[AssistantResponse, dict] | None:
+        """Local response plus the slots to keep in the session, or ``None``."""
+        draft = state.get("spending", {})
+        folded = fold(message)
+        words = set(_WORD.findall(folded))
+        if "?" in message or words & _LLM_WORDS or _INSTALLMENTS.search(folded):
+            return None
+        if not draft and not re.search(r"\d", message):
+            return None
+
+        result = await self._answer(message, folded, state, draft)
+        metrics.incr("chat.fast_path.hits" if result else "chat.fast_path.misses")
+        if result:
+            logger.info("Expense message answered by the local parser")
+        return result
+
+    async def _answer(
+        self, message: str, folded: str, state: dict, draft: dict
+    ) -> tuple[AssistantResponse, dict] | None:
+        if " ".join(_WORD.findall(folded)) in _AFFIRMATIVES:
+            # Only a spending confirmation is answered locally; a pending limit is the LLM's
+            if state.get("awaiting_confirmation") == "spending":
+                return self._confirmed(draft)
+            return None
+
+        parsed = parse_expense(message, await self.vocabulary())
+        if parsed.ambiguous or (not draft and "valor" not in parsed.slots):
+            return None
+
+        if any(draft.get(slot, value) != value for slot, value in parsed.slots.items()):
+            return None  # corrections are left to the LLM
+        slots = {**draft, **parsed.slots}
+        if parsed.free_text:
+            # A bare answer ("arroz") fills the only free-text field still missing
+            missing_text = [slot for slot in ("item_comprado", "local_compra") if slot not in slots]
+            if not draft or len(parsed.free_text) > 1 or len(missing_text) != 1:
+                return None
+            slots[missing_text[0]] = parsed.free_text[0]
+        if slots == draft:
+            return None
+
+        missing = [label for slot, label in SLOT_LABELS.items() if slot not in slots]
+        if missing:
+            lines = "\n".join(f"- {label}" for label in missing)
+            return AssistantResponse(response_message=f"Por favor, me diga:\n{lines}"), slots
+
+        try:
+            details = SpendingDetails(**slots)
+        except ValidationError:
+            return None
+        lines = "\n".join(
+            f"- {label}: {_format_value(slot, getattr(details, slot))}"
+            for slot, label in SLOT_LABELS.items()
+        )
+        response = AssistantResponse(
+            response_message=f"Confira os dados do gasto:\n{lines}\n\nPosso registrar?",
+            spending_details=details,
+            is_complete=True,
+        )
+        return response, details.model_dump()
+
+    def _confirmed(self, draft: dict) -> tuple[AssistantResponse, dict] | None:
+        try:
+            details = SpendingDetails(**draft)
+        except ValidationError:
+            return None
+        response = AssistantResponse(
+            response_message="Pronto, gasto registrado!",
+            spending_details=details,
+            is_complete=True,
+            is_confirmed=True,
+        )
+        return response, {}
+
+
+expense_fast_path = ExpenseFastPath()
@@ -1,63 +1,41 @@
-import httpx
+import asyncio
+from typing import Callable
+
+from langchain_core.runnables import Runnable
 from langchain_google_genai import ChatGoogleGenerativeAI
 
 from agent_api.core.decorators import handle_llm_errors
+from agent_api.core.exceptions import LLMProviderError
 from agent_api.core.logger import get_logger
+from agent_api.core.metrics import metrics
 from agent_api.schemas.assistant import AssistantResponse
+from agent_api.services.reference_data import ReferenceData, reference_data_cache
 from agent_api.settings import settings
 
 logger = get_logger(__name__)
 
 
-# Fetch categories dynamically from finance API
-async def get_valid_categories() -> str:
-    """Fetch valid categories from finance API."""
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{settings.FINANCE_SERVICE_URL}/categories?size=100")
-            if response.status_code == 200:
-                data = response.json()
-                categories = [item["key"] for item in data.get("items", [])]
-                return ", ".join(categories)
-    except Exception as e:
-        logger.warning(f"Failed to fetch categories: {e}")
-    # Fallback to common categories
-    return "alimentacao, comer_fora, farmacia, mercado, transporte, moradia, saude, lazer, educação, compras, vestuario, viagem, serviços, crianças, outros"
-
-
-async def get_valid_payment_methods() -> str:
-    """Fetch valid payment methods from finance API."""
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{settings.FINANCE_SERVICE_URL}/payment-methods?size=100")
-            if response.status_code == 200:
-                data = response.json()
-                methods = [item["key"] for item in data.get("items", [])]
-                return ", ".join(methods)
-    except Exception as e:
-        logger.warning(f"Failed to fetch payment methods: {e}")
-    return "itau, nubank, picpay, xp, c6, pix"
-
-
-async def get_valid_owners() -> str:
-    """Fetch valid payment owners from finance API."""
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{settings.FINANCE_SERVICE_URL}/payment-owners?size=100")
-            if response.status_code == 200:
-                data = response.json()
-                owners = [item["key"] for item in data.get("items", [])]
-                return ", ".join(owners)
-    except Exception as e:
-        logger.warning(f"Failed to fetch payment owners: {e}")
-    return "joao_lucas, lailla"
+# Built prompts per (reference data version, platform); reset when the version changes
+_prompt_cache: dict[tuple[int, str | None], str] = {}
 
 
 async def get_system_prompt(platform: str | None = None) -> str:
+    """Return the system prompt, built once per reference data version and platform."""
+    data = await reference_data_cache.get()
+    key = (data.version, platform)
+    prompt = _prompt_cache.get(key)
+    if prompt is None:
+        if any(cached_version != data.version for cached_version, _ in _prompt_cache):
+            _prompt_cache.clear()
+        prompt = _prompt_cache[key] = build_system_prompt(data, platform)
+    return prompt
+
+
+def build_system_prompt(data: ReferenceData, platform: str | None = None) -> str:
     """Generate system prompt with dynamic categories and platform instructions."""
-    valid_categories = await get_valid_categories()
-    valid_payment_methods = await get_valid_payment_methods()
-    valid_owners = await get_valid_owners()
+    valid_categories = ", ".join(data.categories)
+    valid_payment_methods = ", ".join(data.payment_methods)
+    valid_owners = ", ".join(data.owners)
 
     platform_instructions = ""
     if platform == "telegram":
@@ -137,18 +115,126 @@ async def get_system_prompt(platform: str | None = None) -> str:
     """
 
 
-@handle_llm_errors
-async def get_llm_response(history: list, platform: str | None = None) -> AssistantResponse:
-    llm = ChatGoogleGenerativeAI(model=settings.MODEL_NAME, temperature=0).with_structured_output(
+class FakeLLMProvider:
+    """Local stand-in for the LLM, for tests and benchmarks.
+
+    Answers every call with ``response`` (echoing the last user message by default)
+    after ``latency_seconds``, without any network access.
+    """
+
+    def __init__(self, response: AssistantResponse | None = None, latency_seconds: float = 0.0):
+        self.response = response
+        self.latency_seconds = latency_seconds
+        self.calls = 0
+
+    def __call__(self, model: str) -> "FakeLLMProvider":
+        return self
+
+    async def ainvoke(self, messages: list) -> AssistantResponse:
+        self.calls += 1
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        if self.response is not None:
+            return self.response
+        return AssistantResponse(response_message=messages[-1][1] if messages else "")
+
+
+def _google_structured_llm(model: str) -> Runnable:
+    return ChatGoogleGenerativeAI(model=model, temperature=0).with_structured_output(
         AssistantResponse
     )
 
-    logger.info("Calling LLM service")
 
-    system_prompt = await get_system_prompt(platform)
-    messages = [("system", system_prompt)]
-    for msg in history:
-        role = "human" if msg["role"] == "user" else "ai"
-        messages.append((role, msg["content"]))
+class LLMClientRegistry:
+    """Process-wide LLM clients with structured output pre-bound per model.
+
+    Each model's runnable (client, connection pool and output schema) is built once and
+    reused by every request. In-flight calls are capped by a semaphore; callers beyond
+    ``max_queue`` waiting for a slot are rejected instead of piling up. ``use`` swaps the
+    provider factory, e.g. for ``FakeLLMProvider``.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[str], Runnable] = _google_structured_llm,
+        max_concurrency: int = 4,
+        max_queue: int = 32,
+    ):
+        self._factory = factory
+        self._runnables: dict[str, Runnable] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.max_queue = max_queue
+        self._waiting = 0
+
+    def use(self, factory: Callable[[str], Runnable]) -> None:
+        self._factory = factory
+        self._runnables.clear()
+
+    def reset(self) -> None:
+        self._runnables.clear()
+
+    def get(self, model: str | None = None) -> Runnable:
+        model = model or settings.MODEL_NAME
+        runnable = self._runnables.get(model)
+        if runnable is None:
+            runnable = self._runnables[model] = self._factory(model)
+            logger.info(f"LLM client ready for model {model}")
+        return runnable
+
+    def warm_up(self) -> None:
+        try:
+            self.get()
+        except Exception as e:
+            logger.warning(f"LLM client warm-up failed, will retry on first call: {e}")
+
+    async def ainvoke(
+        self, messages: list, model: str | None = None, phases: dict[str, float] | None = None
+    ) -> AssistantResponse:
+        if self._waiting >= self.max_queue:
+            metrics.incr("llm.rejected")
+            raise LLMProviderError("Too many LLM requests in flight, try again shortly")
+
+        self._waiting += 1
+        try:
+            with metrics.timer("llm.queue", phases):
+                await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        try:
+            runnable = self.get(model)
+            with metrics.timer("llm.network", phases):
+                return await runnable.ainvoke(messages)
+        finally:
+            self._semaphore.release()
+
+
+llm_registry = LLMClientRegistry(
+    factory=FakeLLMProvider() if settings.LLM_PROVIDER == "fake" else _google_structured_llm,
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    max_queue=settings.LLM_MAX_QUEUE,
+)
+
 
-    return await llm.ainvoke(messages)
+@handle_llm_errors
+async def get_llm_response(
+    history: list, platform: str | None = None, context: str | None = None
+) -> AssistantResponse:
+    logger.info("Calling LLM service")
+    phases: dict[str, float] = {}
+
+    with metrics.timer("llm.prompt", phases):
+        system_prompt = await get_system_prompt(platform)
+        messages = [("system", system_prompt)]
+        # Session memory (summary of older turns, extracted slots) goes in its own
+        # message so the cached system prompt stays the same for every session
+        if context:
+            messages.append(("system", context))
+        for msg in history:
+            role = "human" if msg["role"] == "user" else "ai"
+            messages.append((role, msg["content"]))
+
+    response = await llm_registry.ainvoke(messages, phases=phases)
+    metrics.incr("llm.calls")
+    logger.info(f"LLM phases (ms): {phases}")
+    return response
@@ -0,0 +1,107 @@
+"""Parsing of NFC-e (Brazilian consumer fiscal receipt) QR code payloads."""
+
+from datetime import date, datetime
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+from agent_api.core.logger import get_logger
+from agent_api.schemas.dtos import NFCeReceipt
+
+logger = get_logger(__name__)
+
+ACCESS_KEY_LENGTH = 44
+
+
+def access_key_check_digit(body: str) -> int:
+    """Modulo 11 check digit of the first 43 digits of an access key (weights 2-9)."""
+    total = sum(int(digit) * (2 + i % 8) for i, digit in enumerate(reversed(body)))
+    remainder = total % 11
+    return 0 if remainder < 2 else 11 - remainder
+
+
+def _is_valid_access_key(key: str) -> bool:
+    return (
+        len(key) == ACCESS_KEY_LENGTH
+        and key.isdigit()
+        and access_key_check_digit(key[:-1]) == int(key[-1])
+    )
+
+
+def _parse_total(raw: Optional[str]) -> Optional[float]:
+    try:
+        return round(float(raw.replace(",", ".")), 2) if raw else None
+    except ValueError:
+        return None
+
+
+def _issue_date(key: str, day: Optional[str]) -> Optional[date]:
+    if not day:
+        return None
+    try:
+        return date(2000 + int(key[2:4]), int(key[4:6]), int(day))
+    except ValueError:
+        return None
+
+
+def _v1_issue_date(raw: Optional[str]) -> Optional[date]:
+    # Version 1 codes carry the ISO issue datetime hex encoded
+    try:
+        return datetime.fromisoformat(bytes.fromhex(raw).decode()).date() if raw else None
+    except ValueError:
+        return None
+
+
+def parse_nfce_qr(payload: str) -> Optional[NFCeReceipt]:
+    """Extract the structured fields of an NFC-e QR code, or ``None`` if it is not one.
+
+    Version 2/3 codes pack the fields in ``p=key|version|environment|...``; online
+    emission only carries the access key, while offline contingency also carries the
+    issue day and the total. Version 1 codes use separate query parameters.
+    """
+    query = parse_qs(urlparse(payload.strip()).query)
+    day = total = None
+    issue_date = None
+
+    if "p" in query:
+        fields = query["p"][0].split("|")
+        key = fields[0]
+        if len(fields) >= 6:
+            day, total = fields[3], fields[4]
+    elif "chNFe" in query:
+        key = query["chNFe"][0]
+        total = query.get("vNF", [None])[0]
+        issue_date = _v1_issue_date(query.get("dhEmi", [None])[0])
+    else:
+        return None
+
+    if not _is_valid_access_key(key):
+        logger.info("QR code found but it does not carry a valid NFC-e access key")
+        return None
+
+    return NFCeReceipt(
+        access_key=key,
+        state_code=key[0:2],
+        issue_year_month=f"20{key[2:4]}-{key[4:6]}",
+        issuer_cnpj=key[6:20],
+        model=key[20:22],
+        series=key[22:25],
+        number=key[25:34],
+        emission_type=key[34],
+        issue_date=issue_date or _issue_date(key, day),
+        total=_parse_total(total),
+        url=payload.strip(),
+    )
+
+
+def format_nfce_summary(receipt: NFCeReceipt) -> str:
+    """Short description of the receipt for the chat flow."""
+    cnpj = receipt.issuer_cnpj
+    lines = [f"- CNPJ do emitente: {cnpj[:2]}.{cnpj[2:5]}.{cnpj[5:8]}/{cnpj[8:12]}-{cnpj[12:]}"]
+    if receipt.total is not None:
+        lines.insert(0, f"- Valor total: R$ {receipt.total:.2f}".replace(".", ","))
+    if receipt.issue_date is not None:
+        lines.append(f"- Data de emissão: {receipt.issue_date.strftime('%d/%m/%Y')}")
+    else:
+        lines.append(f"- Mês de emissão: {receipt.issue_year_month}")
+    lines.append(f"- Chave de acesso: {receipt.access_key}")
+    return "Nota fiscal NFC-e lida pelo QR code:\n" + "\n".join(lines)
@@ -1,14 +1,32 @@
 """OCR Service for extracting text from receipt images."""
 
-from typing import Tuple
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Tuple
 
 import cv2
 import numpy as np
 import pytesseract
+from PIL import Image
+
+try:
+    # Optional: Tesseract C API binding, keeps the engine and language model loaded
+    import tesserocr
+except ImportError:  # pragma: no cover - depends on the deployment image
+    tesserocr = None
 
 from agent_api.core.decorators import handle_ocr_errors
-from agent_api.core.exceptions import InvalidImageError, OCRProcessingError
+from agent_api.core.exceptions import InvalidImageError, OCRBusyError, OCRProcessingError
 from agent_api.core.logger import get_logger
+from agent_api.core.metrics import metrics
+from agent_api.schemas.dtos import NFCeReceipt
+from agent_api.services.nfce import parse_nfce_qr
+from agent_api.services.result_cache import result_cache
+from agent_api.settings import settings
 
 logger = get_logger(__name__)
 
@@ -18,6 +36,401 @@ ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".bmp", ".tiff"}
 MAX_FILE_SIZE_MB = 10
 
 
+def _order_corners(points: np.ndarray) -> np.ndarray:
+    """Order four points as top-left, top-right, bottom-right, bottom-left."""
+    sums = points.sum(axis=1)
+    diffs = np.diff(points, axis=1).ravel()
+    return np.array(
+        [
+            points[np.argmin(sums)],
+            points[np.argmin(diffs)],
+            points[np.argmax(sums)],
+            points[np.argmax(diffs)],
+        ],
+        dtype=np.float32,
+    )
+
+
+def _crop_receipt(gray: np.ndarray, pipeline: "PreprocessPipeline") -> np.ndarray:
+    """Find the receipt outline and warp it to a flat, tightly cropped rectangle.
+
+    The contour search runs on a copy shrunk to ~500 px, only the final warp touches the
+    full resolution image. Photos where no large four-sided outline is found are kept as is.
+    """
+    scale = 500 / max(gray.shape)
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    edges = cv2.Canny(cv2.GaussianBlur(small, (5, 5), 0), 50, 150)
+    edges = cv2.dilate(edges, np.ones((3, 3), np.uint8))
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    min_area = 0.2 * small.shape[0] * small.shape[1]
+    for contour in sorted(contours, key=cv2.contourArea, reverse=True)[:5]:
+        if cv2.contourArea(contour) < min_area:
+            break
+        approx = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+        if len(approx) != 4:
+            continue
+        corners = _order_corners(approx.reshape(4, 2).astype(np.float32) / scale)
+        tl, tr, br, bl = corners
+        width = int(max(np.linalg.norm(br - bl), np.linalg.norm(tr - tl)))
+        height = int(max(np.linalg.norm(tr - br), np.linalg.norm(tl - bl)))
+        target = np.array(
+            [[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.float32
+        )
+        matrix = cv2.getPerspectiveTransform(corners, target)
+        return cv2.warpPerspective(gray, matrix, (width, height), flags=cv2.INTER_LINEAR)
+    return gray
+
+
+def _deskew(gray: np.ndarray, pipeline: "PreprocessPipeline") -> np.ndarray:
+    """Rotate so text lines are horizontal, using the minimum area box around the ink."""
+    ink = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)[1]
+    coords = cv2.findNonZero(ink)
+    if coords is None or len(coords) < 100:
+        return gray
+
+    # OpenCV versions disagree on the angle range; fold it into [-45, 45]
+    angle = cv2.minAreaRect(coords)[-1]
+    if angle > 45:
+        angle -= 90
+    elif angle < -45:
+        angle += 90
+    if abs(angle) < pipeline.min_skew_degrees or abs(angle) > pipeline.max_skew_degrees:
+        return gray
+
+    height, width = gray.shape
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    return cv2.warpAffine(
+        gray, matrix, (width, height), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE
+    )
+
+
+def _estimate_text_height(gray: np.ndarray) -> float | None:
+    """Median height of glyph-sized connected components, in pixels."""
+    ink = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)[1]
+    count, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+    heights = stats[1:count, cv2.CC_STAT_HEIGHT]
+    widths = stats[1:count, cv2.CC_STAT_WIDTH]
+    glyphs = heights[(heights >= 6) & (heights < gray.shape[0] / 10) & (widths < heights * 4)]
+    if len(glyphs) < 10:
+        return None
+    return float(np.median(glyphs))
+
+
+def _downscale(gray: np.ndarray, pipeline: "PreprocessPipeline") -> np.ndarray:
+    """Shrink the image so glyphs are about ``target_text_height`` px tall (never enlarges)."""
+    text_height = _estimate_text_height(gray)
+    if text_height is None or text_height <= pipeline.target_text_height:
+        return gray
+    scale = pipeline.target_text_height / text_height
+    return cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+
+def _otsu(gray: np.ndarray, pipeline: "PreprocessPipeline") -> np.ndarray:
+    # Global Otsu threshold: text black, background white
+    return cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)[1]
+
+
+def _adaptive(gray: np.ndarray, pipeline: "PreprocessPipeline") -> np.ndarray:
+    # Local threshold, better for uneven lighting and shadows across the receipt
+    return cv2.adaptiveThreshold(
+        gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 15
+    )
+
+
+PREPROCESS_STAGES: dict[str, Callable[[np.ndarray, "PreprocessPipeline"], np.ndarray]] = {
+    "crop": _crop_receipt,
+    "deskew": _deskew,
+    "downscale": _downscale,
+    "otsu": _otsu,
+    "adaptive": _adaptive,
+}
+
+
+@dataclass(frozen=True)
+class PreprocessPipeline:
+    """Ordered preprocessing stages applied to the grayscale receipt before OCR.
+
+    Stages are named in ``PREPROCESS_STAGES``; every stage (and the initial decode) is
+    timed and the timings are returned with the image, so they can be reported from the
+    process that owns the metrics.
+    """
+
+    stages: tuple[str, ...] = ("crop", "deskew", "downscale", "otsu")
+    target_text_height: int = 32
+    min_skew_degrees: float = 0.5
+    max_skew_degrees: float = 30.0
+
+    def __post_init__(self):
+        unknown = [stage for stage in self.stages if stage not in PREPROCESS_STAGES]
+        if unknown:
+            raise ValueError(
+                f"Unknown preprocessing stage(s) {unknown}. "
+                f"Options: {', '.join(PREPROCESS_STAGES)}"
+            )
+
+    @classmethod
+    def parse(cls, raw: str, **kwargs: Any) -> "PreprocessPipeline":
+        return cls(tuple(stage.strip() for stage in raw.split(",") if stage.strip()), **kwargs)
+
+    def run(self, image_bytes: bytes) -> Tuple[np.ndarray, dict[str, float]]:
+        timings: dict[str, float] = {}
+
+        start = time.perf_counter()
+        # Convert bytes directly to numpy array for OpenCV
+        nparr = np.frombuffer(image_bytes, np.uint8)
+        # Decode straight to grayscale
+        image = cv2.imdecode(nparr, cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            raise InvalidImageError("Failed to decode image. File may be corrupted.")
+        timings["decode"] = (time.perf_counter() - start) * 1000
+
+        for stage in self.stages:
+            start = time.perf_counter()
+            image = PREPROCESS_STAGES[stage](image, self)
+            timings[stage] = (time.perf_counter() - start) * 1000
+        return image, timings
+
+
+preprocess_pipeline = PreprocessPipeline.parse(
+    settings.OCR_PREPROCESS_STAGES, target_text_height=settings.OCR_TARGET_TEXT_HEIGHT
+)
+
+
+def _preprocess(
+    image_bytes: bytes, pipeline: PreprocessPipeline = preprocess_pipeline
+) -> Tuple[np.ndarray, dict[str, float]]:
+    return pipeline.run(image_bytes)
+
+
+OCR_ENGINES = ("tesseract", "tesserocr")
+
+# Configure Tesseract
+# --oem 3: Use default OCR Engine mode (LSTM)
+# --psm 3: Automatic page segmentation (good for receipts)
+TESSERACT_CONFIG = r"--oem 3 --psm 3"
+
+# Persistent tesserocr instances of this worker process, one per language
+_tesserocr_apis: dict = {}
+
+
+def _words_to_text(data: dict) -> Tuple[str, float]:
+    """Rebuild the page text and mean word confidence from ``image_to_data`` output.
+
+    Words are joined per line and lines per paragraph, with a blank line between
+    paragraphs, matching the layout ``image_to_string`` produces.
+    """
+    paragraphs: dict[tuple, dict[tuple, list[str]]] = {}
+    confidences = []
+    for i, word in enumerate(data["text"]):
+        conf = float(data["conf"][i])
+        if conf == -1 or not str(word).strip():
+            continue
+        confidences.append(conf)
+        paragraph = (data["page_num"][i], data["block_num"][i], data["par_num"][i])
+        line = paragraph + (data["line_num"][i],)
+        paragraphs.setdefault(paragraph, {}).setdefault(line, []).append(str(word).strip())
+
+    text = "\n\n".join(
+        "\n".join(" ".join(words) for words in lines.values()) for lines in paragraphs.values()
+    )
+    avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+    return text, avg_confidence
+
+
+def _recognize_cli(image: np.ndarray, lang: str, timeout: float) -> Tuple[str, float]:
+    # pytesseract kills the tesseract subprocess once the timeout is exceeded
+    try:
+        data = pytesseract.image_to_data(
+            image,
+            lang=lang,
+            config=TESSERACT_CONFIG,
+            output_type=pytesseract.Output.DICT,
+            timeout=timeout,
+        )
+    except pytesseract.TesseractError:
+        raise
+    except RuntimeError as e:
+        # pytesseract reports its timeout as a bare RuntimeError
+        raise OCRProcessingError(f"OCR timed out: {e}")
+    return _words_to_text(data)
+
+
+def _recognize_tesserocr(image: np.ndarray, lang: str) -> Tuple[str, float]:
+    api = _tesserocr_apis.get(lang)
+    if api is None:
+        api = tesserocr.PyTessBaseAPI(lang=lang, psm=tesserocr.PSM.AUTO, oem=tesserocr.OEM.DEFAULT)
+        _tesserocr_apis[lang] = api
+    api.SetImage(Image.fromarray(image))
+    # GetUTF8Text runs recognition once; the word confidences reuse that result
+    text = api.GetUTF8Text()
+    confidences = api.AllWordConfidences()
+    api.Clear()
+    avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+    return text, float(avg_confidence)
+
+
+def _recognize(
+    image_bytes: bytes,
+    lang: str,
+    timeout: float,
+    engine: str = "tesseract",
+    pipeline: PreprocessPipeline = preprocess_pipeline,
+) -> Tuple[str, float, dict[str, float]]:
+    processed_image, timings = pipeline.run(image_bytes)
+
+    start = time.perf_counter()
+    if engine == "tesserocr" and tesserocr is not None:
+        text, avg_confidence = _recognize_tesserocr(processed_image, lang)
+    else:
+        text, avg_confidence = _recognize_cli(processed_image, lang, timeout)
+    timings["recognize"] = (time.perf_counter() - start) * 1000
+    return text.strip(), avg_confidence, timings
+
+
+def _read_qr(image_bytes: bytes, max_side: int = 1280) -> Tuple[str | None, dict[str, float]]:
+    """Decode the first QR code in the image, if any, on a copy of at most ``max_side`` px."""
+    start = time.perf_counter()
+    image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        raise InvalidImageError("Failed to decode image. File may be corrupted.")
+    scale = max_side / max(image.shape)
+    if scale < 1:
+        image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    payload, _, _ = cv2.QRCodeDetector().detectAndDecode(image)
+    return payload or None, {"qr": (time.perf_counter() - start) * 1000}
+
+
+def _image_dhash(image_bytes: bytes) -> str | None:
+    """64-bit difference hash of the image, stable across re-encoding and resizing."""
+    image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_4)
+    if image is None:
+        return None
+    small = cv2.resize(image, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return f"{int(''.join('1' if bit else '0' for bit in bits), 2):016x}"
+
+
+def _record_stage_timings(timings: dict[str, float]) -> None:
+    for stage, elapsed_ms in timings.items():
+        metrics.observe(f"ocr.stage.{stage}", elapsed_ms)
+
+
+# How often a queued job is checked for having started; its timeout counts from then
+START_POLL_SECONDS = 0.01
+
+
+def _timed_job(func: Callable[..., Any], submitted_at: float, *args: Any) -> tuple:
+    """Run ``func`` in a worker and report when it started and how long it ran."""
+    started_at = time.time()
+    result = func(*args)
+    return result, started_at - submitted_at, time.time() - started_at
+
+
+class OCRWorkerPool:
+    """Runs image decoding, preprocessing and Tesseract in a pool of worker processes.
+
+    OpenCV and Tesseract are CPU bound, so they run outside the event loop (and outside
+    the GIL) on ``workers`` processes, by default one per CPU. At most ``workers +
+    max_queue`` jobs are admitted; beyond that callers get ``OCRBusyError`` (HTTP 503).
+    A job holds its slot until it really finishes, even after its caller gave up, so the
+    cap always matches the work the workers have. Callers get an ``OCRProcessingError``
+    once a job has run for ``timeout`` seconds (time waiting in the queue is not counted);
+    the tesseract CLI is killed after the same timeout, tesserocr finishes in the
+    background.
+    """
+
+    def __init__(
+        self,
+        workers: int = 0,
+        max_queue: int = 8,
+        timeout: float = 30.0,
+        use_processes: bool = True,
+        engine: str = "tesseract",
+    ):
+        if engine not in OCR_ENGINES:
+            raise ValueError(f"Unknown OCR engine '{engine}'. Options: {', '.join(OCR_ENGINES)}")
+        if engine == "tesserocr" and tesserocr is None:
+            logger.warning("tesserocr is not installed, falling back to the tesseract CLI")
+            engine = "tesseract"
+        self.engine = engine
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.use_processes = use_processes
+        self._executor: Executor | None = None
+        self._admitted = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Admitted jobs not yet finished (running + waiting)."""
+        return self._admitted
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.use_processes:
+                # spawn: forking a process that already runs an event loop and
+                # Whisper threads is not safe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="ocr"
+                )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self._admitted >= self.workers + self.max_queue:
+            metrics.incr("ocr.rejected")
+            raise OCRBusyError(
+                "Muitas imagens sendo processadas no momento. Tente novamente em instantes."
+            )
+
+        self._admitted += 1
+        metrics.set_gauge("ocr.queue_depth", self._admitted)
+        future = self._get_executor().submit(_timed_job, func, time.time(), *args)
+        # Released when the job ends (or is dropped from the queue), not when we stop waiting
+        loop = asyncio.get_running_loop()
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release))
+        try:
+            while not (future.running() or future.done()):
+                await asyncio.sleep(START_POLL_SECONDS)
+            result, wait_s, run_s = await asyncio.wait_for(
+                asyncio.wrap_future(future), self.timeout
+            )
+        except TimeoutError:
+            metrics.incr("ocr.timeouts")
+            raise OCRProcessingError(
+                f"O processamento da imagem excedeu o tempo limite de {self.timeout:.0f}s."
+            )
+        finally:
+            # No-op once the job has started; drops it from the queue otherwise
+            future.cancel()
+
+        metrics.observe("ocr.wait", wait_s * 1000)
+        metrics.observe("ocr.run", run_s * 1000)
+        return result
+
+    def _release(self) -> None:
+        self._admitted -= 1
+        metrics.set_gauge("ocr.queue_depth", self._admitted)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+ocr_pool = OCRWorkerPool(
+    workers=settings.OCR_WORKERS,
+    max_queue=settings.OCR_MAX_QUEUE,
+    timeout=settings.OCR_TIMEOUT_SECONDS,
+    use_processes=settings.OCR_USE_PROCESSES,
+    engine=settings.OCR_ENGINE,
+)
+
+
 class OCRService:
     """Service for processing images and extracting text using Tesseract OCR."""
 
@@ -57,23 +470,35 @@ class OCRService:
         Returns:
             Preprocessed image as numpy array
         """
-        # Convert bytes directly to numpy array for OpenCV
-        nparr = np.frombuffer(image_bytes, np.uint8)
+        image, timings = await ocr_pool.run(_preprocess, image_bytes, preprocess_pipeline)
+        _record_stage_timings(timings)
+        return image
 
-        # Decode image
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    @staticmethod
+    @handle_ocr_errors
+    async def read_qr_code(image_bytes: bytes) -> NFCeReceipt | None:
+        """
+        Look for an NFC-e QR code in the image, which is much cheaper than full-page OCR.
 
-        if image is None:
-            raise InvalidImageError("Failed to decode image. File may be corrupted.")
+        Args:
+            image_bytes: Raw image bytes
 
-        # Convert to grayscale
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        Returns:
+            The structured receipt fields, or None if there is no NFC-e QR code
+        """
 
-        # Apply binary thresholding with Otsu's method
-        # This makes text black and background white, improving accuracy
-        gray = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)[1]
+        async def read() -> dict:
+            payload, timings = await ocr_pool.run(_read_qr, image_bytes)
+            _record_stage_timings(timings)
+            return {"payload": payload}
 
-        return gray
+        cached = await result_cache.get_or_compute("qr", image_bytes, read)
+        payload = cached["payload"]
+        receipt = parse_nfce_qr(payload) if payload else None
+        metrics.incr("ocr.qr_hits" if receipt else "ocr.qr_misses")
+        if receipt:
+            logger.info(f"NFC-e QR code found (total: {receipt.total})")
+        return receipt
 
     @staticmethod
     @handle_ocr_errors
@@ -94,30 +519,32 @@ class OCRService:
         """
         logger.info(f"Starting OCR text extraction with language: {lang}")
 
-        # Preprocess image
-        processed_image = await OCRService.preprocess_image(image_bytes)
+        async def recognize() -> dict:
+            text, confidence, timings = await ocr_pool.run(
+                _recognize,
+                image_bytes,
+                lang,
+                ocr_pool.timeout,
+                ocr_pool.engine,
+                preprocess_pipeline,
+            )
+            _record_stage_timings(timings)
+            return {"text": text, "confidence": confidence}
 
-        # Configure Tesseract
-        # --oem 3: Use default OCR Engine mode (LSTM)
-        # --psm 3: Automatic page segmentation (good for receipts)
-        custom_config = r"--oem 3 --psm 3"
+        fingerprint = None
+        if settings.RESULT_CACHE_PERCEPTUAL_HASH:
 
-        # Extract text
-        text = pytesseract.image_to_string(processed_image, lang=lang, config=custom_config)
+            async def fingerprint() -> str | None:
+                return await ocr_pool.run(_image_dhash, image_bytes)
 
-        # Get confidence data for quality assessment
-        data = pytesseract.image_to_data(
-            processed_image,
-            lang=lang,
-            config=custom_config,
-            output_type=pytesseract.Output.DICT,
+        # Anything that changes the OCR output is part of the cache key
+        pipeline = preprocess_pipeline
+        kind = (
+            f"ocr:{lang}:{ocr_pool.engine}:{','.join(pipeline.stages)}:"
+            f"{pipeline.target_text_height}"
         )
-
-        # Calculate average confidence
-        confidences = [float(conf) for conf in data["conf"] if conf != "-1"]
-        avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
-
-        extracted_text = text.strip()
+        result = await result_cache.get_or_compute(kind, image_bytes, recognize, fingerprint)
+        extracted_text, avg_confidence = result["text"], result["confidence"]
 
         # Check if any text was extracted
         if not extracted_text:
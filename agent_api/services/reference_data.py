@@ -0,0 +1,106 @@
+import asyncio
+import time
+from dataclasses import dataclass, field, replace
+
+import httpx
+
+from agent_api.core.http_client import http_client_manager
+from agent_api.core.logger import get_logger
+from agent_api.settings import settings
+
+logger = get_logger(__name__)
+
+FALLBACK_CATEGORIES = (
+    "alimentacao, comer_fora, farmacia, mercado, transporte, moradia, saude, lazer, educação, "
+    "compras, vestuario, viagem, serviços, crianças, outros"
+).split(", ")
+FALLBACK_PAYMENT_METHODS = ["itau", "nubank", "picpay", "xp", "c6", "pix"]
+
+
+@dataclass(frozen=True)
+class ReferenceData:
+    categories: tuple[str, ...]
+    payment_methods: tuple[str, ...]
+    owners: tuple[str, ...]
+    version: int = field(default=0, compare=False)
+
+
+class ReferenceDataCache:
+    """Categories, payment methods and owners used to build the system prompt.
+
+    Values are served from memory. Once older than ``ttl_seconds`` they are still served
+    while a single background task refreshes them (stale-while-revalidate), so the finance
+    API is only waited on when nothing has been loaded yet. ``invalidate`` marks the data
+    stale immediately; finance_api calls it after category or payment-method writes.
+    ``version`` only changes when the values do, so anything derived from them can be
+    cached per version.
+    """
+
+    def __init__(self, ttl_seconds: float, owners: list[str]):
+        self.ttl_seconds = ttl_seconds
+        self._owners = tuple(owners)
+        self._data: ReferenceData | None = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task | None = None
+
+    def _is_stale(self) -> bool:
+        return time.monotonic() - self._loaded_at >= self.ttl_seconds
+
+    async def get(self) -> ReferenceData:
+        if self._data is None:
+            async with self._lock:
+                if self._data is None:
+                    await self._refresh()
+        elif self._is_stale():
+            self._schedule_refresh()
+        return self._data
+
+    def invalidate(self) -> None:
+        self._loaded_at = 0.0
+        if self._data is not None:
+            self._schedule_refresh()
+
+    def _schedule_refresh(self) -> None:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+
+    async def _fetch_keys(self, client: httpx.AsyncClient, path: str) -> list[str] | None:
+        try:
+            response = await client.get(f"{settings.FINANCE_SERVICE_URL}/{path}/?size=1000")
+            if response.status_code == 200:
+                return [item["key"] for item in response.json().get("items", [])]
+            logger.warning(f"Failed to fetch {path}: HTTP {response.status_code}")
+        except Exception as e:
+            logger.warning(f"Failed to fetch {path}: {e}")
+        return None
+
+    async def _refresh(self) -> None:
+        client = http_client_manager.get_client()
+        categories, payment_methods = await asyncio.gather(
+            self._fetch_keys(client, "categories"),
+            self._fetch_keys(client, "payment-methods"),
+        )
+
+        previous = self._data
+        data = ReferenceData(
+            categories=tuple(
+                categories or (previous.categories if previous else FALLBACK_CATEGORIES)
+            ),
+            payment_methods=tuple(
+                payment_methods
+                or (previous.payment_methods if previous else FALLBACK_PAYMENT_METHODS)
+            ),
+            owners=self._owners,
+        )
+        if previous is None or data != previous:
+            version = previous.version + 1 if previous else 1
+            self._data = replace(data, version=version)
+            logger.info(f"Reference data loaded (version {version})")
+        self._loaded_at = time.monotonic()
+
+
+reference_data_cache = ReferenceDataCache(
+    ttl_seconds=settings.REFERENCE_DATA_TTL_SECONDS,
+    owners=[owner.strip() for owner in settings.PAYMENT_OWNERS.split(",") if owner.strip()],
+)
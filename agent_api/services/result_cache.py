@@ -0,0 +1,142 @@
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+
+from agent_api.core.database import AsyncSessionLocal
+from agent_api.core.logger import get_logger
+from agent_api.core.metrics import metrics
+from agent_api.repositories.media_cache_repository import MediaCacheRepository
+from agent_api.settings import settings
+
+logger = get_logger(__name__)
+
+# Expired rows are deleted from Postgres every this many writes
+PURGE_EVERY_WRITES = 100
+
+
+def content_key(kind: str, content: bytes) -> str:
+    return f"{kind}:{hashlib.sha256(content).hexdigest()}"
+
+
+class ResultCache:
+    """Results derived from uploaded media (OCR text, QR fields, transcriptions).
+
+    Entries are keyed by ``kind`` (the operation plus the settings that affect its
+    output) and the SHA-256 of the uploaded bytes, so a forwarded or resent file is
+    answered without redoing the work. Lookups go to a bounded in-memory LRU first and
+    then, with ``persist``, to the ``media_cache`` table, which survives restarts; both
+    tiers expire entries after ``ttl_seconds``. Postgres errors only count as misses.
+
+    Callers may also pass a ``fingerprint`` (e.g. a perceptual hash of a photo), which is
+    stored as a second key so re-encoded copies of the same image hit as well.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 86400, persist: bool = True):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persist = persist
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._writes = 0
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _get_memory(self, key: str) -> dict | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _set_memory(self, key: str, value: dict, expires_at: float) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _get_stored(self, key: str) -> dict | None:
+        try:
+            async with AsyncSessionLocal() as session:
+                return await MediaCacheRepository(session).get(key)
+        except Exception as e:
+            metrics.incr("result_cache.store_errors")
+            logger.warning(f"Media cache lookup failed: {e}")
+            return None
+
+    async def _set_stored(self, keys: list[str], kind: str, value: dict) -> None:
+        expires_at = datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+        try:
+            async with AsyncSessionLocal() as session:
+                repo = MediaCacheRepository(session)
+                await repo.put(keys, kind, value, expires_at)
+                self._writes += 1
+                if self._writes % PURGE_EVERY_WRITES == 0:
+                    await repo.purge_expired()
+        except Exception as e:
+            metrics.incr("result_cache.store_errors")
+            logger.warning(f"Media cache write failed: {e}")
+
+    async def get(self, key: str) -> dict | None:
+        value = self._get_memory(key)
+        if value is None and self.persist:
+            value = await self._get_stored(key)
+            if value is not None:
+                self._set_memory(key, value, time.time() + self.ttl_seconds)
+        return value
+
+    async def lookup(
+        self,
+        kind: str,
+        content: bytes,
+        fingerprint: Callable[[], Awaitable[str | None]] | None = None,
+    ) -> tuple[list[str], dict | None]:
+        """Find a cached result for ``content``; returns the keys to ``store`` it under."""
+        keys = [content_key(kind, content)]
+        value = await self.get(keys[0])
+
+        if value is None and fingerprint is not None:
+            alias = await fingerprint()
+            if alias:
+                keys.append(f"{kind}:p:{alias}")
+                value = await self.get(keys[1])
+
+        outcome = "hits" if value is not None else "misses"
+        metrics.incr(f"result_cache.{outcome}")
+        metrics.incr(f"result_cache.{kind.split(':')[0]}.{outcome}")
+        if value is not None:
+            logger.info(f"Result cache hit for {kind}")
+        return keys, value
+
+    async def store(self, kind: str, keys: list[str], value: dict) -> None:
+        expires_at = time.time() + self.ttl_seconds
+        for key in keys:
+            self._set_memory(key, value, expires_at)
+        if self.persist:
+            await self._set_stored(keys, kind, value)
+
+    async def get_or_compute(
+        self,
+        kind: str,
+        content: bytes,
+        compute: Callable[[], Awaitable[dict]],
+        fingerprint: Callable[[], Awaitable[str | None]] | None = None,
+    ) -> dict:
+        """Return the cached result for ``content`` or compute, store and return it."""
+        keys, value = await self.lookup(kind, content, fingerprint)
+        if value is None:
+            value = await compute()
+            await self.store(kind, keys, value)
+        return value
+
+
+result_cache = ResultCache(
+    max_entries=settings.RESULT_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.RESULT_CACHE_TTL_SECONDS,
+    persist=settings.RESULT_CACHE_PERSIST,
+)
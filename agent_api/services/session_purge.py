@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from agent_api.core.database import AsyncSessionLocal
+from agent_api.core.logger import get_logger
+from agent_api.core.metrics import metrics
+from agent_api.repositories.chat_repository import ChatRepository
+from agent_api.settings import settings
+
+logger = get_logger(__name__)
+
+
+class SessionPurgeJob:
+    """Periodic deletion of expired chat sessions and their messages.
+
+    Every ``interval_seconds`` sessions idle for longer than ``idle_ttl_seconds`` or
+    completed more than ``completed_retention_seconds`` ago are deleted in batches of
+    ``batch_size``, each in its own short transaction, with ``pause_seconds`` between
+    batches so the purge never competes with chat traffic for the disk. The first run
+    happens one interval after ``start``; ``interval_seconds=0`` disables the job.
+    """
+
+    def __init__(
+        self,
+        idle_ttl_seconds: float,
+        completed_retention_seconds: float,
+        interval_seconds: float = 3600,
+        batch_size: int = 200,
+        pause_seconds: float = 0.5,
+        session_factory=AsyncSessionLocal,
+    ):
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.completed_retention_seconds = completed_retention_seconds
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.pause_seconds = pause_seconds
+        self._session_factory = session_factory
+        self._task: asyncio.Task | None = None
+
+    async def run_once(self) -> int:
+        now = datetime.utcnow()
+        idle_before = now - timedelta(seconds=self.idle_ttl_seconds)
+        completed_before = now - timedelta(seconds=self.completed_retention_seconds)
+
+        purged = 0
+        with metrics.timer("chat.purge"):
+            while True:
+                async with self._session_factory() as db:
+                    deleted = await ChatRepository(db).purge_sessions(
+                        idle_before, completed_before, self.batch_size
+                    )
+                purged += deleted
+                metrics.incr("chat.purged_sessions", deleted)
+                if deleted < self.batch_size:
+                    break
+                await asyncio.sleep(self.pause_seconds)
+
+        if purged:
+            logger.info(f"Session purge removed {purged} chat sessions")
+        return purged
+
+    async def _run_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.run_once()
+            except Exception as e:
+                metrics.incr("chat.purge_errors")
+                logger.warning(f"Session purge failed, retrying next interval: {e}")
+
+    def start(self) -> None:
+        if self.interval_seconds > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+session_purge_job = SessionPurgeJob(
+    idle_ttl_seconds=settings.CHAT_SESSION_IDLE_TTL_SECONDS,
+    completed_retention_seconds=settings.CHAT_COMPLETED_SESSION_RETENTION_SECONDS,
+    interval_seconds=settings.CHAT_PURGE_INTERVAL_SECONDS,
+    batch_size=settings.CHAT_PURGE_BATCH_SIZE,
+    pause_seconds=settings.CHAT_PURGE_PAUSE_SECONDS,
+)
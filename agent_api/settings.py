@@ -6,8 +6,63 @@ class AgentApiSettings(BaseSettings):
 
     GOOGLE_API_KEY: str | None = None
     MODEL_NAME: str = "gemini-3-flash"
+    # "google" or "fake" (local canned responses, for benchmarks)
+    LLM_PROVIDER: str = "google"
+    LLM_MAX_CONCURRENCY: int = 4
+    LLM_MAX_QUEUE: int = 32
     FINANCE_SERVICE_URL: str = "http://localhost:8000"
     DATABASE_URL: str
+    # Speech-to-text (faster-whisper)
+    WHISPER_MODEL: str = "base"
+    WHISPER_COMPUTE_TYPE: str = "int8"
+    WHISPER_WORKERS: int = 1
+    WHISPER_MAX_QUEUE: int = 4
+    WHISPER_CHUNK_SECONDS: float = 30
+    WHISPER_PRELOAD: bool = False
+    # Optional model ladder, smallest first (e.g. "tiny:int8,base:int8,small:int8");
+    # empty means only WHISPER_MODEL/WHISPER_COMPUTE_TYPE
+    WHISPER_MODELS: str = ""
+    WHISPER_TARGET_LATENCY_SECONDS: float = 5.0
+    WHISPER_SHORT_CLIP_SECONDS: float = 10.0
+    WHISPER_MIN_AVG_LOGPROB: float = -1.0
+    WHISPER_MAX_NO_SPEECH_PROB: float = 0.6
+    # OCR worker processes (0 = one per CPU) and their admission queue
+    OCR_WORKERS: int = 0
+    OCR_MAX_QUEUE: int = 8
+    OCR_TIMEOUT_SECONDS: float = 30.0
+    OCR_USE_PROCESSES: bool = True
+    # "tesseract" (CLI, one pass per image) or "tesserocr" (persistent engine per worker)
+    OCR_ENGINE: str = "tesseract"
+    # Receipt preprocessing stages, in order: crop, deskew, downscale, otsu | adaptive.
+    # "otsu" matches the original pipeline; enable more after checking `make benchmark-ocr`
+    OCR_PREPROCESS_STAGES: str = "otsu"
+    OCR_TARGET_TEXT_HEIGHT: int = 32
+    # Read NFC-e QR codes before OCR and skip Tesseract when they carry the total
+    OCR_QR_FAST_PATH: bool = True
+    # Cache of OCR / transcription results keyed by the uploaded file's hash
+    RESULT_CACHE_MAX_ENTRIES: int = 256
+    RESULT_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    RESULT_CACHE_PERSIST: bool = True
+    # Also match re-encoded photos by a perceptual hash (dHash) of the image
+    RESULT_CACHE_PERCEPTUAL_HASH: bool = False
+    # Chat memory: recent messages sent verbatim, older ones folded into a summary
+    CHAT_HISTORY_WINDOW: int = 10
+    CHAT_SUMMARY_MAX_CHARS: int = 1500
+    CHAT_SUMMARY_LINE_MAX_CHARS: int = 200
+    # Answer before the turn is committed (it is written in the background)
+    CHAT_WRITE_BEHIND: bool = False
+    # Answer well-formed expense messages with the local parser instead of the LLM
+    CHAT_LOCAL_PARSER: bool = True
+    # Session lifecycle: idle sessions expire, completed ones are kept briefly; the purge
+    # job deletes both in rate-limited batches (interval 0 disables it)
+    CHAT_SESSION_IDLE_TTL_SECONDS: int = 7 * 24 * 3600
+    CHAT_COMPLETED_SESSION_RETENTION_SECONDS: int = 24 * 3600
+    CHAT_PURGE_INTERVAL_SECONDS: float = 3600
+    CHAT_PURGE_BATCH_SIZE: int = 200
+    CHAT_PURGE_PAUSE_SECONDS: float = 0.5
+    # Reference data (categories, payment methods) used in the system prompt
+    REFERENCE_DATA_TTL_SECONDS: int = 300
+    PAYMENT_OWNERS: str = "joao_lucas,lailla"
 
 
 settings = AgentApiSettings()
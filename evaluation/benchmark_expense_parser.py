@@ -0,0 +1,157 @@
+"""Hit-rate/accuracy benchmark for the local expense parser.
+
+Runs every message of a recorded corpus through the fast path the chat uses before
+calling the LLM and reports how many it answers locally, how often those answers are
+right and how long parsing takes.
+
+Usage:
+    uv run python evaluation/benchmark_expense_parser.py
+    uv run python evaluation/benchmark_expense_parser.py my_corpus.jsonl --verbose
+
+The corpus is JSON lines with ``message`` and ``expected``: the SpendingDetails fields
+the message states (``valor``, ``categoria``, ``metodo_pagamento``, ``proprietário``,
+``item_comprado``, ``local_compra``; partial is fine) or ``null`` when it should be left
+to the LLM (questions, corrections, several expenses...). Messages recorded by the chat
+can be exported with:
+
+    psql "$DATABASE_URL" -At -c "SELECT json_build_object('message', content, 'expected',
+        null) FROM chat_messages WHERE role = 'user'" > corpus.jsonl
+
+and then labelled by hand. Categories and payment methods are the fallback lists of
+agent_api (``--categories``/``--payment-methods`` to override), owners come from
+PAYMENT_OWNERS.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from agent_api.services.expense_parser import SLOT_LABELS, ExpenseFastPath
+from agent_api.services.reference_data import (
+    FALLBACK_CATEGORIES,
+    FALLBACK_PAYMENT_METHODS,
+    ReferenceData,
+)
+from agent_api.settings import settings
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent / "data" / "expense_messages.jsonl"
+
+
+class StaticReferenceData:
+    """Stand-in for the reference data cache, without the finance API."""
+
+    def __init__(self, data: ReferenceData):
+        self.data = data
+
+    async def get(self) -> ReferenceData:
+        return self.data
+
+
+def load_corpus(path: Path) -> list[dict]:
+    with path.open() as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _split(raw: str | None, default: list[str]) -> tuple[str, ...]:
+    return tuple(item.strip() for item in raw.split(",")) if raw else tuple(default)
+
+
+async def benchmark(corpus: list[dict], fast_path: ExpenseFastPath, verbose: bool) -> dict:
+    latencies, mistakes = [], []
+    hits = correct = false_hits = missed = 0
+    slot_total = dict.fromkeys(SLOT_LABELS, 0)
+    slot_right = dict.fromkeys(SLOT_LABELS, 0)
+
+    for sample in corpus:
+        start = time.perf_counter()
+        result = await fast_path.answer(sample["message"], {})
+        latencies.append((time.perf_counter() - start) * 1e6)
+        expected = sample["expected"]
+
+        if result is None:
+            missed += expected is not None
+            if verbose and expected is not None:
+                mistakes.append(f"MISS   {sample['message']}")
+            continue
+
+        hits += 1
+        _, slots = result
+        if expected is None:
+            false_hits += 1
+            mistakes.append(f"FALSE  {sample['message']} -> {slots}")
+            continue
+        for slot in expected:
+            slot_total[slot] += 1
+            slot_right[slot] += slots.get(slot) == expected[slot]
+        if slots == expected:
+            correct += 1
+        else:
+            mistakes.append(
+                f"WRONG  {sample['message']}\n       got {slots}\n  expected {expected}"
+            )
+
+    return {
+        "messages": len(corpus),
+        "hits": hits,
+        "correct": correct,
+        "false_hits": false_hits,
+        "missed": missed,
+        "slots": {slot: (slot_right[slot], slot_total[slot]) for slot in SLOT_LABELS},
+        "mean_us": statistics.mean(latencies) if latencies else 0.0,
+        "p95_us": statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else 0.0,
+        "mistakes": mistakes,
+    }
+
+
+def print_report(result: dict) -> None:
+    total, hits = result["messages"], result["hits"]
+    print(f"\nmessages         {total}")
+    print(f"answered locally {hits} ({hits / total * 100:.1f}% hit rate)")
+    if hits:
+        print(f"exactly right    {result['correct']} ({result['correct'] / hits * 100:.1f}%)")
+    print(f"false hits       {result['false_hits']} (should have gone to the LLM)")
+    print(f"missed           {result['missed']} (parseable, sent to the LLM)")
+    print(f"parse time       mean {result['mean_us']:.0f} µs, p95 {result['p95_us']:.0f} µs")
+    print("\nslot accuracy on local answers")
+    for slot, (right, count) in result["slots"].items():
+        if count:
+            print(f"  {slot:<17} {right}/{count}")
+    if result["mistakes"]:
+        print("\n" + "\n".join(result["mistakes"]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("corpus", type=Path, nargs="?", default=DEFAULT_CORPUS)
+    parser.add_argument("--categories", help="Comma-separated category keys")
+    parser.add_argument("--payment-methods", help="Comma-separated payment method keys")
+    parser.add_argument("--verbose", action="store_true", help="Also list missed messages")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    data = ReferenceData(
+        categories=_split(args.categories, FALLBACK_CATEGORIES),
+        payment_methods=_split(args.payment_methods, FALLBACK_PAYMENT_METHODS),
+        owners=_split(settings.PAYMENT_OWNERS, []),
+        version=1,
+    )
+    corpus = load_corpus(args.corpus)
+    print(f"Benchmarking {len(corpus)} messages from {args.corpus}")
+    result = asyncio.run(
+        benchmark(corpus, ExpenseFastPath(StaticReferenceData(data)), args.verbose)
+    )
+    print_report(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Latency/accuracy benchmark for the receipt preprocessing stages.
+
+Runs every image in a folder through several preprocessing pipelines (from the plain
+grayscale + Otsu baseline up to crop + deskew + downscale) and reports, per pipeline,
+the mean time of each stage, the Tesseract time, the confidence and the accuracy.
+
+Usage:
+    uv run python evaluation/benchmark_ocr.py ~/Downloads/notas --lang por
+    uv run python evaluation/benchmark_ocr.py ~/Downloads/notas --pipeline custom=crop,adaptive
+
+Ground truth is optional: a ``expected.csv`` in the folder with ``image,expected`` rows
+(e.g. ``nota_008.jpg,13,20``). ``hit`` is the share of images whose expected text shows up
+in the OCR output; ``accuracy`` is the character similarity also used in
+``test_ocr_quality.ipynb``. With ``--skip-ocr`` only the preprocessing is timed.
+"""
+
+import argparse
+import csv
+import statistics
+import sys
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from agent_api.services.ocr import (
+    ALLOWED_EXTENSIONS,
+    PreprocessPipeline,
+    _recognize_cli,
+)
+
+DEFAULT_PIPELINES = {
+    "baseline": "otsu",
+    "+crop": "crop,otsu",
+    "+deskew": "crop,deskew,otsu",
+    "+downscale": "crop,deskew,downscale,otsu",
+    "adaptive": "crop,deskew,downscale,adaptive",
+}
+
+
+def _normalize(text: str) -> str:
+    return "".join(text.lower().split())
+
+
+def calculate_accuracy(extracted_text: str, ground_truth: str) -> float:
+    """Character-level similarity between extracted and ground truth text (0-100)."""
+    return SequenceMatcher(None, _normalize(extracted_text), _normalize(ground_truth)).ratio() * 100
+
+
+def load_ground_truth(folder: Path) -> dict[str, str]:
+    expected_file = folder / "expected.csv"
+    if not expected_file.exists():
+        return {}
+    with expected_file.open(newline="") as f:
+        return {row[0]: ",".join(row[1:]) for row in csv.reader(f) if len(row) > 1}
+
+
+def benchmark_pipeline(
+    pipeline: PreprocessPipeline,
+    images: list[Path],
+    expected: dict[str, str],
+    lang: str,
+    skip_ocr: bool,
+) -> dict:
+    stage_times: dict[str, list[float]] = {}
+    confidences, accuracies, hits = [], [], []
+
+    for image_path in images:
+        processed, timings = pipeline.run(image_path.read_bytes())
+        if not skip_ocr:
+            start = time.perf_counter()
+            text, confidence = _recognize_cli(processed, lang, timeout=60)
+            timings["recognize"] = (time.perf_counter() - start) * 1000
+            confidences.append(confidence)
+            if image_path.name in expected:
+                truth = expected[image_path.name]
+                accuracies.append(calculate_accuracy(text, truth))
+                hits.append(_normalize(truth) in _normalize(text))
+        for stage, elapsed_ms in timings.items():
+            stage_times.setdefault(stage, []).append(elapsed_ms)
+
+    return {
+        "stages": {stage: statistics.mean(times) for stage, times in stage_times.items()},
+        "total_ms": sum(statistics.mean(times) for times in stage_times.values()),
+        "confidence": statistics.mean(confidences) if confidences else None,
+        "accuracy": statistics.mean(accuracies) if accuracies else None,
+        "hit": sum(hits) / len(hits) * 100 if hits else None,
+    }
+
+
+def _fmt(value: float | None) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+
+def print_report(results: dict[str, dict]) -> None:
+    print(
+        f"\n{'pipeline':<12} {'total ms':>9} {'conf %':>7} {'acc %':>7} {'hit %':>7}  stages (ms)"
+    )
+    print("-" * 100)
+    for name, result in results.items():
+        stages = "  ".join(f"{stage}={ms:.1f}" for stage, ms in result["stages"].items())
+        print(
+            f"{name:<12} {result['total_ms']:>9.1f} {_fmt(result['confidence']):>7} "
+            f"{_fmt(result['accuracy']):>7} {_fmt(result['hit']):>7}  {stages}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("folder", type=Path, help="Folder with receipt images")
+    parser.add_argument("--lang", default="por", help="Tesseract language (default: por)")
+    parser.add_argument(
+        "--pipeline",
+        action="append",
+        default=[],
+        metavar="NAME=STAGES",
+        help="Extra pipeline to compare, e.g. custom=crop,adaptive (repeatable)",
+    )
+    parser.add_argument("--target-text-height", type=int, default=32)
+    parser.add_argument("--skip-ocr", action="store_true", help="Only time the preprocessing")
+    args = parser.parse_args()
+
+    images = sorted(
+        path for path in args.folder.iterdir() if path.suffix.lower() in ALLOWED_EXTENSIONS
+    )
+    if not images:
+        parser.error(f"No images found in {args.folder}")
+    expected = load_ground_truth(args.folder)
+
+    pipelines = dict(DEFAULT_PIPELINES)
+    for raw in args.pipeline:
+        name, _, stages = raw.partition("=")
+        pipelines[name] = stages
+
+    print(f"Benchmarking {len(images)} images ({len(expected)} with ground truth)")
+    results = {
+        name: benchmark_pipeline(
+            PreprocessPipeline.parse(stages, target_text_height=args.target_text_height),
+            images,
+            expected,
+            args.lang,
+            args.skip_ocr,
+        )
+        for name, stages in pipelines.items()
+    }
+    print_report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""Recompute ``spend_rollups`` from scratch.
+
+Usage: ``python -m finance_api.commands.rebuild_rollups``
+
+Safe to run at any time; it also creates the table on databases initialized before it existed.
+"""
+
+import asyncio
+
+from finance_api.core.database import AsyncSessionLocal, engine
+from finance_api.core.logger import get_logger
+from finance_api.models.spend_rollups import SpendRollup
+from finance_api.repositories.spend_rollups import SpendRollupRepository
+
+logger = get_logger(__name__)
+
+
+async def rebuild_rollups() -> int:
+    async with engine.begin() as conn:
+        await conn.run_sync(SpendRollup.__table__.create, checkfirst=True)
+
+    async with AsyncSessionLocal() as session:
+        return await SpendRollupRepository(session).rebuild()
+
+
+def main() -> None:
+    rebuilt = asyncio.run(rebuild_rollups())
+    logger.info(f"spend_rollups rebuilt with {rebuilt} rows")
+
+
+if __name__ == "__main__":
+    main()
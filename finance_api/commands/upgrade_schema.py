@@ -0,0 +1,55 @@
+"""Bring an existing finance_api database up to the current schema.
+
+Usage: ``python -m finance_api.commands.upgrade_schema``
+
+``infra/db/init.sql`` only runs when the Postgres volume is created, so databases
+initialized before the ``spents`` date indexes and the ``spend_rollups`` table existed
+need this once, before the new finance API starts: every spent write maintains the
+rollups. The rollups are then rebuilt from ``spents``. Every statement is idempotent;
+it is safe to run at any time.
+"""
+
+import asyncio
+
+from sqlalchemy import text
+
+from finance_api.core.database import AsyncSessionLocal, engine
+from finance_api.core.logger import get_logger
+from finance_api.repositories.spend_rollups import SpendRollupRepository
+
+logger = get_logger(__name__)
+
+# Keep in sync with infra/db/init.sql
+UPGRADE_STATEMENTS = (
+    "CREATE INDEX IF NOT EXISTS ix_spents_created_at ON spents (created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_spents_payment_method_created_at"
+    " ON spents (payment_method, created_at)",
+    """CREATE TABLE IF NOT EXISTS spend_rollups (
+        spend_day DATE NOT NULL,
+        category VARCHAR NOT NULL,
+        payment_method VARCHAR NOT NULL,
+        total DOUBLE PRECISION NOT NULL DEFAULT 0,
+        count INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (spend_day, category, payment_method)
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_spend_rollups_payment_method_day"
+    " ON spend_rollups (payment_method, spend_day)",
+)
+
+
+async def upgrade_schema() -> int:
+    async with engine.begin() as conn:
+        for statement in UPGRADE_STATEMENTS:
+            await conn.execute(text(statement))
+
+    async with AsyncSessionLocal() as session:
+        return await SpendRollupRepository(session).rebuild()
+
+
+def main() -> None:
+    rebuilt = asyncio.run(upgrade_schema())
+    logger.info(f"finance_api schema upgraded, spend_rollups rebuilt with {rebuilt} rows")
+
+
+if __name__ == "__main__":
+    main()
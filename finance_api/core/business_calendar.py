@@ -0,0 +1,83 @@
+from bisect import bisect_left
+from datetime import date
+from typing import Iterable, Optional
+
+import holidays
+
+from finance_api.core.logger import get_logger
+from finance_api.settings import settings
+
+logger = get_logger(__name__)
+
+
+class BusinessCalendar:
+    """Precomputed Brazilian business days for a rolling window of years.
+
+    Business days are kept as a sorted list of ordinals, so "next business day on
+    or after D" is a binary search instead of a day-by-day walk over ``holidays.BR()``.
+    Dates outside the window extend it on demand.
+    """
+
+    def __init__(
+        self,
+        subdivision: Optional[str] = None,
+        extra_holidays: Iterable[date] = (),
+        years_back: int = 2,
+        years_ahead: int = 3,
+        today: Optional[date] = None,
+    ):
+        self.subdivision = subdivision
+        self.extra_holidays = frozenset(extra_holidays)
+        current_year = (today or date.today()).year
+        self._business_days: list[int] = []
+        self._build(current_year - years_back, current_year + years_ahead)
+
+    def _build(self, start_year: int, end_year: int) -> None:
+        years = range(start_year, end_year + 1)
+        br_holidays = holidays.BR(years=years, subdiv=self.subdivision)
+        non_business = set(br_holidays.keys()) | self.extra_holidays
+
+        business_days = []
+        for ordinal in range(
+            date(start_year, 1, 1).toordinal(), date(end_year, 12, 31).toordinal() + 1
+        ):
+            day = date.fromordinal(ordinal)
+            if day.weekday() < 5 and day not in non_business:
+                business_days.append(ordinal)
+
+        self.start_year = start_year
+        self.end_year = end_year
+        self._business_days = business_days
+        logger.info(
+            f"Business calendar built for {start_year}-{end_year} "
+            f"({len(business_days)} business days, subdivision={self.subdivision})"
+        )
+
+    def _ensure_covers(self, day: date) -> None:
+        # One extra year ahead so the next business day after late December is covered
+        if day.year < self.start_year or day.year + 1 > self.end_year:
+            self._build(min(self.start_year, day.year), max(self.end_year, day.year + 1))
+
+    def is_business_day(self, day: date) -> bool:
+        self._ensure_covers(day)
+        ordinal = day.toordinal()
+        idx = bisect_left(self._business_days, ordinal)
+        return idx < len(self._business_days) and self._business_days[idx] == ordinal
+
+    def next_business_day(self, day: date) -> date:
+        """Return ``day`` itself if it is a business day, otherwise the next one."""
+        self._ensure_covers(day)
+        idx = bisect_left(self._business_days, day.toordinal())
+        return date.fromordinal(self._business_days[idx])
+
+
+def _parse_extra_holidays(raw: str) -> list[date]:
+    return [date.fromisoformat(item.strip()) for item in raw.split(",") if item.strip()]
+
+
+business_calendar = BusinessCalendar(
+    subdivision=settings.BUSINESS_CALENDAR_SUBDIVISION,
+    extra_holidays=_parse_extra_holidays(settings.BUSINESS_CALENDAR_EXTRA_HOLIDAYS),
+    years_back=settings.BUSINESS_CALENDAR_YEARS_BACK,
+    years_ahead=settings.BUSINESS_CALENDAR_YEARS_AHEAD,
+)
@@ -0,0 +1,109 @@
+import hashlib
+import time
+from datetime import date, datetime
+from typing import Dict, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import Response
+
+from finance_api.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+CATEGORIES = "categories"
+PAYMENT_METHODS = "payment_methods"
+SPENDING_LIMITS = "spending_limits"
+SPENTS = "spents"
+SUBSCRIPTIONS = "subscriptions"
+INVOICES = "invoices"
+
+ALL_TABLES = (CATEGORIES, PAYMENT_METHODS, SPENDING_LIMITS, SPENTS, SUBSCRIPTIONS, INVOICES)
+
+# Tables each route prefix reads from. Dashboards and the limits status mix several
+# tables, so those prefixes depend on all of them.
+PREFIX_TABLES: Dict[str, Tuple[str, ...]] = {
+    "/categories": (CATEGORIES,),
+    "/payment-methods": (PAYMENT_METHODS,),
+    "/subscriptions": (SUBSCRIPTIONS,),
+    "/invoices": (INVOICES, PAYMENT_METHODS),
+    "/limits": ALL_TABLES,
+    "/spents": ALL_TABLES,
+}
+
+# Routes that compare rows with the current time (an installment counts as passed once its
+# created_at is reached), so their response changes without any write.
+UNCACHED_PATHS = frozenset({"/spents/installments-summary"})
+
+LOCAL_TIMEZONE = ZoneInfo("America/Sao_Paulo")
+
+
+def _today() -> date:
+    return datetime.now(LOCAL_TIMEZONE).date()
+
+
+class TableVersions:
+    """In-process write counters per table.
+
+    Repositories bump a table after every committed write, so a response can be identified
+    by the versions of the tables it reads without querying them again. The start time of
+    the process is part of every key, so counters restarting at zero never reuse an ETag.
+    """
+
+    def __init__(self):
+        self._epoch = f"{time.time_ns():x}"
+        self._versions: Dict[str, int] = {}
+
+    def bump(self, table: str) -> None:
+        self._versions[table] = self._versions.get(table, 0) + 1
+
+    def get(self, table: str) -> int:
+        return self._versions.get(table, 0)
+
+    def key(self, tables: Tuple[str, ...]) -> str:
+        return self._epoch + "".join(f":{table}={self.get(table)}" for table in tables)
+
+
+table_versions = TableVersions()
+
+
+def _tables_for(path: str) -> Optional[Tuple[str, ...]]:
+    if path.rstrip("/") in UNCACHED_PATHS:
+        return None
+    for prefix, tables in PREFIX_TABLES.items():
+        if path == prefix or path.startswith(prefix + "/"):
+            return tables
+    return None
+
+
+class ConditionalGetMiddleware(BaseHTTPMiddleware):
+    """Strong ETags and ``304 Not Modified`` for GET requests on the data routes.
+
+    The ETag is derived from the URL, the accepted encoding, the versions of the tables
+    the route reads and the local date (default periods and invoice calendars follow the
+    day), so a matching ``If-None-Match`` is answered before the route runs: no query, no
+    serialization and no body. Routes in ``UNCACHED_PATHS`` are always run.
+    """
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        tables = _tables_for(request.url.path) if request.method == "GET" else None
+        if tables is None:
+            return await call_next(request)
+
+        gzip = "gzip" in request.headers.get("accept-encoding", "")
+        fingerprint = (
+            f"{table_versions.key(tables)}|{_today()}|"
+            f"{request.url.path}?{request.url.query}|{gzip}"
+        )
+        etag = f'"{hashlib.sha1(fingerprint.encode()).hexdigest()}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in {tag.strip() for tag in if_none_match.split(",")}:
+            return Response(status_code=304, headers=headers)
+
+        response = await call_next(request)
+        if response.status_code == 200:
+            response.headers.update(headers)
+        return response
@@ -0,0 +1,20 @@
+import httpx
+
+from finance_api.core.http_client import get_http_client
+from finance_api.core.logger import get_logger
+from finance_api.settings import settings
+
+logger = get_logger(__name__)
+
+
+async def notify_reference_data_changed() -> None:
+    """Tell agent_api to refresh its cached categories and payment methods.
+
+    Best effort: the agent also refreshes on its own TTL, so failures are only logged.
+    """
+    url = f"{settings.AGENT_SERVICE_URL}/reference-data/invalidate"
+    try:
+        response = await get_http_client().post(url, timeout=2.0)
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        logger.warning(f"Failed to notify reference data change to {url}: {e}")
@@ -1,5 +1,8 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+
+from finance_api.core.cache import ConditionalGetMiddleware
 
 from finance_api.core.exceptions import (
     DatabaseError,
@@ -26,6 +29,10 @@ from finance_api.routers import (
 
 app = FastAPI(title="Flauzino Assistant API")
 
+# Conditional GETs are answered before the route runs; larger bodies are gzipped.
+app.add_middleware(ConditionalGetMiddleware)
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
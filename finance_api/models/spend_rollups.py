@@ -0,0 +1,19 @@
+from datetime import date
+
+from sqlalchemy import Date, Float, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from finance_api.core.database import Base
+
+
+class SpendRollup(Base):
+    """Daily totals of spents per category and payment method (local America/Sao_Paulo day)."""
+
+    __tablename__ = "spend_rollups"
+    __table_args__ = (Index("ix_spend_rollups_payment_method_day", "payment_method", "spend_day"),)
+
+    spend_day: Mapped[date] = mapped_column(Date, primary_key=True)
+    category: Mapped[str] = mapped_column(String, primary_key=True)
+    payment_method: Mapped[str] = mapped_column(String, primary_key=True)
+    total: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
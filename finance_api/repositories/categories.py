@@ -5,7 +5,10 @@ from sqlalchemy import select, update, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from finance_api.models.categories import Category
+from finance_api.repositories.pagination import apply_keyset, count_total
 from finance_api.schemas.categories import CategoryCreate, CategoryUpdate
+from finance_api.schemas.pagination import PageCursor, TotalMode
+from finance_api.core.cache import CATEGORIES, table_versions
 from finance_api.core.logger import get_logger
 
 logger = get_logger(__name__)
@@ -19,22 +22,28 @@ class CategoryRepository:
         new_category = Category(**category_data.model_dump())
         self.db.add(new_category)
         await self.db.commit()
+        table_versions.bump(CATEGORIES)
         await self.db.refresh(new_category)
         logger.info(f"Created category: {new_category.key}")
         return new_category
 
-    async def list(self, skip: int = 0, limit: int = 100) -> tuple[List[Category], int]:
+    async def list(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[PageCursor] = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> tuple[List[Category], Optional[int]]:
         query = select(Category).order_by(Category.display_name)
 
-        # Count query
-        from sqlalchemy import func
+        total = await count_total(self.db, query, total_mode)
 
-        count_query = select(func.count()).select_from(query.subquery())
-        count_result = await self.db.execute(count_query)
-        total = count_result.scalar() or 0
-
-        # Pagination
-        query = query.offset(skip).limit(limit)
+        # Pagination: keyset on (display_name, id) keeps the same order as offset mode
+        if cursor is not None:
+            query = apply_keyset(query, Category.display_name, Category.id, cursor)
+        else:
+            query = query.offset(skip)
+        query = query.limit(limit)
         result = await self.db.execute(query)
         items = list(result.scalars().all())
         logger.info(f"Listed {len(items)} categories")
@@ -51,6 +60,10 @@ class CategoryRepository:
         result = await self.db.execute(select(Category).where(Category.key == key))
         return result.scalar_one_or_none()
 
+    async def list_keys(self) -> set[str]:
+        result = await self.db.execute(select(Category.key))
+        return set(result.scalars().all())
+
     async def update(self, category_id: UUID, update_data: CategoryUpdate) -> Optional[Category]:
         stmt = (
             update(Category)
@@ -60,6 +73,7 @@ class CategoryRepository:
         )
         result = await self.db.execute(stmt)
         await self.db.commit()
+        table_versions.bump(CATEGORIES)
         logger.info(f"Updated category: {category_id}")
         return result.scalar_one_or_none()
 
@@ -67,6 +81,7 @@ class CategoryRepository:
         stmt = delete(Category).where(Category.id == category_id)
         result = await self.db.execute(stmt)
         await self.db.commit()
+        table_versions.bump(CATEGORIES)
         if result.rowcount > 0:
             logger.info(f"Deleted category: {category_id}")
         return result.rowcount > 0
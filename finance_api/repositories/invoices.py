@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from finance_api.models.invoices import Invoice
 from finance_api.schemas.invoices import InvoiceCreate, InvoiceUpdate
+from finance_api.core.cache import INVOICES, table_versions
 from finance_api.core.logger import get_logger
 
 logger = get_logger(__name__)
@@ -19,6 +20,7 @@ class InvoiceRepository:
         new_invoice = Invoice(**invoice.model_dump())
         self.db.add(new_invoice)
         await self.db.commit()
+        table_versions.bump(INVOICES)
         await self.db.refresh(new_invoice)
         logger.info(
             f"Created invoice for {new_invoice.payment_method_key} - {new_invoice.reference_month}"
@@ -44,6 +46,13 @@ class InvoiceRepository:
         result = await self.db.execute(query)
         return list(result.scalars().all())
 
+    async def list_by_months(self, reference_months: List[str]) -> List[Invoice]:
+        query = select(Invoice).where(Invoice.reference_month.in_(reference_months))
+        result = await self.db.execute(query)
+        invoices = list(result.scalars().all())
+        logger.info(f"Listed {len(invoices)} invoices for months {reference_months}")
+        return invoices
+
     async def update(self, invoice_id: UUID, update_data: InvoiceUpdate) -> Optional[Invoice]:
         stmt = (
             update(Invoice)
@@ -53,4 +62,5 @@ class InvoiceRepository:
         )
         result = await self.db.execute(stmt)
         await self.db.commit()
+        table_versions.bump(INVOICES)
         return result.scalar_one_or_none()
@@ -3,11 +3,16 @@ from typing import List, Optional
 
 from uuid import UUID
 
-from sqlalchemy import select, update, delete, func
+from sqlalchemy import and_, false, func, or_, select, update, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from finance_api.models.limits import SpendingLimit
+from finance_api.models.spend_rollups import SpendRollup
+from finance_api.models.subscriptions import Subscription
+from finance_api.repositories.pagination import apply_keyset, count_total
 from finance_api.schemas.limits import SpendingLimitCreate, SpendingLimitUpdate
+from finance_api.schemas.pagination import PageCursor, TotalMode
+from finance_api.core.cache import SPENDING_LIMITS, table_versions
 from finance_api.core.logger import get_logger
 
 logger = get_logger(__name__)
@@ -21,6 +26,7 @@ class SpendingLimitRepository:
         new_limit = SpendingLimit(**limit_data.model_dump())
         self.db.add(new_limit)
         await self.db.commit()
+        table_versions.bump(SPENDING_LIMITS)
         await self.db.refresh(new_limit)
         logger.info(f"Created spending limit: {new_limit.id}")
         return new_limit
@@ -31,7 +37,9 @@ class SpendingLimitRepository:
         limit: int = 100,
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
-    ) -> tuple[List[SpendingLimit], int]:
+        cursor: Optional[PageCursor] = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> tuple[List[SpendingLimit], Optional[int]]:
         query = select(SpendingLimit)
 
         # Note: SpendingLimit doesn't have created_at field currently
@@ -45,11 +53,14 @@ class SpendingLimitRepository:
         #         func.date(func.timezone('America/Sao_Paulo', SpendingLimit.created_at)) <= end_date
         #     )
 
-        count_query = select(func.count()).select_from(query.subquery())
-        count_result = await self.db.execute(count_query)
-        total = count_result.scalar() or 0
+        total = await count_total(self.db, query, total_mode)
 
-        query = query.offset(skip).limit(limit)
+        # SpendingLimit has no created_at, so the keyset uses the unique category key
+        if cursor is not None:
+            query = apply_keyset(query, SpendingLimit.category, SpendingLimit.id, cursor)
+        else:
+            query = query.offset(skip)
+        query = query.limit(limit)
         result = await self.db.execute(query)
         items = list(result.scalars().all())
         logger.info(f"Listed {len(items)} spending limits")
@@ -64,6 +75,60 @@ class SpendingLimitRepository:
             logger.info(f"Retrieved limit for category: {category}")
         return limit
 
+    async def get_status_totals(
+        self, periods: List[tuple[Optional[str], date, date]], category: Optional[str] = None
+    ) -> List[dict]:
+        """Join every limit with the period's spent totals and active subscriptions.
+
+        Periods follow ``SpentRepository.get_dashboard_totals``. Spent totals are read from
+        ``spend_rollups`` and everything is resolved in a single statement.
+        """
+        conditions = []
+        for pm_key, start_d, end_d in periods:
+            condition = SpendRollup.spend_day.between(start_d, end_d)
+            if pm_key is not None:
+                condition = and_(SpendRollup.payment_method == pm_key, condition)
+            conditions.append(condition)
+
+        spent = (
+            select(SpendRollup.category, func.sum(SpendRollup.total).label("spent_total"))
+            .where(or_(*conditions) if conditions else false())
+            .group_by(SpendRollup.category)
+            .subquery()
+        )
+        subscriptions = (
+            select(Subscription.category, func.sum(Subscription.amount).label("subscription_total"))
+            .where(Subscription.is_active)
+            .group_by(Subscription.category)
+            .subquery()
+        )
+        query = (
+            select(
+                SpendingLimit.category,
+                SpendingLimit.amount,
+                func.coalesce(spent.c.spent_total, 0.0).label("spent_total"),
+                func.coalesce(subscriptions.c.subscription_total, 0.0).label("subscription_total"),
+            )
+            .outerjoin(spent, spent.c.category == SpendingLimit.category)
+            .outerjoin(subscriptions, subscriptions.c.category == SpendingLimit.category)
+            .order_by(SpendingLimit.category)
+        )
+        if category:
+            query = query.where(SpendingLimit.category == category)
+
+        result = await self.db.execute(query)
+        rows = result.fetchall()
+        logger.info(f"Computed status of {len(rows)} spending limits")
+        return [
+            {
+                "category": row.category,
+                "limit": float(row.amount),
+                "spent_total": float(row.spent_total or 0),
+                "subscription_total": float(row.subscription_total or 0),
+            }
+            for row in rows
+        ]
+
     async def get_by_id(self, limit_id: UUID) -> Optional[SpendingLimit]:
         result = await self.db.execute(select(SpendingLimit).where(SpendingLimit.id == limit_id))
         limit = result.scalar_one_or_none()
@@ -82,6 +147,7 @@ class SpendingLimitRepository:
         )
         result = await self.db.execute(stmt)
         await self.db.commit()
+        table_versions.bump(SPENDING_LIMITS)
         logger.info(f"Updated spending limit: {limit_id}")
         return result.scalar_one_or_none()
 
@@ -89,6 +155,7 @@ class SpendingLimitRepository:
         stmt = delete(SpendingLimit).where(SpendingLimit.id == limit_id)
         result = await self.db.execute(stmt)
         await self.db.commit()
+        table_versions.bump(SPENDING_LIMITS)
         if result.rowcount > 0:
             logger.info(f"Deleted spending limit: {limit_id}")
         return result.rowcount > 0
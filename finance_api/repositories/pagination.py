@@ -0,0 +1,73 @@
+import json
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import Select, func, select, text, tuple_
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from finance_api.core.exceptions import ValidationError
+from finance_api.schemas.pagination import PageCursor, TotalMode
+
+
+async def count_total(db: AsyncSession, query: Select, total_mode: TotalMode) -> Optional[int]:
+    """Count the rows matched by ``query`` according to ``total_mode``.
+
+    ``ESTIMATED`` reads the planner row estimate through ``EXPLAIN`` instead of
+    scanning the matched rows, which is cheap but only as accurate as the table stats.
+    """
+    if total_mode == TotalMode.NONE:
+        return None
+
+    if total_mode == TotalMode.ESTIMATED:
+        compiled = query.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+        result = await db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    count_query = select(func.count()).select_from(query.order_by(None).subquery())
+    count_result = await db.execute(count_query)
+    return count_result.scalar() or 0
+
+
+def _coerce_cursor_value(column: InstrumentedAttribute, value: str) -> Any:
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    return python_type(value)
+
+
+def apply_keyset(
+    query: Select,
+    sort_column: InstrumentedAttribute,
+    id_column: InstrumentedAttribute,
+    cursor: PageCursor,
+    descending: bool = False,
+) -> Select:
+    """Order ``query`` by ``(sort_column, id_column)`` and skip up to ``cursor``.
+
+    Seeking on the composite key keeps deep pages as cheap as the first one,
+    unlike ``OFFSET`` which still reads and discards every skipped row.
+    """
+    if descending:
+        query = query.order_by(None).order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(None).order_by(sort_column.asc(), id_column.asc())
+
+    if cursor.value is None or cursor.id is None:
+        return query
+
+    try:
+        value = _coerce_cursor_value(sort_column, cursor.value)
+    except (TypeError, ValueError):
+        raise ValidationError("Cursor de paginação inválido")
+
+    position = tuple_(sort_column, id_column)
+    if descending:
+        return query.where(position < (value, cursor.id))
+    return query.where(position > (value, cursor.id))
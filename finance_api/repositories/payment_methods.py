@@ -5,7 +5,10 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from finance_api.models.payment_methods import PaymentMethod
+from finance_api.repositories.pagination import apply_keyset, count_total
+from finance_api.schemas.pagination import PageCursor, TotalMode
 from finance_api.schemas.payment_methods import PaymentMethodCreate, PaymentMethodUpdate
+from finance_api.core.cache import PAYMENT_METHODS, table_versions
 from finance_api.core.logger import get_logger
 
 logger = get_logger(__name__)
@@ -37,20 +40,28 @@ class PaymentMethodRepository:
             logger.debug(f"Repository: Payment method with key '{key}' not found")
         return method
 
-    async def list(self, page: int = 1, size: int = 100) -> tuple[Sequence[PaymentMethod], int]:
+    async def list_keys(self) -> set[str]:
+        result = await self.db.execute(select(PaymentMethod.key))
+        return set(result.scalars().all())
+
+    async def list(
+        self,
+        page: int = 1,
+        size: int = 100,
+        cursor: Optional[PageCursor] = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> tuple[Sequence[PaymentMethod], Optional[int]]:
         logger.debug(f"Repository: Listing payment methods page={page} size={size}")
-        offset = (page - 1) * size
-        query = (
-            select(PaymentMethod).order_by(PaymentMethod.display_name).offset(offset).limit(size)
-        )
-        result = await self.db.execute(query)
-        items = result.scalars().all()
+        query = select(PaymentMethod).order_by(PaymentMethod.display_name)
+
+        total = await count_total(self.db, query, total_mode)
 
-        # Count total
-        # In a real app, optimize this count query
-        count_query = select(PaymentMethod)
-        total_result = await self.db.execute(count_query)
-        total = len(total_result.scalars().all())
+        if cursor is not None:
+            query = apply_keyset(query, PaymentMethod.display_name, PaymentMethod.id, cursor)
+        else:
+            query = query.offset((page - 1) * size)
+        result = await self.db.execute(query.limit(size))
+        items = result.scalars().all()
 
         logger.debug(f"Repository: Found {len(items)} payment methods, total={total}")
         return items, total
@@ -63,6 +74,7 @@ class PaymentMethodRepository:
         )
         self.db.add(method)
         await self.db.commit()
+        table_versions.bump(PAYMENT_METHODS)
         await self.db.refresh(method)
         logger.debug(f"Repository: Payment method created with ID: {method.id}")
         return method
@@ -84,6 +96,7 @@ class PaymentMethodRepository:
             setattr(method, key, value)
 
         await self.db.commit()
+        table_versions.bump(PAYMENT_METHODS)
         await self.db.refresh(method)
         logger.debug(f"Repository: Payment method {method_id} updated successfully")
         return method
@@ -97,5 +110,6 @@ class PaymentMethodRepository:
 
         await self.db.delete(method)
         await self.db.commit()
+        table_versions.bump(PAYMENT_METHODS)
         logger.debug(f"Repository: Payment method {method_id} deleted successfully")
         return True
@@ -0,0 +1,98 @@
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Iterable, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import Date, cast, delete, func, insert, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from finance_api.models.spend_rollups import SpendRollup
+from finance_api.models.spents import Spent
+from finance_api.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+LOCAL_TIMEZONE = ZoneInfo("America/Sao_Paulo")
+
+# (created_at, category, payment_method, amount, sign) where sign is +1 or -1
+RollupChange = Tuple[datetime, str, str, float, int]
+
+
+def local_day(created_at: datetime) -> date:
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return created_at.astimezone(LOCAL_TIMEZONE).date()
+
+
+class SpendRollupRepository:
+    """Keeps ``spend_rollups`` in sync with ``spents``.
+
+    ``apply`` does not commit: callers run it in the same transaction as the spent write,
+    so the rollup can never drift from the rows it summarizes.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def apply(self, changes: Iterable[RollupChange]) -> None:
+        deltas: dict[tuple[date, str, str], list] = defaultdict(lambda: [0.0, 0])
+        for created_at, category, payment_method, amount, sign in changes:
+            delta = deltas[(local_day(created_at), category, payment_method)]
+            delta[0] += sign * amount
+            delta[1] += sign
+
+        rows = [
+            {
+                "spend_day": spend_day,
+                "category": category,
+                "payment_method": payment_method,
+                "total": total,
+                "count": count,
+            }
+            for (spend_day, category, payment_method), (total, count) in deltas.items()
+            if count != 0 or total != 0
+        ]
+        if not rows:
+            return
+
+        key = (SpendRollup.spend_day, SpendRollup.category, SpendRollup.payment_method)
+        stmt = pg_insert(SpendRollup).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key),
+            set_={
+                "total": SpendRollup.total + stmt.excluded.total,
+                "count": SpendRollup.count + stmt.excluded.count,
+            },
+        ).returning(*key, SpendRollup.count)
+        result = await self.db.execute(stmt)
+
+        # Only the keys this write emptied are removed, by primary key
+        emptied = [tuple(row[:3]) for row in result.all() if row[3] <= 0]
+        if emptied:
+            await self.db.execute(delete(SpendRollup).where(tuple_(*key).in_(emptied)))
+        logger.debug(f"Applied {len(rows)} spend rollup deltas")
+
+    async def rebuild(self) -> int:
+        """Recompute every rollup row from ``spents`` in one transaction."""
+        spend_day = cast(func.timezone(str(LOCAL_TIMEZONE), Spent.created_at), Date)
+        source = select(
+            spend_day,
+            Spent.category,
+            Spent.payment_method,
+            func.sum(Spent.amount),
+            func.count(Spent.id),
+        ).group_by(spend_day, Spent.category, Spent.payment_method)
+
+        await self.db.execute(delete(SpendRollup))
+        await self.db.execute(
+            insert(SpendRollup).from_select(
+                ["spend_day", "category", "payment_method", "total", "count"], source
+            )
+        )
+        await self.db.commit()
+
+        result = await self.db.execute(select(func.count()).select_from(SpendRollup))
+        rebuilt = result.scalar() or 0
+        logger.info(f"Rebuilt {rebuilt} spend rollup rows")
+        return rebuilt
@@ -1,36 +1,107 @@
-from datetime import date
+from datetime import date, datetime, time, timedelta
 from typing import List, Optional
 from uuid import UUID
+from zoneinfo import ZoneInfo
 
-from sqlalchemy import select, update, delete, func, text, case, or_, and_
+from sqlalchemy import (
+    Float,
+    String,
+    select,
+    update,
+    delete,
+    insert,
+    func,
+    text,
+    case,
+    or_,
+    and_,
+    false,
+    cast,
+    literal,
+    null,
+    union_all,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from finance_api.models.limits import SpendingLimit
+from finance_api.models.spend_rollups import SpendRollup
 from finance_api.models.spents import Spent
+from finance_api.models.subscriptions import Subscription
+from finance_api.repositories.pagination import apply_keyset, count_total
+from finance_api.repositories.spend_rollups import SpendRollupRepository
+from finance_api.schemas.pagination import PageCursor, TotalMode
 from finance_api.schemas.spents import SpentCreate, SpentUpdate
+from finance_api.core.cache import SPENTS, table_versions
 from finance_api.core.logger import get_logger
 
 logger = get_logger(__name__)
 
+LOCAL_TIMEZONE = ZoneInfo("America/Sao_Paulo")
+
+
+def _local_day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=LOCAL_TIMEZONE)
+
+
+def _local_date_range(start_date: Optional[date] = None, end_date: Optional[date] = None) -> list:
+    """Build half-open ``created_at`` bounds for an inclusive range of local (Brazil) dates.
+
+    Comparing the raw column against ``[start 00:00, end + 1 day 00:00)`` in America/Sao_Paulo
+    is equivalent to filtering on ``date(created_at AT TIME ZONE ...)`` but keeps the
+    predicate sargable, so the ``created_at`` indexes can serve it as a range scan.
+    """
+    conditions = []
+    if start_date:
+        conditions.append(Spent.created_at >= _local_day_start(start_date))
+    if end_date:
+        conditions.append(Spent.created_at < _local_day_start(end_date + timedelta(days=1)))
+    return conditions
+
 
 class SpentRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.rollups = SpendRollupRepository(db)
 
     async def create(self, spent: SpentCreate) -> Spent:
         new_spent = Spent(**spent.model_dump(exclude={"is_installment"}))
+        if new_spent.created_at is None:
+            new_spent.created_at = datetime.now(LOCAL_TIMEZONE)
         self.db.add(new_spent)
+        await self.rollups.apply(
+            [
+                (
+                    new_spent.created_at,
+                    new_spent.category,
+                    new_spent.payment_method,
+                    new_spent.amount,
+                    1,
+                )
+            ]
+        )
         await self.db.commit()
+        table_versions.bump(SPENTS)
         await self.db.refresh(new_spent)
         logger.info(f"Created spent: {new_spent.id}")
         return new_spent
 
-    async def create_many(self, spents: List[Spent]) -> List[Spent]:
-        self.db.add_all(spents)
+    async def create_many(self, rows: List[dict]) -> List[Spent]:
+        """Insert already validated spent rows in one multi-row ``INSERT ... RETURNING``.
+
+        Rows come back in the same order they were given, with a single commit for the batch
+        (rollups included).
+        """
+        stmt = insert(Spent).returning(Spent, sort_by_parameter_order=True)
+        result = await self.db.scalars(stmt, rows)
+        created = list(result.all())
+        await self.rollups.apply(
+            (row["created_at"], row["category"], row["payment_method"], row["amount"], 1)
+            for row in rows
+        )
         await self.db.commit()
-        for s in spents:
-            await self.db.refresh(s)
-        logger.info(f"Created {len(spents)} spents")
-        return spents
+        table_versions.bump(SPENTS)
+        logger.info(f"Created {len(created)} spents")
+        return created
 
     async def list(
         self,
@@ -38,28 +109,22 @@ class SpentRepository:
         limit: int = 100,
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
-    ) -> tuple[List[Spent], int]:
+        cursor: Optional[PageCursor] = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> tuple[List[Spent], Optional[int]]:
         query = select(Spent)
 
-        # Convert UTC timestamp to Brazil timezone (America/Sao_Paulo) before extracting date
-        # This ensures date filtering works correctly for Brazilian users (UTC-3)
-        # Using AT TIME ZONE converts the timestamp to the specified timezone
-        if start_date:
-            query = query.where(
-                func.date(Spent.created_at.op("AT TIME ZONE")("America/Sao_Paulo")) >= start_date
-            )
-        if end_date:
-            query = query.where(
-                func.date(Spent.created_at.op("AT TIME ZONE")("America/Sao_Paulo")) <= end_date
-            )
+        # Dates are interpreted in Brazil timezone (America/Sao_Paulo)
+        query = query.where(*_local_date_range(start_date, end_date))
 
-        # Count query
-        count_query = select(func.count()).select_from(query.subquery())
-        count_result = await self.db.execute(count_query)
-        total = count_result.scalar() or 0
+        total = await count_total(self.db, query, total_mode)
 
-        # Pagination
-        query = query.offset(skip).limit(limit)
+        # Pagination: keyset on (created_at, id) when a cursor is given, offset otherwise
+        if cursor is not None:
+            query = apply_keyset(query, Spent.created_at, Spent.id, cursor, descending=True)
+        else:
+            query = query.offset(skip)
+        query = query.limit(limit)
         result = await self.db.execute(query)
         items = list(result.scalars().all())
         logger.info(f"Listed {len(items)} spents")
@@ -75,11 +140,7 @@ class SpentRepository:
 
         conditions = []
         for pm_key, start_d, end_d in periods:
-            condition = and_(
-                Spent.payment_method == pm_key,
-                func.date(Spent.created_at.op("AT TIME ZONE")("America/Sao_Paulo")) >= start_d,
-                func.date(Spent.created_at.op("AT TIME ZONE")("America/Sao_Paulo")) <= end_d,
-            )
+            condition = and_(Spent.payment_method == pm_key, *_local_date_range(start_d, end_d))
             conditions.append(condition)
 
         if conditions:
@@ -136,7 +197,92 @@ class SpentRepository:
             for row in rows
         ]
 
+    async def get_dashboard_totals(
+        self, periods: List[tuple[Optional[str], date, date]]
+    ) -> List[dict]:
+        """Aggregate spents, active subscriptions and limits per category and payment method.
+
+        Each period is a ``(payment_method, start_date, end_date)`` tuple; a ``None``
+        payment method matches every spent in the range. Everything is resolved in a
+        single GROUP BY statement, so the result size only depends on the number of
+        distinct category/payment method pairs. Limit rows have ``payment_method=None``.
+        """
+        conditions = []
+        for pm_key, start_d, end_d in periods:
+            condition = SpendRollup.spend_day.between(start_d, end_d)
+            if pm_key is not None:
+                condition = and_(SpendRollup.payment_method == pm_key, condition)
+            conditions.append(condition)
+
+        # Spent sums come from the daily rollups, so the scan is bounded by
+        # days x categories x payment methods instead of the number of spents.
+        spents_query = (
+            select(
+                SpendRollup.category.label("category"),
+                SpendRollup.payment_method.label("payment_method"),
+                func.sum(SpendRollup.total).label("spent_total"),
+                func.sum(SpendRollup.count).label("spent_count"),
+                cast(literal(0.0), Float).label("subscription_total"),
+                cast(null(), Float).label("limit_amount"),
+            )
+            .where(or_(*conditions) if conditions else false())
+            .group_by(SpendRollup.category, SpendRollup.payment_method)
+        )
+        subscriptions_query = (
+            select(
+                Subscription.category,
+                Subscription.payment_method,
+                cast(literal(0.0), Float),
+                literal(0),
+                func.sum(Subscription.amount),
+                cast(null(), Float),
+            )
+            .where(Subscription.is_active)
+            .group_by(Subscription.category, Subscription.payment_method)
+        )
+        limits_query = select(
+            SpendingLimit.category,
+            cast(null(), String),
+            cast(literal(0.0), Float),
+            literal(0),
+            cast(literal(0.0), Float),
+            SpendingLimit.amount,
+        )
+
+        combined = union_all(spents_query, subscriptions_query, limits_query).subquery()
+        query = select(
+            combined.c.category,
+            combined.c.payment_method,
+            func.sum(combined.c.spent_total).label("spent_total"),
+            func.sum(combined.c.spent_count).label("spent_count"),
+            func.sum(combined.c.subscription_total).label("subscription_total"),
+            func.max(combined.c.limit_amount).label("limit_amount"),
+        ).group_by(combined.c.category, combined.c.payment_method)
+
+        result = await self.db.execute(query)
+        rows = result.fetchall()
+        logger.info(f"Aggregated dashboard totals into {len(rows)} rows")
+
+        return [
+            {
+                "category": row.category,
+                "payment_method": row.payment_method,
+                "spent_total": float(row.spent_total or 0),
+                "spent_count": int(row.spent_count or 0),
+                "subscription_total": float(row.subscription_total or 0),
+                "limit_amount": row.limit_amount,
+            }
+            for row in rows
+        ]
+
     async def update(self, spent_id: UUID, update_data: SpentUpdate) -> Optional[Spent]:
+        previous = await self.db.execute(
+            select(Spent.created_at, Spent.category, Spent.payment_method, Spent.amount)
+            .where(Spent.id == spent_id)
+            .with_for_update()
+        )
+        old_row = previous.one_or_none()
+
         stmt = (
             update(Spent)
             .where(Spent.id == spent_id)
@@ -144,14 +290,36 @@ class SpentRepository:
             .returning(Spent)
         )
         result = await self.db.execute(stmt)
+        updated = result.scalar_one_or_none()
+        if old_row is not None and updated is not None:
+            await self.rollups.apply(
+                [
+                    (*old_row, -1),
+                    (
+                        updated.created_at,
+                        updated.category,
+                        updated.payment_method,
+                        updated.amount,
+                        1,
+                    ),
+                ]
+            )
         await self.db.commit()
+        table_versions.bump(SPENTS)
         logger.info(f"Updated spent: {spent_id}")
-        return result.scalar_one_or_none()
+        return updated
 
     async def delete(self, spent_id: UUID) -> bool:
-        stmt = delete(Spent).where(Spent.id == spent_id)
+        stmt = (
+            delete(Spent)
+            .where(Spent.id == spent_id)
+            .returning(Spent.created_at, Spent.category, Spent.payment_method, Spent.amount)
+        )
         result = await self.db.execute(stmt)
+        deleted = result.all()
+        await self.rollups.apply((*row, -1) for row in deleted)
         await self.db.commit()
-        if result.rowcount > 0:
+        table_versions.bump(SPENTS)
+        if deleted:
             logger.info(f"Deleted spent: {spent_id}")
-        return result.rowcount > 0
+        return bool(deleted)
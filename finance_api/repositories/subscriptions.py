@@ -1,11 +1,14 @@
 from typing import List, Optional
 from uuid import UUID
 
-from sqlalchemy import select, update, delete, func
+from sqlalchemy import select, update, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from finance_api.models.subscriptions import Subscription
+from finance_api.repositories.pagination import apply_keyset, count_total
+from finance_api.schemas.pagination import PageCursor, TotalMode
 from finance_api.schemas.subscriptions import SubscriptionCreate, SubscriptionUpdate
+from finance_api.core.cache import SUBSCRIPTIONS, table_versions
 from finance_api.core.logger import get_logger
 
 logger = get_logger(__name__)
@@ -19,25 +22,34 @@ class SubscriptionRepository:
         new_subscription = Subscription(**subscription.model_dump())
         self.db.add(new_subscription)
         await self.db.commit()
+        table_versions.bump(SUBSCRIPTIONS)
         await self.db.refresh(new_subscription)
         logger.info(f"Created subscription: {new_subscription.id}")
         return new_subscription
 
     async def list(
-        self, skip: int = 0, limit: int = 100, active_only: bool = False
-    ) -> tuple[List[Subscription], int]:
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        active_only: bool = False,
+        cursor: Optional[PageCursor] = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> tuple[List[Subscription], Optional[int]]:
         query = select(Subscription)
 
         if active_only:
             query = query.where(Subscription.is_active)
 
-        # Count query
-        count_query = select(func.count()).select_from(query.subquery())
-        count_result = await self.db.execute(count_query)
-        total = count_result.scalar() or 0
+        total = await count_total(self.db, query, total_mode)
 
-        # Pagination
-        query = query.offset(skip).limit(limit)
+        # Pagination: keyset on (created_at, id) when a cursor is given, offset otherwise
+        if cursor is not None:
+            query = apply_keyset(
+                query, Subscription.created_at, Subscription.id, cursor, descending=True
+            )
+        else:
+            query = query.offset(skip)
+        query = query.limit(limit)
         result = await self.db.execute(query)
         items = list(result.scalars().all())
         logger.info(f"Listed {len(items)} subscriptions")
@@ -63,6 +75,7 @@ class SubscriptionRepository:
         )
         result = await self.db.execute(stmt)
         await self.db.commit()
+        table_versions.bump(SUBSCRIPTIONS)
         logger.info(f"Updated subscription: {subscription_id}")
         return result.scalar_one_or_none()
 
@@ -70,6 +83,7 @@ class SubscriptionRepository:
         stmt = delete(Subscription).where(Subscription.id == subscription_id)
         result = await self.db.execute(stmt)
         await self.db.commit()
+        table_versions.bump(SUBSCRIPTIONS)
         if result.rowcount > 0:
             logger.info(f"Deleted subscription: {subscription_id}")
         return result.rowcount > 0
@@ -1,17 +1,18 @@
-from typing import Annotated
+from typing import Annotated, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from finance_api.core.database import get_db
+from finance_api.core.notifications import notify_reference_data_changed
 from finance_api.repositories.categories import CategoryRepository
 from finance_api.schemas.categories import (
     CategoryCreate,
     CategoryUpdate,
     CategoryResponse,
 )
-from finance_api.schemas.pagination import PaginatedResponse
+from finance_api.schemas.pagination import PageCursor, PaginatedResponse, TotalMode
 from finance_api.services.categories import CategoryService
 
 router = APIRouter()
@@ -28,12 +29,16 @@ def get_category_service(
 async def list_categories(
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(100, ge=1, le=1000, description="Page size"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor; send empty to start"),
+    include_total: bool = Query(True, description="Compute the total item count"),
+    estimate_total: bool = Query(False, description="Use the planner estimate as total"),
     service: CategoryService = Depends(get_category_service),
 ):
     """List all categories with pagination."""
-    items, total = await service.list(page, size)
-    pages = (total + size - 1) // size if total > 0 else 0
-    return PaginatedResponse(items=items, total=total, page=page, size=size, pages=pages)
+    page_cursor = PageCursor.decode(cursor) if cursor is not None else None
+    total_mode = TotalMode.from_flags(include_total, estimate_total)
+    items, total = await service.list(page, size, page_cursor, total_mode)
+    return PaginatedResponse.create(items, total, page, size, page_cursor, "display_name")
 
 
 @router.get("/{category_id}", response_model=CategoryResponse)
@@ -48,26 +53,34 @@ async def get_category(
 @router.post("/", response_model=CategoryResponse, status_code=201)
 async def create_category(
     category_data: CategoryCreate,
+    background_tasks: BackgroundTasks,
     service: CategoryService = Depends(get_category_service),
 ):
     """Create a new category."""
-    return await service.create(category_data)
+    category = await service.create(category_data)
+    background_tasks.add_task(notify_reference_data_changed)
+    return category
 
 
 @router.put("/{category_id}", response_model=CategoryResponse)
 async def update_category(
     category_id: UUID,
     update_data: CategoryUpdate,
+    background_tasks: BackgroundTasks,
     service: CategoryService = Depends(get_category_service),
 ):
     """Update an existing category."""
-    return await service.update(category_id, update_data)
+    category = await service.update(category_id, update_data)
+    background_tasks.add_task(notify_reference_data_changed)
+    return category
 
 
 @router.delete("/{category_id}", status_code=204)
 async def delete_category(
     category_id: UUID,
+    background_tasks: BackgroundTasks,
     service: CategoryService = Depends(get_category_service),
 ):
     """Delete a category."""
     await service.delete(category_id)
+    background_tasks.add_task(notify_reference_data_changed)
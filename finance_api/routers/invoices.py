@@ -1,7 +1,7 @@
 from datetime import date
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Path
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
@@ -18,6 +18,16 @@ class UpdateClosingDateRequest(BaseModel):
     closing_date: date
 
 
+@router.get("/year/{year}", response_model=List[InvoiceResponse])
+async def list_year_invoices(
+    year: int = Path(..., ge=2000, le=2100), db: AsyncSession = Depends(get_db)
+) -> List[InvoiceResponse]:
+    repo = InvoiceRepository(db)
+    pm_repo = PaymentMethodRepository(db)
+    service = InvoiceService(repo, pm_repo)
+    return await service.list_year_previews(year)
+
+
 @router.get("/{reference_month}", response_model=List[InvoiceResponse])
 async def list_invoices(
     reference_month: str, db: AsyncSession = Depends(get_db)
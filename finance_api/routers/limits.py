@@ -6,13 +6,18 @@ from fastapi import APIRouter, Depends, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from finance_api.core.database import get_db
+from finance_api.repositories.invoices import InvoiceRepository
 from finance_api.repositories.limits import SpendingLimitRepository
+from finance_api.repositories.payment_methods import PaymentMethodRepository
+from finance_api.services.invoices import InvoiceService
 from finance_api.services.limits import SpendingLimitService
 from finance_api.schemas.limits import (
     SpendingLimitCreate,
     SpendingLimitResponse,
+    SpendingLimitStatusResponse,
     SpendingLimitUpdate,
 )
+from finance_api.schemas.spents import DashboardMode
 from finance_api.schemas.pagination import PaginatedResponse
 
 router = APIRouter()
@@ -33,11 +38,33 @@ async def list_limits(
     size: int = 10,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    estimate_total: bool = False,
     db: AsyncSession = Depends(get_db),
 ) -> PaginatedResponse[SpendingLimitResponse]:
     repo = SpendingLimitRepository(db)
     service = SpendingLimitService(repo)
-    return await service.list(page, size, start_date, end_date)
+    return await service.list(
+        page, size, start_date, end_date, cursor, include_total, estimate_total
+    )
+
+
+@router.get("/status", response_model=SpendingLimitStatusResponse)
+async def get_limits_status(
+    reference_month: str,
+    mode: DashboardMode = DashboardMode.CIVIL_MONTH,
+    category: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+) -> SpendingLimitStatusResponse:
+    repo = SpendingLimitRepository(db)
+    service = SpendingLimitService(repo)
+
+    inv_repo = InvoiceRepository(db)
+    pm_repo = PaymentMethodRepository(db)
+    inv_service = InvoiceService(inv_repo, pm_repo)
+
+    return await service.get_status(reference_month, mode.value, inv_service, category)
 
 
 @router.get("/{limit_id}", response_model=SpendingLimitResponse)
@@ -1,17 +1,18 @@
-from typing import Annotated
+from typing import Annotated, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from finance_api.core.database import get_db
+from finance_api.core.notifications import notify_reference_data_changed
 from finance_api.repositories.payment_methods import PaymentMethodRepository
 from finance_api.schemas.payment_methods import (
     PaymentMethodCreate,
     PaymentMethodUpdate,
     PaymentMethodResponse,
 )
-from finance_api.schemas.pagination import PaginatedResponse
+from finance_api.schemas.pagination import PageCursor, PaginatedResponse, TotalMode
 from finance_api.services.payment_methods import PaymentMethodService
 
 router = APIRouter()
@@ -28,12 +29,16 @@ def get_payment_method_service(
 async def list_payment_methods(
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(100, ge=1, le=1000, description="Page size"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor; send empty to start"),
+    include_total: bool = Query(True, description="Compute the total item count"),
+    estimate_total: bool = Query(False, description="Use the planner estimate as total"),
     service: PaymentMethodService = Depends(get_payment_method_service),
 ):
     """List all payment methods with pagination."""
-    items, total = await service.list(page, size)
-    pages = (total + size - 1) // size if total > 0 else 0
-    return PaginatedResponse(items=items, total=total, page=page, size=size, pages=pages)
+    page_cursor = PageCursor.decode(cursor) if cursor is not None else None
+    total_mode = TotalMode.from_flags(include_total, estimate_total)
+    items, total = await service.list(page, size, page_cursor, total_mode)
+    return PaginatedResponse.create(items, total, page, size, page_cursor, "display_name")
 
 
 @router.get("/{method_id}", response_model=PaymentMethodResponse)
@@ -48,26 +53,34 @@ async def get_payment_method(
 @router.post("/", response_model=PaymentMethodResponse, status_code=201)
 async def create_payment_method(
     method_data: PaymentMethodCreate,
+    background_tasks: BackgroundTasks,
     service: PaymentMethodService = Depends(get_payment_method_service),
 ):
     """Create a new payment method."""
-    return await service.create(method_data)
+    method = await service.create(method_data)
+    background_tasks.add_task(notify_reference_data_changed)
+    return method
 
 
 @router.put("/{method_id}", response_model=PaymentMethodResponse)
 async def update_payment_method(
     method_id: UUID,
     update_data: PaymentMethodUpdate,
+    background_tasks: BackgroundTasks,
     service: PaymentMethodService = Depends(get_payment_method_service),
 ):
     """Update an existing payment method."""
-    return await service.update(method_id, update_data)
+    method = await service.update(method_id, update_data)
+    background_tasks.add_task(notify_reference_data_changed)
+    return method
 
 
 @router.delete("/{method_id}", status_code=204)
 async def delete_payment_method(
     method_id: UUID,
+    background_tasks: BackgroundTasks,
     service: PaymentMethodService = Depends(get_payment_method_service),
 ):
     """Delete a payment method."""
     await service.delete(method_id)
+    background_tasks.add_task(notify_reference_data_changed)
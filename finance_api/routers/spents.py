@@ -1,8 +1,8 @@
 from datetime import date
-from typing import Optional
+from typing import List, Optional, Union
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, status, Response
+from fastapi import APIRouter, Depends, Request, status, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from finance_api.core.database import get_db
@@ -11,18 +11,57 @@ from finance_api.services.spents import SpentService
 from finance_api.repositories.invoices import InvoiceRepository
 from finance_api.repositories.payment_methods import PaymentMethodRepository
 from finance_api.services.invoices import InvoiceService
-from finance_api.schemas.spents import SpentCreate, SpentResponse, SpentUpdate, DashboardMode
+from finance_api.schemas.spents import (
+    BulkSpentResult,
+    SpentCreate,
+    SpentResponse,
+    SpentUpdate,
+    DashboardMode,
+)
 from finance_api.schemas.pagination import PaginatedResponse
 from finance_api.schemas.installments import InstallmentSummary
+from finance_api.schemas.dashboard import DashboardSummary
 
 router = APIRouter()
 
 
-@router.post("/", response_model=SpentResponse)
-async def create_spent(spent: SpentCreate, db: AsyncSession = Depends(get_db)) -> SpentResponse:
+@router.post("/", response_model=Union[SpentResponse, List[SpentResponse]])
+async def create_spent(
+    spent: SpentCreate, return_series: bool = False, db: AsyncSession = Depends(get_db)
+) -> Union[SpentResponse, List[SpentResponse]]:
+    """With ``return_series=true`` the response is the list of every created installment."""
     repo = SpentRepository(db)
     service = SpentService(repo)
-    return await service.create(spent)
+    return await service.create(spent, return_series)
+
+
+# The body is read as a stream by the service, so it is only declared for the docs
+BULK_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": {"type": "array", "items": {"$ref": "#/components/schemas/SpentCreate"}}
+            },
+            "application/x-ndjson": {
+                "schema": {"type": "string", "description": "One SpentCreate JSON object per line"}
+            },
+        },
+    }
+}
+
+
+@router.post("/bulk", response_model=BulkSpentResult, openapi_extra=BULK_REQUEST_BODY)
+async def create_spents_bulk(
+    request: Request, db: AsyncSession = Depends(get_db)
+) -> BulkSpentResult:
+    """Accepts a JSON array or an NDJSON body (``Content-Type: application/x-ndjson``).
+
+    NDJSON is parsed while it streams in; JSON arrays are limited to 5 MB.
+    """
+    repo = SpentRepository(db)
+    service = SpentService(repo)
+    return await service.create_bulk(request.stream(), request.headers.get("content-type", ""))
 
 
 @router.get("/", response_model=PaginatedResponse[SpentResponse])
@@ -31,11 +70,16 @@ async def list_spents(
     size: int = 10,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    estimate_total: bool = False,
     db: AsyncSession = Depends(get_db),
 ) -> PaginatedResponse[SpentResponse]:
     repo = SpentRepository(db)
     service = SpentService(repo)
-    return await service.list(page, size, start_date, end_date)
+    return await service.list(
+        page, size, start_date, end_date, cursor, include_total, estimate_total
+    )
 
 
 @router.get("/dashboard", response_model=PaginatedResponse[SpentResponse])
@@ -53,9 +97,23 @@ async def get_dashboard(
     pm_repo = PaymentMethodRepository(db)
     inv_service = InvoiceService(inv_repo, pm_repo)
 
-    return await service.get_dashboard(
-        reference_month, mode.value, page, size, inv_service, pm_repo
-    )
+    return await service.get_dashboard(reference_month, mode.value, page, size, inv_service)
+
+
+@router.get("/dashboard/summary", response_model=DashboardSummary)
+async def get_dashboard_summary(
+    reference_month: str,
+    mode: DashboardMode = DashboardMode.CIVIL_MONTH,
+    db: AsyncSession = Depends(get_db),
+) -> DashboardSummary:
+    repo = SpentRepository(db)
+    service = SpentService(repo)
+
+    inv_repo = InvoiceRepository(db)
+    pm_repo = PaymentMethodRepository(db)
+    inv_service = InvoiceService(inv_repo, pm_repo)
+
+    return await service.get_dashboard_summary(reference_month, mode.value, inv_service)
 
 
 @router.get("/installments-summary", response_model=list[InstallmentSummary])
@@ -1,3 +1,4 @@
+from typing import Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, status, Response
@@ -30,11 +31,14 @@ async def list_subscriptions(
     page: int = 1,
     size: int = 10,
     active_only: bool = False,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    estimate_total: bool = False,
     db: AsyncSession = Depends(get_db),
 ) -> PaginatedResponse[SubscriptionResponse]:
     repo = SubscriptionRepository(db)
     service = SubscriptionService(repo)
-    return await service.list(page, size, active_only)
+    return await service.list(page, size, active_only, cursor, include_total, estimate_total)
 
 
 @router.get("/{subscription_id}", response_model=SubscriptionResponse)
@@ -0,0 +1,47 @@
+from datetime import date
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class DashboardPeriod(BaseModel):
+    payment_method: Optional[str] = None
+    start_date: date
+    end_date: date
+
+
+class DashboardBreakdownItem(BaseModel):
+    category: str
+    payment_method: str
+    spent_total: float
+    spent_count: int
+    subscription_total: float
+    total: float
+
+
+class CategoryTotal(BaseModel):
+    category: str
+    spent_total: float
+    spent_count: int
+    subscription_total: float
+    total: float
+    limit: Optional[float] = None
+    remaining: Optional[float] = None
+
+
+class PaymentMethodTotal(BaseModel):
+    payment_method: str
+    spent_total: float
+    spent_count: int
+    subscription_total: float
+    total: float
+
+
+class DashboardSummary(BaseModel):
+    reference_month: str
+    mode: str
+    periods: List[DashboardPeriod]
+    total: float
+    categories: List[CategoryTotal]
+    payment_methods: List[PaymentMethodTotal]
+    breakdown: List[DashboardBreakdownItem]
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator
@@ -33,3 +33,20 @@ class SpendingLimitResponse(SpendingLimitBase):
     id: UUID
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class SpendingLimitStatus(BaseModel):
+    category: str
+    limit: float
+    spent_total: float
+    subscription_total: float
+    spent: float
+    remaining: float
+    percent_used: Optional[float] = None
+    exceeded: bool
+
+
+class SpendingLimitStatusResponse(BaseModel):
+    reference_month: str
+    mode: str
+    categories: List[SpendingLimitStatus]
@@ -1,19 +1,86 @@
-from typing import Generic, List, TypeVar
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Generic, List, Optional, TypeVar
 from math import ceil
+from uuid import UUID
 
 from pydantic import BaseModel
 
+from finance_api.core.exceptions import ValidationError
+
 T = TypeVar("T")
 
 
+class TotalMode(str, Enum):
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    NONE = "none"
+
+    @classmethod
+    def from_flags(cls, include_total: bool = True, estimate_total: bool = False) -> "TotalMode":
+        if not include_total:
+            return cls.NONE
+        return cls.ESTIMATED if estimate_total else cls.EXACT
+
+
+class PageCursor(BaseModel):
+    """Keyset position: sort value and id of the last item already returned.
+
+    An empty cursor (both fields ``None``) starts a keyset listing from the first item.
+    """
+
+    value: Optional[str] = None
+    id: Optional[UUID] = None
+
+    @classmethod
+    def decode(cls, cursor: str) -> "PageCursor":
+        if not cursor:
+            return cls()
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            return cls(value=payload["v"], id=UUID(payload["i"]))
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise ValidationError("Cursor de paginação inválido")
+
+    @staticmethod
+    def encode(value: Any, item_id: UUID) -> str:
+        if isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        payload = json.dumps({"v": str(value), "i": str(item_id)}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
 class PaginatedResponse(BaseModel, Generic[T]):
     items: List[T]
-    total: int
+    total: Optional[int] = None
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
     @classmethod
-    def create(cls, items: List[T], total: int, page: int, size: int) -> "PaginatedResponse[T]":
-        pages = ceil(total / size) if size > 0 else 0
-        return cls(items=items, total=total, page=page, size=size, pages=pages)
+    def create(
+        cls,
+        items: List[T],
+        total: Optional[int],
+        page: int,
+        size: int,
+        cursor: Optional[PageCursor] = None,
+        cursor_field: str = "created_at",
+    ) -> "PaginatedResponse[T]":
+        pages = None
+        if total is not None:
+            pages = ceil(total / size) if size > 0 else 0
+
+        next_cursor = None
+        if cursor is not None and size > 0 and len(items) >= size:
+            last = items[-1]
+            next_cursor = PageCursor.encode(getattr(last, cursor_field), last.id)
+
+        return cls(
+            items=items, total=total, page=page, size=size, pages=pages, next_cursor=next_cursor
+        )
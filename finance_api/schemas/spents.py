@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 from enum import Enum
@@ -57,3 +57,14 @@ class SpentResponse(SpentBase):
     total_installments: Optional[int] = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class BulkSpentError(BaseModel):
+    index: int
+    error: str
+
+
+class BulkSpentResult(BaseModel):
+    created: int
+    items: List[SpentResponse]
+    errors: List[BulkSpentError]
@@ -1,3 +1,4 @@
+from typing import Optional
 from uuid import UUID
 
 from finance_api.repositories.categories import CategoryRepository
@@ -6,6 +7,7 @@ from finance_api.schemas.categories import (
     CategoryUpdate,
     CategoryResponse,
 )
+from finance_api.schemas.pagination import PageCursor, TotalMode
 from finance_api.core.logger import get_logger
 from finance_api.core.decorators import handle_service_errors
 from finance_api.core.exceptions import EntityNotFoundError, ValidationError
@@ -29,10 +31,16 @@ class CategoryService:
         return CategoryResponse.model_validate(category)
 
     @handle_service_errors
-    async def list(self, page: int = 1, size: int = 100) -> tuple[list[CategoryResponse], int]:
+    async def list(
+        self,
+        page: int = 1,
+        size: int = 100,
+        cursor: Optional[PageCursor] = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> tuple[list[CategoryResponse], Optional[int]]:
         skip = (page - 1) * size
         logger.info(f"Listing categories page {page} size {size}")
-        items, total = await self.repo.list(skip, size)
+        items, total = await self.repo.list(skip, size, cursor, total_mode)
         return [CategoryResponse.model_validate(item) for item in items], total
 
     @handle_service_errors
@@ -1,17 +1,18 @@
 from datetime import date, datetime
-from typing import List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 from uuid import UUID
 import calendar
 from dateutil.relativedelta import relativedelta
-import holidays
 
-from finance_api.models.invoices import InvoiceStatus
+from finance_api.models.invoices import Invoice, InvoiceStatus
 from finance_api.models.payment_methods import PaymentMethod
 from finance_api.repositories.invoices import InvoiceRepository
 from finance_api.repositories.payment_methods import PaymentMethodRepository
 from finance_api.schemas.invoices import InvoiceCreate, InvoiceUpdate, InvoiceResponse
+from finance_api.schemas.pagination import TotalMode
+from finance_api.core.business_calendar import business_calendar
 from finance_api.core.decorators import handle_service_errors
-from finance_api.core.exceptions import EntityNotFoundError
+from finance_api.core.exceptions import EntityNotFoundError, ValidationError
 from finance_api.core.logger import get_logger
 
 logger = get_logger(__name__)
@@ -22,13 +23,7 @@ def compute_real_date(reference_month: str, target_day: int) -> date:
     _, last_day = calendar.monthrange(year, month)
     day = min(target_day, last_day)
 
-    target_date = date(year, month, day)
-    br_holidays = holidays.BR()
-
-    while target_date.weekday() >= 5 or target_date in br_holidays:
-        target_date += relativedelta(days=1)
-
-    return target_date
+    return business_calendar.next_business_day(date(year, month, day))
 
 
 class InvoiceService:
@@ -36,53 +31,116 @@ class InvoiceService:
         self.repo = repo
         self.pm_repo = pm_repo
 
-    @handle_service_errors
-    async def get_invoice_dates(
-        self, payment_method: PaymentMethod, reference_month: str
+    @staticmethod
+    def _previous_reference_month(reference_month: str) -> str:
+        year, month = map(int, reference_month.split("-"))
+        prev_month_date = date(year, month, 1) - relativedelta(months=1)
+        return prev_month_date.strftime("%Y-%m")
+
+    @staticmethod
+    def _compute_period(
+        payment_method: PaymentMethod,
+        reference_month: str,
+        invoice: Optional[Invoice],
+        prev_invoice: Optional[Invoice],
     ) -> Tuple[date, date]:
         if not payment_method.is_credit_card or not payment_method.closing_day:
             year, month = map(int, reference_month.split("-"))
             _, last_day = calendar.monthrange(year, month)
             return date(year, month, 1), date(year, month, last_day)
 
-        invoice = await self.repo.get_by_payment_method_and_month(
-            payment_method.key, reference_month
-        )
         if invoice:
             current_closing = invoice.real_closing_date
         else:
             current_closing = compute_real_date(reference_month, payment_method.closing_day)
 
-        year, month = map(int, reference_month.split("-"))
-        prev_month_date = date(year, month, 1) - relativedelta(months=1)
-        prev_reference_month = prev_month_date.strftime("%Y-%m")
-
-        prev_invoice = await self.repo.get_by_payment_method_and_month(
-            payment_method.key, prev_reference_month
-        )
         if prev_invoice:
             prev_closing = prev_invoice.real_closing_date
         else:
+            prev_reference_month = InvoiceService._previous_reference_month(reference_month)
             prev_closing = compute_real_date(prev_reference_month, payment_method.closing_day)
 
         start_date = prev_closing + relativedelta(days=1)
         return start_date, current_closing
 
     @handle_service_errors
-    async def list_previews(self, reference_month: str) -> List[InvoiceResponse]:
-        payment_methods, _ = await self.pm_repo.list(page=1, size=1000)
-        saved_invoices = await self.repo.list_by_month(reference_month)
-        saved_map = {inv.payment_method_key: inv for inv in saved_invoices}
+    async def get_invoice_dates(
+        self, payment_method: PaymentMethod, reference_month: str
+    ) -> Tuple[date, date]:
+        if not payment_method.is_credit_card or not payment_method.closing_day:
+            return self._compute_period(payment_method, reference_month, None, None)
+
+        invoice = await self.repo.get_by_payment_method_and_month(
+            payment_method.key, reference_month
+        )
+        prev_invoice = await self.repo.get_by_payment_method_and_month(
+            payment_method.key, self._previous_reference_month(reference_month)
+        )
+        return self._compute_period(payment_method, reference_month, invoice, prev_invoice)
+
+    @handle_service_errors
+    async def get_invoice_periods(
+        self, payment_methods: Sequence[PaymentMethod], reference_month: str
+    ) -> Dict[str, Tuple[date, date]]:
+        """Resolve the invoice period of every payment method with a single invoices query."""
+        prev_reference_month = self._previous_reference_month(reference_month)
+        invoices = await self.repo.list_by_months([reference_month, prev_reference_month])
+        invoice_map = {(inv.payment_method_key, inv.reference_month): inv for inv in invoices}
+
+        return {
+            pm.key: self._compute_period(
+                pm,
+                reference_month,
+                invoice_map.get((pm.key, reference_month)),
+                invoice_map.get((pm.key, prev_reference_month)),
+            )
+            for pm in payment_methods
+        }
+
+    @handle_service_errors
+    async def get_billing_periods(
+        self, reference_month: str, mode: str
+    ) -> List[Tuple[Optional[str], date, date]]:
+        """Date ranges covered by ``reference_month`` as ``(payment_method, start, end)``.
+
+        ``CIVIL_MONTH`` yields one range for every payment method (``None``);
+        ``INVOICES`` yields the invoice period of each payment method.
+        """
+        if mode == "CIVIL_MONTH":
+            year, month = map(int, reference_month.split("-"))
+            _, last_day = calendar.monthrange(year, month)
+            return [(None, date(year, month, 1), date(year, month, last_day))]
+
+        if mode == "INVOICES":
+            payment_methods, _ = await self.pm_repo.list(
+                page=1, size=1000, total_mode=TotalMode.NONE
+            )
+            invoice_periods = await self.get_invoice_periods(payment_methods, reference_month)
+            return [
+                (pm_key, start_d, end_d) for pm_key, (start_d, end_d) in invoice_periods.items()
+            ]
+
+        raise ValidationError(f"Modo inválido: {mode}")
+
+    @staticmethod
+    def _build_previews(
+        payment_methods: Sequence[PaymentMethod],
+        reference_months: List[str],
+        saved_invoices: List[Invoice],
+    ) -> List[InvoiceResponse]:
+        saved_map = {(inv.payment_method_key, inv.reference_month): inv for inv in saved_invoices}
 
         results = []
-        for pm in payment_methods:
-            if not pm.is_credit_card or not pm.closing_day or not pm.due_day:
-                continue
-
-            if pm.key in saved_map:
-                inv = saved_map[pm.key]
-                results.append(InvoiceResponse.model_validate(inv))
-            else:
+        for reference_month in reference_months:
+            for pm in payment_methods:
+                if not pm.is_credit_card or not pm.closing_day or not pm.due_day:
+                    continue
+
+                inv = saved_map.get((pm.key, reference_month))
+                if inv:
+                    results.append(InvoiceResponse.model_validate(inv))
+                    continue
+
                 real_closing = compute_real_date(reference_month, pm.closing_day)
                 real_due = compute_real_date(reference_month, pm.due_day)
 
@@ -99,6 +157,20 @@ class InvoiceService:
                 )
         return results
 
+    @handle_service_errors
+    async def list_previews(self, reference_month: str) -> List[InvoiceResponse]:
+        payment_methods, _ = await self.pm_repo.list(page=1, size=1000, total_mode=TotalMode.NONE)
+        saved_invoices = await self.repo.list_by_month(reference_month)
+        return self._build_previews(payment_methods, [reference_month], saved_invoices)
+
+    @handle_service_errors
+    async def list_year_previews(self, year: int) -> List[InvoiceResponse]:
+        """Closing and due dates of every card for the 12 months of ``year``."""
+        reference_months = [f"{year:04d}-{month:02d}" for month in range(1, 13)]
+        payment_methods, _ = await self.pm_repo.list(page=1, size=1000, total_mode=TotalMode.NONE)
+        saved_invoices = await self.repo.list_by_months(reference_months)
+        return self._build_previews(payment_methods, reference_months, saved_invoices)
+
     @handle_service_errors
     async def update_closing_date(
         self, payment_method_key: str, reference_month: str, closing_date: date
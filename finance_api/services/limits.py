@@ -6,10 +6,15 @@ from finance_api.models.limits import SpendingLimit
 
 from finance_api.repositories.limits import SpendingLimitRepository
 from finance_api.repositories.categories import CategoryRepository
-from finance_api.schemas.limits import SpendingLimitCreate, SpendingLimitUpdate
+from finance_api.schemas.limits import (
+    SpendingLimitCreate,
+    SpendingLimitStatus,
+    SpendingLimitStatusResponse,
+    SpendingLimitUpdate,
+)
 from finance_api.core.decorators import handle_service_errors
 from finance_api.core.exceptions import EntityNotFoundError, ValidationError
-from finance_api.schemas.pagination import PaginatedResponse
+from finance_api.schemas.pagination import PageCursor, PaginatedResponse, TotalMode
 from finance_api.core.logger import get_logger
 
 logger = get_logger(__name__)
@@ -39,13 +44,48 @@ class SpendingLimitService:
         size: int = 10,
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        estimate_total: bool = False,
     ) -> PaginatedResponse["SpendingLimit"]:
         logger.info(
             f"Listing spending limits page {page} size {size} start {start_date} end {end_date}"
         )
         skip = (page - 1) * size
-        items, total = await self.repo.list(skip, size, start_date, end_date)
-        return PaginatedResponse.create(items, total, page, size)
+        page_cursor = PageCursor.decode(cursor) if cursor is not None else None
+        total_mode = TotalMode.from_flags(include_total, estimate_total)
+        items, total = await self.repo.list(
+            skip, size, start_date, end_date, page_cursor, total_mode
+        )
+        return PaginatedResponse.create(
+            items, total, page, size, page_cursor, cursor_field="category"
+        )
+
+    @handle_service_errors
+    async def get_status(
+        self, reference_month: str, mode: str, inv_service, category: Optional[str] = None
+    ) -> SpendingLimitStatusResponse:
+        logger.info(f"Limits status mode {mode} for {reference_month}")
+        periods = await inv_service.get_billing_periods(reference_month, mode)
+        rows = await self.repo.get_status_totals(
+            periods, category.lower().strip() if category else None
+        )
+
+        categories = []
+        for row in rows:
+            spent = row["spent_total"] + row["subscription_total"]
+            categories.append(
+                SpendingLimitStatus(
+                    **row,
+                    spent=spent,
+                    remaining=row["limit"] - spent,
+                    percent_used=round(spent / row["limit"] * 100, 1) if row["limit"] > 0 else None,
+                    exceeded=spent > row["limit"],
+                )
+            )
+        return SpendingLimitStatusResponse(
+            reference_month=reference_month, mode=mode, categories=categories
+        )
 
     @handle_service_errors
     async def get_by_category(self, category: str) -> Optional["SpendingLimit"]:
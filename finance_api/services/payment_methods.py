@@ -1,4 +1,4 @@
-from typing import Sequence
+from typing import Optional, Sequence
 from uuid import UUID
 
 from finance_api.core.decorators import handle_service_errors
@@ -6,6 +6,7 @@ from finance_api.core.exceptions import EntityConflictError, EntityNotFoundError
 from finance_api.core.logger import get_logger
 from finance_api.repositories.payment_methods import PaymentMethodRepository
 from finance_api.models.payment_methods import PaymentMethod
+from finance_api.schemas.pagination import PageCursor, TotalMode
 from finance_api.schemas.payment_methods import PaymentMethodCreate, PaymentMethodUpdate
 
 logger = get_logger(__name__)
@@ -16,9 +17,15 @@ class PaymentMethodService:
         self.repository = repository
 
     @handle_service_errors
-    async def list(self, page: int = 1, size: int = 100) -> tuple[Sequence[PaymentMethod], int]:
+    async def list(
+        self,
+        page: int = 1,
+        size: int = 100,
+        cursor: Optional[PageCursor] = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> tuple[Sequence[PaymentMethod], Optional[int]]:
         logger.info(f"Listing payment methods page {page} size {size}")
-        return await self.repository.list(page, size)
+        return await self.repository.list(page, size, cursor, total_mode)
 
     @handle_service_errors
     async def get_by_id(self, method_id: UUID) -> PaymentMethod:
@@ -1,30 +1,136 @@
 from datetime import date, datetime
+import json
 import uuid
-from typing import Optional, List
+from typing import Any, AsyncIterable, Optional, List, Union
 from uuid import UUID
 from dateutil.relativedelta import relativedelta
 from zoneinfo import ZoneInfo
 import calendar
 
+from pydantic import ValidationError as PydanticValidationError
+
 from finance_api.models.spents import Spent
 from finance_api.repositories.spents import SpentRepository
 from finance_api.repositories.categories import CategoryRepository
-from finance_api.schemas.spents import SpentCreate, SpentUpdate
+from finance_api.repositories.payment_methods import PaymentMethodRepository
+from finance_api.schemas.spents import (
+    BulkSpentError,
+    BulkSpentResult,
+    SpentCreate,
+    SpentResponse,
+    SpentUpdate,
+)
 from finance_api.core.decorators import handle_service_errors
 from finance_api.core.exceptions import EntityNotFoundError, ValidationError
-from finance_api.schemas.pagination import PaginatedResponse
+from finance_api.schemas.pagination import PageCursor, PaginatedResponse, TotalMode
 from finance_api.schemas.installments import InstallmentSummary
+from finance_api.schemas.dashboard import (
+    CategoryTotal,
+    DashboardBreakdownItem,
+    DashboardPeriod,
+    DashboardSummary,
+    PaymentMethodTotal,
+)
 from finance_api.core.logger import get_logger
 
 logger = get_logger(__name__)
 
+BULK_MAX_ROWS = 5000
+# A JSON array is buffered whole before parsing, and so is each NDJSON line
+BULK_MAX_BYTES = 5 * 1024 * 1024
+
+
+def _add_ndjson_row(line: bytes, rows: List[Any], errors: List[BulkSpentError]) -> None:
+    if not line.strip():
+        return
+    if len(rows) >= BULK_MAX_ROWS:
+        raise ValidationError(f"Máximo de {BULK_MAX_ROWS} gastos por lote")
+    try:
+        rows.append(json.loads(line))
+    except ValueError as e:
+        rows.append(None)
+        errors.append(BulkSpentError(index=len(rows) - 1, error=f"JSON inválido: {e}"))
+
+
+async def _read_bulk_payload(
+    chunks: AsyncIterable[bytes], content_type: str
+) -> tuple[List[Any], List[BulkSpentError]]:
+    """Read a JSON array or NDJSON request body into raw rows.
+
+    NDJSON is parsed line by line as it arrives and reading stops at the row cap.
+    Lines that are not valid JSON are reported as row errors instead of rejecting the
+    whole payload. Row indexes ignore blank lines.
+    """
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        rows: List[Any] = []
+        errors: List[BulkSpentError] = []
+        pending = b""
+        async for chunk in chunks:
+            *lines, pending = (pending + chunk).split(b"\n")
+            for line in lines:
+                _add_ndjson_row(line, rows, errors)
+            if len(pending) > BULK_MAX_BYTES:
+                raise ValidationError("Linha NDJSON muito grande")
+        _add_ndjson_row(pending, rows, errors)
+        return rows, errors
+
+    body = bytearray()
+    async for chunk in chunks:
+        body += chunk
+        if len(body) > BULK_MAX_BYTES:
+            raise ValidationError(
+                f"Lista JSON maior que {BULK_MAX_BYTES // (1024 * 1024)} MB; use NDJSON"
+            )
+    try:
+        payload = json.loads(body or b"[]")
+    except ValueError as e:
+        raise ValidationError(f"JSON inválido: {e}")
+    if not isinstance(payload, list):
+        raise ValidationError("O corpo deve ser uma lista de gastos ou NDJSON")
+    if len(payload) > BULK_MAX_ROWS:
+        raise ValidationError(f"Máximo de {BULK_MAX_ROWS} gastos por lote")
+    return payload, []
+
+
+def _format_validation_error(error: PydanticValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}"
+        for err in error.errors()
+    )
+
 
 class SpentService:
     def __init__(self, repo: SpentRepository):
         self.repo = repo
 
+    @staticmethod
+    def _build_installment_rows(spent: SpentCreate) -> List[dict]:
+        """Expand an installment purchase into one row per remaining installment.
+
+        The first row is dated at ``created_at`` (or now) and each following one a month later.
+        """
+        installment_id = uuid.uuid4()
+        current = spent.current_installment or 1
+        total = spent.total_installments or current
+        base_date = spent.created_at or datetime.now(ZoneInfo("America/Sao_Paulo"))
+        base_data = spent.model_dump(exclude={"is_installment", "created_at"})
+
+        return [
+            {
+                **base_data,
+                "id": uuid.uuid4(),
+                "created_at": base_date + relativedelta(months=offset),
+                "installment_id": installment_id,
+                "current_installment": number,
+                "total_installments": total,
+            }
+            for offset, number in enumerate(range(current, total + 1))
+        ]
+
     @handle_service_errors
-    async def create(self, spent: SpentCreate) -> "Spent":
+    async def create(
+        self, spent: SpentCreate, return_series: bool = False
+    ) -> Union["Spent", List["Spent"]]:
         logger.info(f"Creating spent: {spent.amount} - {spent.category}")
 
         # Validate category exists in database
@@ -35,29 +141,59 @@ class SpentService:
             )
 
         if spent.is_installment:
-            installment_id = uuid.uuid4()
-            current = spent.current_installment or 1
-            total = spent.total_installments or current
+            created_spents = await self.repo.create_many(self._build_installment_rows(spent))
+            return created_spents if return_series else created_spents[0]
+
+        created = await self.repo.create(spent)
+        return [created] if return_series else created
+
+    @handle_service_errors
+    async def create_bulk(self, chunks: AsyncIterable[bytes], content_type: str) -> BulkSpentResult:
+        """Validate and insert many spents at once, reporting errors per row.
 
-            spents_to_create = []
-            base_date = datetime.now(ZoneInfo("America/Sao_Paulo"))
+        ``chunks`` is the request body as it arrives. Categories and payment methods are
+        loaded once for the whole batch, and every valid row is written by a single
+        multi-row insert with one commit.
+        """
+        rows, errors = await _read_bulk_payload(chunks, content_type)
+        logger.info(f"Bulk creating {len(rows)} spents")
 
-            months_to_add = 0
-            for i in range(current, total + 1):
-                spent_data = spent.model_dump(exclude={"is_installment"})
-                spent_data["installment_id"] = installment_id
-                spent_data["current_installment"] = i
-                spent_data["total_installments"] = total
+        category_keys = await CategoryRepository(self.repo.db).list_keys()
+        payment_method_keys = await PaymentMethodRepository(self.repo.db).list_keys()
+        failed = {error.index for error in errors}
+        now = datetime.now(ZoneInfo("America/Sao_Paulo"))
 
-                new_spent = Spent(**spent_data)
-                new_spent.created_at = base_date + relativedelta(months=months_to_add)
-                spents_to_create.append(new_spent)
-                months_to_add += 1
+        to_insert: List[dict] = []
+        for index, row in enumerate(rows):
+            if index in failed:
+                continue
+            try:
+                spent = SpentCreate.model_validate(row)
+            except PydanticValidationError as e:
+                errors.append(BulkSpentError(index=index, error=_format_validation_error(e)))
+                continue
 
-            created_spents = await self.repo.create_many(spents_to_create)
-            return created_spents[0]
+            if spent.is_installment:
+                message = "Parcelamentos não são suportados em lote"
+            elif spent.category not in category_keys:
+                message = f"Categoria '{spent.category}' não existe"
+            elif spent.payment_method not in payment_method_keys:
+                message = f"Método de pagamento '{spent.payment_method}' não existe"
+            else:
+                data = spent.model_dump(exclude={"is_installment"})
+                data["id"] = uuid.uuid4()
+                data["created_at"] = data["created_at"] or now
+                to_insert.append(data)
+                continue
+            errors.append(BulkSpentError(index=index, error=message))
 
-        return await self.repo.create(spent)
+        created = await self.repo.create_many(to_insert) if to_insert else []
+        errors.sort(key=lambda error: error.index)
+        return BulkSpentResult(
+            created=len(created),
+            items=[SpentResponse.model_validate(spent) for spent in created],
+            errors=errors,
+        )
 
     @handle_service_errors
     async def list(
@@ -66,39 +202,121 @@ class SpentService:
         size: int = 10,
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        estimate_total: bool = False,
     ) -> PaginatedResponse["Spent"]:
         logger.info(f"Listing spents page {page} size {size} start {start_date} end {end_date}")
         skip = (page - 1) * size
-        items, total = await self.repo.list(skip, size, start_date, end_date)
-        return PaginatedResponse.create(items, total, page, size)
+        page_cursor = PageCursor.decode(cursor) if cursor is not None else None
+        total_mode = TotalMode.from_flags(include_total, estimate_total)
+        items, total = await self.repo.list(
+            skip, size, start_date, end_date, page_cursor, total_mode
+        )
+        return PaginatedResponse.create(items, total, page, size, page_cursor)
+
+    @staticmethod
+    def _month_bounds(reference_month: str) -> tuple[date, date]:
+        year, month = map(int, reference_month.split("-"))
+        _, last_day = calendar.monthrange(year, month)
+        return date(year, month, 1), date(year, month, last_day)
 
     @handle_service_errors
     async def get_dashboard(
-        self, reference_month: str, mode: str, page: int, size: int, inv_service, pm_repo
+        self, reference_month: str, mode: str, page: int, size: int, inv_service
     ) -> PaginatedResponse["Spent"]:
         logger.info(f"Dashboard mode {mode} for {reference_month}")
         skip = (page - 1) * size
 
         if mode == "CIVIL_MONTH":
-            year, month = map(int, reference_month.split("-"))
-            _, last_day = calendar.monthrange(year, month)
-            start_date = date(year, month, 1)
-            end_date = date(year, month, last_day)
+            start_date, end_date = self._month_bounds(reference_month)
             items, total = await self.repo.list(skip, size, start_date, end_date)
             return PaginatedResponse.create(items, total, page, size)
 
         elif mode == "INVOICES":
-            payment_methods, _ = await pm_repo.list(page=1, size=1000)
-            periods = []
-            for pm in payment_methods:
-                start_d, end_d = await inv_service.get_invoice_dates(pm, reference_month)
-                periods.append((pm.key, start_d, end_d))
-
+            periods = await inv_service.get_billing_periods(reference_month, mode)
             items, total = await self.repo.list_by_multiple_periods(periods, skip, size)
             return PaginatedResponse.create(items, total, page, size)
         else:
             raise ValidationError(f"Modo inválido: {mode}")
 
+    @handle_service_errors
+    async def get_dashboard_summary(
+        self, reference_month: str, mode: str, inv_service
+    ) -> DashboardSummary:
+        logger.info(f"Dashboard summary mode {mode} for {reference_month}")
+
+        periods = await inv_service.get_billing_periods(reference_month, mode)
+        rows = await self.repo.get_dashboard_totals(periods)
+
+        breakdown: List[DashboardBreakdownItem] = []
+        categories: dict[str, CategoryTotal] = {}
+        payment_methods: dict[str, PaymentMethodTotal] = {}
+
+        for row in rows:
+            category = categories.setdefault(
+                row["category"],
+                CategoryTotal(
+                    category=row["category"],
+                    spent_total=0.0,
+                    spent_count=0,
+                    subscription_total=0.0,
+                    total=0.0,
+                ),
+            )
+            if row["payment_method"] is None:
+                category.limit = row["limit_amount"]
+                continue
+
+            row_total = row["spent_total"] + row["subscription_total"]
+            breakdown.append(
+                DashboardBreakdownItem(
+                    category=row["category"],
+                    payment_method=row["payment_method"],
+                    spent_total=row["spent_total"],
+                    spent_count=row["spent_count"],
+                    subscription_total=row["subscription_total"],
+                    total=row_total,
+                )
+            )
+
+            category.spent_total += row["spent_total"]
+            category.spent_count += row["spent_count"]
+            category.subscription_total += row["subscription_total"]
+            category.total += row_total
+
+            pm_total = payment_methods.setdefault(
+                row["payment_method"],
+                PaymentMethodTotal(
+                    payment_method=row["payment_method"],
+                    spent_total=0.0,
+                    spent_count=0,
+                    subscription_total=0.0,
+                    total=0.0,
+                ),
+            )
+            pm_total.spent_total += row["spent_total"]
+            pm_total.spent_count += row["spent_count"]
+            pm_total.subscription_total += row["subscription_total"]
+            pm_total.total += row_total
+
+        for category in categories.values():
+            if category.limit is not None:
+                category.remaining = max(0.0, category.limit - category.total)
+
+        return DashboardSummary(
+            reference_month=reference_month,
+            mode=mode,
+            periods=[
+                DashboardPeriod(payment_method=pm_key, start_date=start_d, end_date=end_d)
+                for pm_key, start_d, end_d in periods
+            ],
+            total=sum(item.total for item in breakdown),
+            categories=sorted(categories.values(), key=lambda c: c.total, reverse=True),
+            payment_methods=sorted(payment_methods.values(), key=lambda p: p.total, reverse=True),
+            breakdown=breakdown,
+        )
+
     @handle_service_errors
     async def get_by_id(self, spent_id: UUID) -> "Spent":
         logger.info(f"Getting spent by id: {spent_id}")
@@ -1,3 +1,4 @@
+from typing import Optional
 from uuid import UUID
 
 from finance_api.models.subscriptions import Subscription
@@ -7,7 +8,7 @@ from finance_api.repositories.categories import CategoryRepository
 from finance_api.schemas.subscriptions import SubscriptionCreate, SubscriptionUpdate
 from finance_api.core.decorators import handle_service_errors
 from finance_api.core.exceptions import EntityNotFoundError, ValidationError
-from finance_api.schemas.pagination import PaginatedResponse
+from finance_api.schemas.pagination import PageCursor, PaginatedResponse, TotalMode
 from finance_api.core.logger import get_logger
 
 logger = get_logger(__name__)
@@ -31,12 +32,20 @@ class SubscriptionService:
 
     @handle_service_errors
     async def list(
-        self, page: int = 1, size: int = 10, active_only: bool = False
+        self,
+        page: int = 1,
+        size: int = 10,
+        active_only: bool = False,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        estimate_total: bool = False,
     ) -> PaginatedResponse["Subscription"]:
         logger.info(f"Listing subscriptions page {page} size {size} active_only {active_only}")
         skip = (page - 1) * size
-        items, total = await self.repo.list(skip, size, active_only)
-        return PaginatedResponse.create(items, total, page, size)
+        page_cursor = PageCursor.decode(cursor) if cursor is not None else None
+        total_mode = TotalMode.from_flags(include_total, estimate_total)
+        items, total = await self.repo.list(skip, size, active_only, page_cursor, total_mode)
+        return PaginatedResponse.create(items, total, page, size, page_cursor)
 
     @handle_service_errors
     async def get_by_id(self, subscription_id: UUID) -> "Subscription":
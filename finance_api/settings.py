@@ -7,6 +7,13 @@ class FinanceApiSettings(BaseSettings):
     DATABASE_URL: str
     AGENT_SERVICE_URL: str = "http://localhost:8001"
     FRONTEND_URL: str = "http://localhost:5173"
+    # Business calendar used for invoice closing/due dates.
+    # Subdivision is a state code (e.g. "SP") and extra holidays are comma-separated
+    # ISO dates for municipal holidays (e.g. "2026-01-25,2026-07-09").
+    BUSINESS_CALENDAR_SUBDIVISION: str | None = None
+    BUSINESS_CALENDAR_EXTRA_HOLIDAYS: str = ""
+    BUSINESS_CALENDAR_YEARS_BACK: int = 2
+    BUSINESS_CALENDAR_YEARS_AHEAD: int = 3
 
 
 settings = FinanceApiSettings()
@@ -13,6 +13,25 @@ CREATE TABLE IF NOT EXISTS spents (
 
 CREATE INDEX IF NOT EXISTS ix_spents_category ON spents (category);
 CREATE INDEX IF NOT EXISTS ix_spents_installment_id ON spents (installment_id);
+-- Local-date filters are rewritten as half-open created_at ranges (America/Sao_Paulo),
+-- so civil-month and per-card invoice periods are served as index range scans.
+-- Older databases get these indexes and spend_rollups with `make upgrade-finance-db`.
+CREATE INDEX IF NOT EXISTS ix_spents_created_at ON spents (created_at);
+CREATE INDEX IF NOT EXISTS ix_spents_payment_method_created_at ON spents (payment_method, created_at);
+
+-- Daily spent totals per category and payment method (local America/Sao_Paulo day).
+-- Maintained by the finance API in the same transaction as every spent write;
+-- rebuild with `make rebuild-rollups`.
+CREATE TABLE IF NOT EXISTS spend_rollups (
+    spend_day DATE NOT NULL,
+    category VARCHAR NOT NULL,
+    payment_method VARCHAR NOT NULL,
+    total DOUBLE PRECISION NOT NULL DEFAULT 0,
+    count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (spend_day, category, payment_method)
+);
+
+CREATE INDEX IF NOT EXISTS ix_spend_rollups_payment_method_day ON spend_rollups (payment_method, spend_day);
 
 CREATE TABLE IF NOT EXISTS subscriptions (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -108,9 +127,25 @@ ON CONFLICT (key) DO NOTHING;
 
 CREATE TABLE IF NOT EXISTS chat_sessions (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now()
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+    summary TEXT,
+    state JSONB NOT NULL DEFAULT '{}'::jsonb,
+    summarized_through INTEGER NOT NULL DEFAULT 0,
+    last_activity_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+    completed_at TIMESTAMP WITHOUT TIME ZONE
 );
 
+-- Columns added after the first release; init.sql only runs on a new volume, so older
+-- databases get them with `make upgrade-agent-db` (same statements)
+ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS summary TEXT;
+ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS state JSONB NOT NULL DEFAULT '{}'::jsonb;
+ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS summarized_through INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS last_activity_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now();
+ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS completed_at TIMESTAMP WITHOUT TIME ZONE;
+
+CREATE INDEX IF NOT EXISTS ix_chat_sessions_last_activity_at ON chat_sessions (last_activity_at);
+CREATE INDEX IF NOT EXISTS ix_chat_sessions_completed_at ON chat_sessions (completed_at);
+
 CREATE TABLE IF NOT EXISTS chat_messages (
     id SERIAL PRIMARY KEY,
     session_id UUID NOT NULL,
@@ -123,7 +158,21 @@ CREATE TABLE IF NOT EXISTS chat_messages (
         ON DELETE CASCADE
 );
 
-CREATE INDEX IF NOT EXISTS ix_chat_messages_session_id ON chat_messages (session_id);
+-- Serves the history query (session_id = ? ORDER BY created_at DESC LIMIT n) without a
+-- sort, and the cascade delete of a purged session's messages
+CREATE INDEX IF NOT EXISTS ix_chat_messages_session_id_created_at
+    ON chat_messages (session_id, created_at);
+DROP INDEX IF EXISTS ix_chat_messages_session_id;
+
+CREATE TABLE IF NOT EXISTS media_cache (
+    key VARCHAR(200) PRIMARY KEY,
+    kind VARCHAR(100) NOT NULL,
+    value JSONB NOT NULL,
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+    expires_at TIMESTAMP WITHOUT TIME ZONE NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_media_cache_expires_at ON media_cache (expires_at);
 
 CREATE TABLE IF NOT EXISTS telegram_sessions (
     chat_id BIGINT PRIMARY KEY,
@@ -1,8 +1,9 @@
 """HTTP client for communicating with agent_api."""
 
 import asyncio
+import json
 import httpx
-from typing import Any
+from typing import Any, Awaitable, Callable
 
 from telegram_api.settings import settings
 from telegram_api.core.logger import get_logger
@@ -33,6 +34,15 @@ async def close_http_client() -> None:
         logger.info("HTTP client closed")
 
 
+def _session_gone(error: httpx.HTTPError, fields: dict) -> bool:
+    """Whether agent_api no longer knows the session (completed, expired or purged)."""
+    return (
+        isinstance(error, httpx.HTTPStatusError)
+        and error.response.status_code == 404
+        and "session_id" in fields
+    )
+
+
 async def send_message_to_agent(message: str, session_id: str | None = None) -> dict[str, Any]:
     """Send a text message to agent_api's /chat endpoint.
 
@@ -64,6 +74,10 @@ async def send_message_to_agent(message: str, session_id: str | None = None) ->
             logger.info(f"Received response from agent_api (attempt {attempt + 1})")
             return data
         except httpx.HTTPError as e:
+            if attempt < 2 and _session_gone(e, payload):
+                # Start a new session instead of failing every message of this chat
+                logger.info(f"Session {payload.pop('session_id')} is gone, starting a new one")
+                continue
             logger.warning(f"HTTP error on attempt {attempt + 1}: {e}")
             if attempt == 2:
                 raise
@@ -105,6 +119,10 @@ async def send_receipt_to_agent(
             logger.info(f"Received OCR response from agent_api (attempt {attempt + 1})")
             return result
         except httpx.HTTPError as e:
+            if attempt < 2 and _session_gone(e, data):
+                # Start a new session instead of failing every message of this chat
+                logger.info(f"Session {data.pop('session_id')} is gone, starting a new one")
+                continue
             logger.warning(f"HTTP error on attempt {attempt + 1}: {e}")
             if attempt == 2:
                 raise
@@ -112,7 +130,11 @@ async def send_receipt_to_agent(
 
 
 async def send_audio_to_agent(
-    file_content: bytes, filename: str, content_type: str, session_id: str | None = None
+    file_content: bytes,
+    filename: str,
+    content_type: str,
+    session_id: str | None = None,
+    on_partial: Callable[[str], Awaitable[None]] | None = None,
 ) -> dict[str, Any]:
     """Send an audio file to agent_api's /audio/process-audio endpoint.
 
@@ -121,6 +143,8 @@ async def send_audio_to_agent(
         filename: The original filename or a generic one
         content_type: MIME type of the audio
         session_id: Optional session ID to continue a conversation
+        on_partial: Optional callback receiving the transcription so far. When given, the
+            endpoint is called in streaming mode and the callback runs for each chunk.
 
     Returns:
         The response from agent_api containing extracted text response and session info
@@ -136,23 +160,64 @@ async def send_audio_to_agent(
     data = {"platform": "telegram"}
     if session_id:
         data["session_id"] = session_id
+    if on_partial is not None:
+        data["stream"] = "true"
 
     client = get_http_client()
 
     for attempt in range(3):
         try:
-            response = await client.post(url, files=files, data=data)
-            response.raise_for_status()
-            result = response.json()
+            if on_partial is not None:
+                result = await _read_audio_stream(client, url, files, data, on_partial)
+            else:
+                response = await client.post(url, files=files, data=data)
+                response.raise_for_status()
+                result = response.json()
             logger.info(f"Received audio response from agent_api (attempt {attempt + 1})")
             return result
         except httpx.HTTPError as e:
+            if attempt < 2 and _session_gone(e, data):
+                # Start a new session instead of failing every message of this chat
+                logger.info(f"Session {data.pop('session_id')} is gone, starting a new one")
+                continue
             logger.warning(f"HTTP error on attempt {attempt + 1}: {e}")
             if attempt == 2:
                 raise
             await asyncio.sleep(2**attempt)  # Exponential backoff
 
 
+async def _read_audio_stream(
+    client: httpx.AsyncClient,
+    url: str,
+    files: dict,
+    data: dict,
+    on_partial: Callable[[str], Awaitable[None]],
+) -> dict[str, Any]:
+    """Consume the NDJSON events of a streaming /audio/process-audio call."""
+    parts: list[str] = []
+    async with client.stream("POST", url, files=files, data=data) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            if event["type"] == "partial":
+                parts.append(event["text"])
+                await on_partial(" ".join(parts))
+            elif event["type"] == "result":
+                return {key: value for key, value in event.items() if key != "type"}
+            elif event["type"] == "error" and "status" in event:
+                # Rejected after the headers were sent (e.g. the session expired meanwhile)
+                raise httpx.HTTPStatusError(
+                    event["detail"],
+                    request=response.request,
+                    response=httpx.Response(event["status"], request=response.request),
+                )
+            elif event["type"] == "error":
+                return {"response": event["detail"], "is_complete": False}
+    raise httpx.RemoteProtocolError("Audio stream ended without a result", request=None)
+
+
 async def get_valid_categories() -> list[str]:
     """Fetch valid categories from finance API."""
     try:
@@ -208,17 +273,19 @@ async def get_valid_owners() -> list[str]:
     return ["joao_lucas", "lailla"]
 
 
-async def save_spent(details: dict) -> dict[str, Any]:
+async def save_spent(details: dict, return_series: bool = False) -> Any:
     """Save a spent directly to finance API.
 
     Args:
         details: dict with category, amount, item_bought, payment_method, payment_owner, location
+        return_series: when True, the API returns the list of every created installment
     """
     url = f"{settings.FINANCE_SERVICE_URL}/spents/"
     logger.info(f"Sending POST request to {url}")
     client = get_http_client()
 
-    response = await client.post(url, json=details)
+    params = {"return_series": "true"} if return_series else None
+    response = await client.post(url, json=details, params=params)
     response.raise_for_status()
     logger.info("Finance API request successful")
     return response.json()
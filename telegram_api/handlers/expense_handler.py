@@ -309,6 +309,7 @@ async def confirm_expense(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
     if query.data == "confirm":
         expense = context.user_data.get("expense", {})
+        success_text = "✅ Registro salvo com sucesso!"
         try:
             ptype = expense.get("purchase_type", "a_vista")
 
@@ -339,9 +340,11 @@ async def confirm_expense(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
                     spent_data["current_installment"] = expense.get("current_installment", 1)
                     spent_data["total_installments"] = expense.get("total_installments", 1)
 
-                await save_spent(spent_data)
+                saved = await save_spent(spent_data, return_series=ptype == "parcelada")
+                if ptype == "parcelada" and isinstance(saved, list):
+                    success_text += f" {len(saved)} parcela(s) registrada(s)."
 
-            await query.edit_message_text(text="✅ Registro salvo com sucesso!")
+            await query.edit_message_text(text=success_text)
             logger.info("Saved successfully.")
         except Exception as e:
             logger.error(f"Failed to save: {e}")
@@ -1,4 +1,5 @@
 from telegram import Update
+from telegram.error import TelegramError
 from telegram.ext import ContextTypes
 import httpx
 from io import BytesIO
@@ -49,12 +50,27 @@ async def handle_voice_message(update: Update, context: ContextTypes.DEFAULT_TYP
             # Send typing indicator while LLM processes transcription and response
             await update.message.chat.send_action("typing")
 
+            # Long audios are transcribed in chunks; show the text as it arrives
+            progress_message = None
+
+            async def show_partial(text: str) -> None:
+                nonlocal progress_message
+                preview = f"🎙️ {text}"
+                try:
+                    if progress_message is None:
+                        progress_message = await update.message.reply_text(preview)
+                    elif progress_message.text != preview:
+                        progress_message = await progress_message.edit_text(preview)
+                except TelegramError as e:
+                    logger.warning(f"Could not show partial transcription: {e}")
+
             # Send to agent_api
             response_data = await send_audio_to_agent(
                 file_content=audio_bytes.getvalue(),
                 filename=f"audio_{chat_id}.ogg",
                 content_type=mime_type,
                 session_id=session_id,
+                on_partial=show_partial,
             )
 
             # Extract the response message
@@ -2,6 +2,7 @@ from unittest.mock import AsyncMock, MagicMock
 from datetime import datetime, timezone
 import uuid
 import pytest
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
 from agent_api.repositories.chat_repository import ChatRepository
 from agent_api.models.chat import ChatSession, ChatMessage
@@ -17,6 +18,7 @@ def mock_db_session():
     mock_result.scalars.return_value.all.return_value = []
     mock_result.scalar_one_or_none.return_value = None
     session.execute.return_value = mock_result
+    session.scalars.return_value = MagicMock()
 
     session.add = MagicMock()
 
@@ -143,3 +145,89 @@ async def test_get_messages_limit(mock_db_session):
     query_str = str(args[0])
     assert "LIMIT" in query_str or "limit" in query_str
     mock_db_session.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_session_does_not_load_messages(mock_db_session):
+    repo = ChatRepository(mock_db_session)
+
+    await repo.get_session(uuid.uuid4())
+
+    query = mock_db_session.execute.call_args.args[0]
+    assert "chat_messages" not in str(query)
+    assert not query._with_options
+
+
+@pytest.mark.asyncio
+async def test_save_turn_commits_once(mock_db_session):
+    repo = ChatRepository(mock_db_session)
+    session_id = uuid.uuid4()
+    stored = [ChatMessage(id=1, role="user"), ChatMessage(id=2, role="assistant")]
+    mock_db_session.scalars.return_value.all.return_value = stored
+    messages = [
+        {"role": "user", "content": "Hi", "created_at": datetime(2026, 1, 1, 12, 0)},
+        {"role": "assistant", "content": "Hello", "created_at": datetime(2026, 1, 1, 12, 1)},
+    ]
+
+    # Act
+    saved = await repo.save_turn(session_id, messages)
+
+    # Assert
+    assert saved == stored
+    stmt, rows = mock_db_session.scalars.call_args.args
+    assert "RETURNING" in str(stmt)
+    assert [row["session_id"] for row in rows] == [session_id, session_id]
+    session_update = mock_db_session.execute.call_args.args[0]
+    assert set(session_update.compile().params) == {"last_activity_at", "id_1"}
+    mock_db_session.commit.assert_awaited_once()
+    mock_db_session.refresh.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_save_turn_creates_session_with_memory(mock_db_session):
+    repo = ChatRepository(mock_db_session)
+    memory = {"summary": None, "state": {"limit": {"valor": 300.0}}, "summarized_through": 0}
+
+    await repo.save_turn(uuid.uuid4(), [{"role": "user", "content": "Hi"}], memory, True)
+
+    query = str(mock_db_session.execute.call_args.args[0])
+    assert query.startswith("INSERT INTO chat_sessions")
+    mock_db_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_save_turn_updates_memory(mock_db_session):
+    repo = ChatRepository(mock_db_session)
+    memory = {"summary": "Usuário: oi", "state": {}, "summarized_through": 7}
+
+    await repo.save_turn(uuid.uuid4(), [{"role": "user", "content": "Hi"}], memory)
+
+    query = str(mock_db_session.execute.call_args.args[0])
+    assert query.startswith("UPDATE chat_sessions SET summary=")
+    mock_db_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_save_turn_marks_session_completed(mock_db_session):
+    repo = ChatRepository(mock_db_session)
+
+    await repo.save_turn(uuid.uuid4(), [{"role": "user", "content": "Sim"}], completed=True)
+
+    session_update = mock_db_session.execute.call_args.args[0]
+    assert "completed_at" in session_update.compile().params
+
+
+@pytest.mark.asyncio
+async def test_purge_sessions_deletes_one_batch(mock_db_session):
+    repo = ChatRepository(mock_db_session)
+    mock_db_session.execute.return_value.rowcount = 3
+    now = datetime(2026, 1, 10)
+
+    purged = await repo.purge_sessions(now, now, batch_size=50)
+
+    assert purged == 3
+    stmt = mock_db_session.execute.call_args.args[0]
+    query = str(stmt.compile(dialect=postgresql.dialect()))
+    assert query.startswith("DELETE FROM chat_sessions")
+    assert "LIMIT" in query and "FOR UPDATE SKIP LOCKED" in query
+    mock_db_session.commit.assert_awaited_once()
@@ -0,0 +1,147 @@
+"""Unit tests for the audio router streaming mode."""
+
+import json
+import uuid
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from asgi_lifespan import LifespanManager
+from httpx import ASGITransport, AsyncClient
+
+from agent_api.core.exceptions import AudioProcessingError, TranscriptionBusyError
+from agent_api.main import app
+from agent_api.models.chat import ChatSession
+from agent_api.schemas.dtos import ChatResponse
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+async def test_client():
+    async with LifespanManager(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            yield client
+
+
+@pytest.fixture
+def mock_chat_service(mocker):
+    MockService = mocker.patch("agent_api.routers.audio.ChatService")
+    instance = MockService.return_value
+    instance.process_message = AsyncMock(
+        return_value=ChatResponse(response="Registrado!", session_id="s1", history=[])
+    )
+    instance.get_open_session = AsyncMock()
+    return instance
+
+
+def _partials(*texts, error: Exception | None = None):
+    async def transcribe_audio_stream(audio_bytes, mime_type):
+        for text in texts:
+            yield text
+        if error is not None:
+            raise error
+
+    return transcribe_audio_stream
+
+
+def _events(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+async def test_stream_emits_partials_then_result(test_client, mock_chat_service, mocker):
+    mocker.patch(
+        "agent_api.routers.audio.audio_service.transcribe_audio_stream",
+        _partials("mercado 50 reais", "farmácia 20 reais"),
+    )
+
+    response = await test_client.post(
+        "/audio/process-audio",
+        files={"file": ("a.ogg", b"audio", "audio/ogg")},
+        data={"stream": "true"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    events = _events(response)
+    assert [event["type"] for event in events] == ["partial", "partial", "result"]
+    assert events[1] == {"type": "partial", "index": 1, "text": "farmácia 20 reais"}
+    assert events[2]["response"] == "Registrado!"
+    mock_chat_service.process_message.assert_awaited_once_with(
+        "mercado 50 reais farmácia 20 reais", None, None
+    )
+
+
+async def test_stream_reports_errors_after_first_chunk_as_event(
+    test_client, mock_chat_service, mocker
+):
+    mocker.patch(
+        "agent_api.routers.audio.audio_service.transcribe_audio_stream",
+        _partials("mercado", error=AudioProcessingError("Falha ao transcrever o áudio")),
+    )
+
+    response = await test_client.post(
+        "/audio/process-audio",
+        files={"file": ("a.ogg", b"audio", "audio/ogg")},
+        data={"stream": "true"},
+    )
+
+    events = _events(response)
+    assert events[-1] == {"type": "error", "detail": "Falha ao transcrever o áudio"}
+    mock_chat_service.process_message.assert_not_awaited()
+
+
+async def test_stream_keeps_status_code_for_errors_before_first_chunk(
+    test_client, mock_chat_service, mocker
+):
+    mocker.patch(
+        "agent_api.routers.audio.audio_service.transcribe_audio_stream",
+        _partials(error=TranscriptionBusyError("ocupado")),
+    )
+
+    response = await test_client.post(
+        "/audio/process-audio",
+        files={"file": ("a.ogg", b"audio", "audio/ogg")},
+        data={"stream": "true"},
+    )
+
+    assert response.status_code == 503
+
+
+async def test_stream_with_expired_session_answers_404_before_transcribing(test_client, mocker):
+    session_id = uuid.uuid4()
+    repository = mocker.patch("agent_api.services.chat.ChatRepository").return_value
+    repository.get_session = AsyncMock(
+        return_value=ChatSession(id=session_id, completed_at=datetime(2026, 1, 1))
+    )
+    transcribe = mocker.patch(
+        "agent_api.routers.audio.audio_service.transcribe_audio_stream", MagicMock()
+    )
+
+    response = await test_client.post(
+        "/audio/process-audio",
+        files={"file": ("a.ogg", b"audio", "audio/ogg")},
+        data={"stream": "true", "session_id": str(session_id)},
+    )
+
+    assert response.status_code == 404
+    transcribe.assert_not_called()
+
+
+async def test_stream_reports_session_closed_midway_with_status(
+    test_client, mock_chat_service, mocker
+):
+    from fastapi import HTTPException
+
+    mocker.patch(
+        "agent_api.routers.audio.audio_service.transcribe_audio_stream", _partials("mercado")
+    )
+    mock_chat_service.process_message.side_effect = HTTPException(404, "Session not found")
+
+    response = await test_client.post(
+        "/audio/process-audio",
+        files={"file": ("a.ogg", b"audio", "audio/ogg")},
+        data={"stream": "true", "session_id": str(uuid.uuid4())},
+    )
+
+    assert _events(response)[-1] == {"type": "error", "status": 404, "detail": "Session not found"}
@@ -77,3 +77,15 @@ async def test_chat_endpoint_passes_session_id(test_client, mock_chat_service):
 
     # Assert
     mock_chat_service.process_message.assert_awaited_once_with("Hello again", fake_id, None)
+
+
+async def test_chat_endpoint_returns_503_when_llm_queue_is_full(test_client, mocker):
+    from agent_api.services import llm
+
+    mocker.patch("agent_api.services.llm.get_system_prompt", AsyncMock(return_value="prompt"))
+    mocker.patch.object(llm.llm_registry, "max_queue", 0)
+
+    response = await test_client.post("/chat", json={"message": "Oi"})
+
+    assert response.status_code == 503
+    assert "Too many LLM requests" in response.json()["detail"]
@@ -9,9 +9,14 @@ from asgi_lifespan import LifespanManager
 from agent_api.main import app
 from agent_api.schemas.dtos import ChatResponse, ChatMessage
 from agent_api.core.exceptions import OCRProcessingError
+from agent_api.services.nfce import access_key_check_digit, parse_nfce_qr
 
 pytestmark = pytest.mark.asyncio
 
+# PR, 2025-06, CNPJ 12.345.678/0001-90, NFC-e 12345 issued in offline contingency
+NFCE_KEY_BODY = "4125061234567800019065001000012345912345678"
+NFCE_ACCESS_KEY = NFCE_KEY_BODY + str(access_key_check_digit(NFCE_KEY_BODY))
+
 
 @pytest.fixture
 async def test_client():
@@ -34,6 +39,7 @@ def mock_ocr_service(mocker):
     service_patch = mocker.patch("agent_api.routers.ocr.ocr_service")
     # Make extract_text return an AsyncMock
     service_patch.extract_text = AsyncMock()
+    service_patch.read_qr_code = AsyncMock(return_value=None)
     return service_patch
 
 
@@ -270,3 +276,46 @@ class TestOCRValidation:
             files = {"file": (filename, b"fake image", "image/jpeg")}
             response = await test_client.post("/ocr/extract", files=files)
             assert response.status_code == 200, f"Failed for {filename}"
+
+
+class TestOCRQRCodeFastPath:
+    """Tests for the NFC-e QR code fast path of POST /ocr/process-receipt."""
+
+    def _receipt(self, fields: str):
+        key = NFCE_ACCESS_KEY
+        return parse_nfce_qr(f"https://www.fazenda.pr.gov.br/nfce/qrcode?p={key}|{fields}")
+
+    async def test_qr_code_with_total_skips_ocr(
+        self, test_client, mock_ocr_service, mock_chat_service
+    ):
+        mock_ocr_service.read_qr_code.return_value = self._receipt("2|1|15|45.90|6a6b|1|ABCDEF")
+        mock_chat_service.process_message.return_value = ChatResponse(
+            response="Qual o método de pagamento?", session_id="s1", history=[]
+        )
+
+        files = {"file": ("receipt.jpg", b"fake image", "image/jpeg")}
+        response = await test_client.post("/ocr/process-receipt", files=files)
+
+        assert response.status_code == 200
+        mock_ocr_service.extract_text.assert_not_awaited()
+        message_arg = mock_chat_service.process_message.call_args[0][0]
+        assert "R$ 45,90" in message_arg
+        assert "15/06/2025" in message_arg
+
+    async def test_qr_code_without_total_still_runs_ocr(
+        self, test_client, mock_ocr_service, mock_chat_service
+    ):
+        mock_ocr_service.read_qr_code.return_value = self._receipt("2|1|1|ABCDEF")
+        mock_ocr_service.extract_text.return_value = ("MERCADO\nTotal: 132,07", 75.0)
+        mock_chat_service.process_message.return_value = ChatResponse(
+            response="ok", session_id="s1", history=[]
+        )
+
+        files = {"file": ("receipt.jpg", b"fake image", "image/jpeg")}
+        response = await test_client.post("/ocr/process-receipt", files=files)
+
+        assert response.status_code == 200
+        mock_ocr_service.extract_text.assert_awaited_once()
+        message_arg = mock_chat_service.process_message.call_args[0][0]
+        assert "12.345.678/0001-90" in message_arg
+        assert "132,07" in message_arg
@@ -0,0 +1,360 @@
+import asyncio
+import io
+import threading
+import time
+from unittest.mock import MagicMock
+
+import av
+import numpy as np
+import pytest
+
+from agent_api.core.exceptions import (
+    AudioProcessingError,
+    InvalidAudioError,
+    TranscriptionBusyError,
+)
+from agent_api.core.metrics import metrics
+from agent_api.services.result_cache import result_cache
+from agent_api.services.audio import (
+    AudioService,
+    ModelSelectionPolicy,
+    TranscriptionEngine,
+    WhisperProfile,
+    decode_audio_bytes,
+    split_on_speech,
+)
+
+
+def _fake_model(text: str = "cinquenta reais mercado", delay: threading.Event | None = None):
+    model = MagicMock()
+
+    def transcribe(audio, **kwargs):
+        if delay is not None:
+            delay.wait(timeout=2)
+        return [_segment(f" {text}")], MagicMock(language="pt")
+
+    model.transcribe.side_effect = transcribe
+    return model
+
+
+def _segment(text: str, avg_logprob: float = -0.2, no_speech_prob: float = 0.01):
+    return MagicMock(text=text, avg_logprob=avg_logprob, no_speech_prob=no_speech_prob)
+
+
+@pytest.fixture(autouse=True)
+def empty_result_cache(monkeypatch):
+    result_cache.clear()
+    monkeypatch.setattr(result_cache, "persist", False)
+    yield
+    result_cache.clear()
+
+
+@pytest.fixture
+def whisper_model(mocker):
+    model = _fake_model()
+    model_class = mocker.patch("agent_api.services.audio.WhisperModel", return_value=model)
+    return model_class
+
+
+@pytest.mark.asyncio
+async def test_model_is_loaded_once(whisper_model):
+    engine = TranscriptionEngine(workers=2)
+
+    texts = await asyncio.gather(*(engine.transcribe(b"audio") for _ in range(3)))
+
+    assert texts == ["cinquenta reais mercado"] * 3
+    whisper_model.assert_called_once_with("base", device="cpu", compute_type="int8", num_workers=2)
+    engine.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_decoding_runs_off_the_event_loop(mocker):
+    loop_thread = threading.get_ident()
+    decode_threads = []
+    model = _fake_model()
+    original = model.transcribe.side_effect
+
+    def transcribe(audio, **kwargs):
+        decode_threads.append(threading.get_ident())
+        return original(audio, **kwargs)
+
+    model.transcribe.side_effect = transcribe
+    mocker.patch("agent_api.services.audio.WhisperModel", return_value=model)
+    engine = TranscriptionEngine()
+
+    await engine.transcribe(b"audio")
+
+    assert decode_threads and decode_threads[0] != loop_thread
+    engine.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_admission_queue_rejects_when_saturated(mocker):
+    release = threading.Event()
+    mocker.patch("agent_api.services.audio.WhisperModel", return_value=_fake_model(delay=release))
+    engine = TranscriptionEngine(workers=1, max_queue=1)
+    metrics.reset()
+
+    running = [asyncio.create_task(engine.transcribe(b"audio")) for _ in range(2)]
+    await asyncio.sleep(0.05)
+    assert engine.queue_depth == 2
+    assert metrics.gauges["audio.queue_depth"] == 2
+
+    with pytest.raises(TranscriptionBusyError):
+        await engine.transcribe(b"audio")
+
+    release.set()
+    await asyncio.gather(*running)
+    assert engine.queue_depth == 0
+    assert metrics.counters["audio.rejected"] == 1
+    assert metrics.timings["audio.decode"].count == 2
+    engine.shutdown()
+
+
+def _speech(*regions):
+    return [{"start": int(start * 16000), "end": int(end * 16000)} for start, end in regions]
+
+
+def test_split_on_speech_packs_regions_up_to_the_chunk_limit(mocker):
+    mocker.patch(
+        "agent_api.services.audio.get_speech_timestamps",
+        return_value=_speech((1, 10), (11, 25), (27, 40), (42, 50), (80, 85)),
+    )
+
+    chunks = split_on_speech(np.zeros(90 * 16000, dtype=np.float32), max_chunk_seconds=30)
+
+    assert chunks == [(16000, 25 * 16000), (27 * 16000, 50 * 16000), (80 * 16000, 85 * 16000)]
+
+
+@pytest.mark.asyncio
+async def test_long_audio_is_chunked_and_decoded_in_parallel_in_order(mocker):
+    mocker.patch(
+        "agent_api.services.audio.get_speech_timestamps",
+        return_value=_speech((0, 20), (40, 60), (70, 80)),
+    )
+    both_running = threading.Barrier(2, timeout=2)
+    model = MagicMock()
+
+    def transcribe(audio, **kwargs):
+        assert kwargs["vad_filter"] is False
+        seconds = round(len(audio) / 16000)
+        if seconds == 20:
+            # The first two chunks only finish if they run at the same time
+            both_running.wait()
+        return [_segment(f" parte {seconds}s")], MagicMock(language="pt")
+
+    model.transcribe.side_effect = transcribe
+    mocker.patch("agent_api.services.audio.WhisperModel", return_value=model)
+    engine = TranscriptionEngine(workers=2, chunk_seconds=30)
+    metrics.reset()
+
+    audio = np.zeros(90 * 16000, dtype=np.float32)
+    partials = [text async for text in engine.transcribe_stream(audio)]
+
+    assert partials == ["parte 20s", "parte 20s", "parte 10s"]
+    assert metrics.counters["audio.chunks"] == 3
+    assert engine.queue_depth == 0
+    engine.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_short_audio_is_decoded_whole_with_vad(mocker, whisper_model):
+    split = mocker.patch("agent_api.services.audio.get_speech_timestamps")
+    engine = TranscriptionEngine(chunk_seconds=30)
+
+    text = await engine.transcribe(np.zeros(10 * 16000, dtype=np.float32))
+
+    assert text == "cinquenta reais mercado"
+    split.assert_not_called()
+    assert whisper_model.return_value.transcribe.call_args.kwargs["vad_filter"] is True
+    engine.shutdown()
+
+
+LADDER = [WhisperProfile("tiny"), WhisperProfile("base"), WhisperProfile("small")]
+
+
+@pytest.mark.parametrize(
+    "duration,queue_depth,expected",
+    [
+        (3, 1, "small"),  # 3s x 0.9 fits a 5s budget
+        (10, 1, "base"),  # small would take ~9s
+        (10, 3, "tiny"),  # two clips queued ahead on one worker triple the estimate
+        (120, 1, "tiny"),  # nothing fits: smallest model
+    ],
+)
+def test_policy_picks_largest_model_within_latency_budget(duration, queue_depth, expected):
+    policy = ModelSelectionPolicy(LADDER, target_latency=5)
+
+    assert policy.select(duration, queue_depth, workers=1).size == expected
+
+
+def test_policy_uses_greedy_decoding_for_short_clips_and_learns_speed():
+    policy = ModelSelectionPolicy(LADDER, target_latency=5, short_clip_seconds=10)
+
+    assert policy.beam_size(4) == 1
+    assert policy.beam_size(25) == 5
+
+    for _ in range(20):
+        policy.record(WhisperProfile("small"), duration=10, elapsed=2)
+    assert policy.select(10, 1, workers=1).size == "small"
+
+
+@pytest.mark.asyncio
+async def test_model_load_time_is_not_recorded_as_decode_speed(mocker):
+    def slow_load(*args, **kwargs):
+        time.sleep(0.2)
+        return _fake_model()
+
+    mocker.patch("agent_api.services.audio.WhisperModel", side_effect=slow_load)
+    policy = ModelSelectionPolicy(LADDER[:1], target_latency=5)
+    record = mocker.spy(policy, "record")
+    engine = TranscriptionEngine(policy=policy)
+
+    await engine.transcribe(np.zeros(3 * 16000, dtype=np.float32))
+
+    assert record.call_args.args[2] < 0.2
+    engine.shutdown()
+
+
+def _ladder_models(mocker, confidences: dict):
+    calls = []
+
+    def model_for(size, **kwargs):
+        model = MagicMock()
+
+        def transcribe(audio, **options):
+            calls.append((size, options["beam_size"]))
+            avg_logprob, no_speech_prob = confidences[size]
+            segment = _segment(f" texto {size}", avg_logprob, no_speech_prob)
+            return [segment], MagicMock(language="pt")
+
+        model.transcribe.side_effect = transcribe
+        return model
+
+    mocker.patch("agent_api.services.audio.WhisperModel", side_effect=model_for)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_low_confidence_result_falls_back_to_larger_model(mocker):
+    calls = _ladder_models(mocker, {"tiny": (-1.4, 0.1), "base": (-0.3, 0.05)})
+    engine = TranscriptionEngine(
+        policy=ModelSelectionPolicy(LADDER[:2], target_latency=0.5, short_clip_seconds=10)
+    )
+    metrics.reset()
+
+    text = await engine.transcribe(np.zeros(3 * 16000, dtype=np.float32))
+
+    assert text == "texto base"
+    assert calls == [("tiny", 1), ("base", 5)]
+    assert metrics.counters["audio.fallbacks"] == 1
+    engine.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_confident_result_is_kept(mocker):
+    calls = _ladder_models(mocker, {"tiny": (-0.2, 0.01), "base": (-0.1, 0.01)})
+    engine = TranscriptionEngine(policy=ModelSelectionPolicy(LADDER[:2], target_latency=0.5))
+
+    text = await engine.transcribe(np.zeros(3 * 16000, dtype=np.float32))
+
+    assert text == "texto tiny"
+    assert calls == [("tiny", 1)]
+    engine.shutdown()
+
+
+def _encode_tone(container_format: str, codec: str, rate: int = 48000, seconds: float = 1.0):
+    t = np.arange(int(rate * seconds)) / rate
+    tone = (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+    buffer = io.BytesIO()
+    with av.open(buffer, "w", format=container_format) as container:
+        stream = container.add_stream(codec, rate=rate)
+        stream.layout = "stereo"
+        frame = av.AudioFrame.from_ndarray(np.stack([tone, tone]), format="fltp", layout="stereo")
+        frame.rate = rate
+        for packet in stream.encode(frame):
+            container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize(
+    "container_format,codec,mime_type",
+    [("ogg", "libopus", "audio/ogg; codecs=opus"), ("wav", "pcm_s16le", "audio/wav")],
+)
+def test_decode_audio_bytes_returns_16k_mono_float32(container_format, codec, mime_type):
+    samples = decode_audio_bytes(_encode_tone(container_format, codec), mime_type)
+
+    assert samples.dtype == np.float32
+    assert samples.ndim == 1
+    assert abs(len(samples) - 16000) < 400
+
+
+def test_decode_audio_bytes_probes_when_mime_type_is_wrong():
+    samples = decode_audio_bytes(_encode_tone("wav", "pcm_s16le"), "audio/mpeg")
+
+    assert len(samples) == 16000
+
+
+def test_decode_audio_bytes_rejects_garbage():
+    with pytest.raises(InvalidAudioError):
+        decode_audio_bytes(b"not audio", "audio/ogg")
+
+
+@pytest.mark.asyncio
+async def test_transcribe_audio_feeds_decoded_array_to_engine(mocker):
+    received = []
+
+    async def transcribe_stream(samples):
+        received.append(samples)
+        yield "ok"
+
+    mocker.patch(
+        "agent_api.services.audio.transcription_engine.transcribe_stream", transcribe_stream
+    )
+
+    text = await AudioService.transcribe_audio(_encode_tone("ogg", "libopus"), "audio/ogg")
+
+    assert text == "ok"
+    assert isinstance(received[0], np.ndarray) and received[0].dtype == np.float32
+
+
+@pytest.mark.asyncio
+async def test_transcribe_audio_wraps_engine_errors(mocker):
+    async def failing_transcribe(samples):
+        raise RuntimeError("decoder exploded")
+        yield
+
+    mocker.patch(
+        "agent_api.services.audio.transcription_engine.transcribe_stream", failing_transcribe
+    )
+
+    with pytest.raises(AudioProcessingError):
+        await AudioService.transcribe_audio(_encode_tone("wav", "pcm_s16le"), "audio/wav")
+
+
+@pytest.mark.asyncio
+async def test_transcribe_audio_rejects_undecodable_audio():
+    with pytest.raises(InvalidAudioError):
+        await AudioService.transcribe_audio(b"not audio", "audio/ogg")
+
+
+@pytest.mark.asyncio
+async def test_resent_voice_note_is_answered_from_cache(mocker):
+    calls = []
+
+    async def transcribe_stream(samples):
+        calls.append(samples)
+        yield "mercado 50 reais"
+
+    mocker.patch(
+        "agent_api.services.audio.transcription_engine.transcribe_stream", transcribe_stream
+    )
+    audio = _encode_tone("wav", "pcm_s16le")
+
+    first = await AudioService.transcribe_audio(audio, "audio/wav")
+    second = await AudioService.transcribe_audio(audio, "audio/wav")
+
+    assert first == second == "mercado 50 reais"
+    assert len(calls) == 1
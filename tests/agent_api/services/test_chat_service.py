@@ -1,9 +1,13 @@
+import asyncio
 import uuid
-from unittest.mock import AsyncMock
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
 import pytest
 from httpx import AsyncClient
 
-from agent_api.services.chat import ChatService
+from agent_api.core.exceptions import FinanceUnreachableError
+from agent_api.core.metrics import metrics
+from agent_api.services.chat import ChatService, ChatWriteBehind
 from agent_api.schemas.assistant import AssistantResponse
 from agent_api.models.chat import ChatSession, ChatMessage
 
@@ -30,11 +34,6 @@ def chat_service(mock_db_session, mock_http_client):
 async def test_process_message_new_session(chat_service, mocker):
     # Arrange
     message = "Hello"
-    fake_session_id = uuid.uuid4()
-
-    mock_session = ChatSession(id=fake_session_id)
-    chat_service.repository.create_session.return_value = mock_session
-    chat_service.repository.get_messages.return_value = [ChatMessage(role="user", content="Hello")]
 
     # Mock LLM
     mock_get_llm = mocker.patch("agent_api.services.chat.get_llm_response", new_callable=AsyncMock)
@@ -44,13 +43,22 @@ async def test_process_message_new_session(chat_service, mocker):
     response = await chat_service.process_message(message, None)
 
     # Assert
-    assert response.session_id == str(fake_session_id)
+    assert uuid.UUID(response.session_id)
     assert response.response == "Hi there"
     assert len(response.history) == 2  # User + Assistant
 
-    chat_service.repository.create_session.assert_awaited_once()
-    chat_service.repository.add_message.assert_any_await(fake_session_id, "user", "Hello")
-    chat_service.repository.add_message.assert_any_await(fake_session_id, "assistant", "Hi there")
+    # A new session has no history to read; the whole turn is written once
+    chat_service.repository.get_messages.assert_not_awaited()
+    chat_service.repository.create_session.assert_not_awaited()
+    chat_service.repository.save_turn.assert_awaited_once()
+    args, kwargs = chat_service.repository.save_turn.call_args
+    assert args == (uuid.UUID(response.session_id),)
+    assert kwargs["create_session"] is True
+    assert [(m["role"], m["content"]) for m in kwargs["messages"]] == [
+        ("user", "Hello"),
+        ("assistant", "Hi there"),
+    ]
+    assert kwargs["messages"][0]["created_at"] <= kwargs["messages"][1]["created_at"]
 
 
 @pytest.mark.asyncio
@@ -65,3 +73,191 @@ async def test_process_message_existing_session_not_found(chat_service):
     with pytest.raises(HTTPException) as exc:
         await chat_service.process_message("Hi", fake_id)
     assert exc.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_process_message_sends_memory_and_folds_old_turns(chat_service, mocker):
+    session_id = uuid.uuid4()
+    chat_service.repository.get_session.return_value = ChatSession(
+        id=session_id, summary="Usuário: oi", state={}, summarized_through=0
+    )
+    window = chat_service.memory.window
+    chat_service.repository.get_messages.return_value = [
+        ChatMessage(id=i, role="user", content=f"msg {i}") for i in range(window + 2, 0, -1)
+    ]
+    mock_get_llm = mocker.patch("agent_api.services.chat.get_llm_response", new_callable=AsyncMock)
+    mock_get_llm.return_value = AssistantResponse(response_message="Qual o valor?")
+
+    await chat_service.process_message("mercado", str(session_id))
+
+    chat_service.repository.get_messages.assert_awaited_once_with(
+        session_id, limit=chat_service.memory.fetch_limit
+    )
+    history, _ = mock_get_llm.call_args.args
+    assert len(history) == window
+    assert history[-1]["content"] == "mercado"
+    assert history[-2]["content"] == f"msg {window + 2}"
+    summary = "Usuário: oi\nUsuário: msg 1\nUsuário: msg 2\nUsuário: msg 3"
+    assert summary in mock_get_llm.call_args.kwargs["context"]
+    memory = chat_service.repository.save_turn.call_args.kwargs["memory"]
+    assert memory == {"summary": summary, "state": {}, "summarized_through": 3}
+
+
+@pytest.mark.asyncio
+async def test_process_message_skips_memory_write_when_unchanged(chat_service, mocker):
+    session_id = uuid.uuid4()
+    chat_service.repository.get_session.return_value = ChatSession(
+        id=session_id, state={}, summarized_through=0
+    )
+    chat_service.repository.get_messages.return_value = [
+        ChatMessage(id=1, role="user", content="oi")
+    ]
+    mock_get_llm = mocker.patch("agent_api.services.chat.get_llm_response", new_callable=AsyncMock)
+    mock_get_llm.return_value = AssistantResponse(response_message="Olá!")
+
+    await chat_service.process_message("oi", str(session_id))
+
+    assert mock_get_llm.call_args.kwargs["context"] is None
+    save_turn = chat_service.repository.save_turn
+    assert save_turn.call_args.kwargs["memory"] is None
+    assert save_turn.call_args.kwargs["create_session"] is False
+
+
+@pytest.mark.asyncio
+async def test_process_message_write_behind_answers_before_saving(chat_service, mocker):
+    write_behind = mocker.Mock()
+    chat_service.write_behind = write_behind
+    mock_get_llm = mocker.patch("agent_api.services.chat.get_llm_response", new_callable=AsyncMock)
+    mock_get_llm.return_value = AssistantResponse(response_message="Olá!")
+
+    response = await chat_service.process_message("oi", None)
+
+    assert response.response == "Olá!"
+    chat_service.repository.save_turn.assert_not_awaited()
+    session_id, turn = write_behind.submit.call_args.args
+    assert str(session_id) == response.session_id
+    assert turn["create_session"] is True
+    assert len(turn["messages"]) == 2
+
+
+class TestChatWriteBehind:
+    @pytest.fixture
+    def saved(self, mocker):
+        """Turns written through the mocked repository, in commit order."""
+        saved = []
+
+        async def save_turn(session_id, messages, memory=None, create_session=False):
+            await asyncio.sleep(0.01 if messages[0]["content"] == "first" else 0)
+            saved.append((session_id, messages[0]["content"]))
+
+        repository = mocker.patch("agent_api.services.chat.ChatRepository").return_value
+        repository.save_turn = AsyncMock(side_effect=save_turn)
+        return saved
+
+    @staticmethod
+    def _turn(content: str) -> dict:
+        return {"messages": [{"role": "user", "content": content}]}
+
+    @pytest.mark.asyncio
+    async def test_turns_of_a_session_are_written_in_order(self, saved):
+        write_behind = ChatWriteBehind(session_factory=MagicMock())
+        session_id = uuid.uuid4()
+
+        write_behind.submit(session_id, self._turn("first"))
+        write_behind.submit(session_id, self._turn("second"))
+        await write_behind.flush(session_id)
+
+        assert saved == [(session_id, "first"), (session_id, "second")]
+
+    @pytest.mark.asyncio
+    async def test_failed_write_is_counted(self, saved, mocker):
+        metrics.reset()
+        session_factory = MagicMock(side_effect=OSError("database is down"))
+        write_behind = ChatWriteBehind(session_factory=session_factory)
+
+        write_behind.submit(uuid.uuid4(), self._turn("lost"))
+        await write_behind.drain()
+
+        assert saved == []
+        assert metrics.counters["chat.write_behind_errors"] == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "lifecycle",
+    [
+        {"completed_at": datetime(2026, 1, 1)},
+        {"last_activity_at": datetime.utcnow() - timedelta(days=365)},
+    ],
+    ids=["completed", "idle"],
+)
+async def test_process_message_closed_session_not_found(chat_service, lifecycle):
+    from fastapi import HTTPException
+
+    chat_service.repository.get_session.return_value = ChatSession(id=uuid.uuid4(), **lifecycle)
+
+    with pytest.raises(HTTPException) as exc:
+        await chat_service.process_message("Hi", str(uuid.uuid4()))
+    assert exc.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_process_message_confirmed_action_completes_session(chat_service, mocker):
+    mock_get_llm = mocker.patch("agent_api.services.chat.get_llm_response", new_callable=AsyncMock)
+    mock_get_llm.return_value = AssistantResponse(
+        response_message="Registrado!", is_complete=True, is_confirmed=True
+    )
+    finance = mocker.patch("agent_api.services.chat.FinanceService").return_value
+    finance.register = AsyncMock()
+
+    response = await chat_service.process_message("sim", None)
+
+    assert response.is_complete is True
+    finance.register.assert_awaited_once()
+    assert chat_service.repository.save_turn.call_args.kwargs["completed"] is True
+
+
+@pytest.mark.asyncio
+async def test_process_message_failed_registration_keeps_session_open(chat_service, mocker):
+    mock_get_llm = mocker.patch("agent_api.services.chat.get_llm_response", new_callable=AsyncMock)
+    mock_get_llm.return_value = AssistantResponse(
+        response_message="Registrado!", is_complete=True, is_confirmed=True
+    )
+    finance = mocker.patch("agent_api.services.chat.FinanceService").return_value
+    finance.register = AsyncMock(side_effect=FinanceUnreachableError("offline"))
+
+    with pytest.raises(FinanceUnreachableError):
+        await chat_service.process_message("sim", None)
+
+    chat_service.repository.save_turn.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_process_message_fast_path_skips_llm(chat_service, mocker):
+    mock_get_llm = mocker.patch("agent_api.services.chat.get_llm_response", new_callable=AsyncMock)
+    slots = {"valor": 42.9, "categoria": "mercado"}
+    chat_service.fast_path = MagicMock()
+    chat_service.fast_path.answer = AsyncMock(
+        return_value=(AssistantResponse(response_message="Por favor, me diga:"), slots)
+    )
+
+    response = await chat_service.process_message("gastei 42,90 no mercado", None)
+
+    assert response.response == "Por favor, me diga:"
+    mock_get_llm.assert_not_awaited()
+    chat_service.fast_path.answer.assert_awaited_once_with("gastei 42,90 no mercado", {})
+    memory = chat_service.repository.save_turn.call_args.kwargs["memory"]
+    assert memory["state"] == {"spending": slots}
+
+
+@pytest.mark.asyncio
+async def test_process_message_falls_back_to_llm(chat_service, mocker):
+    mock_get_llm = mocker.patch("agent_api.services.chat.get_llm_response", new_callable=AsyncMock)
+    mock_get_llm.return_value = AssistantResponse(response_message="Você gastou R$ 10,00")
+    chat_service.fast_path = MagicMock()
+    chat_service.fast_path.answer = AsyncMock(return_value=None)
+
+    response = await chat_service.process_message("quanto gastei hoje?", None)
+
+    assert response.response == "Você gastou R$ 10,00"
+    mock_get_llm.assert_awaited_once()
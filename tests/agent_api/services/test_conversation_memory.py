@@ -0,0 +1,128 @@
+from agent_api.models.chat import ChatMessage
+from agent_api.schemas.assistant import AssistantResponse
+from agent_api.schemas.limit import LimitDetails
+from agent_api.schemas.spending import SpendingDetails
+from agent_api.services.conversation_memory import ConversationMemory
+
+
+def _messages(count: int) -> list[ChatMessage]:
+    """``count`` alternating messages, newest first, as returned by the repository."""
+    return [
+        ChatMessage(id=i, role="user" if i % 2 else "assistant", content=f"msg {i}")
+        for i in range(count, 0, -1)
+    ]
+
+
+def _spending(**overrides) -> SpendingDetails:
+    fields = {
+        "categoria": "mercado",
+        "valor": 50.0,
+        "metodo_pagamento": "itau",
+        "item_comprado": "compras",
+        "proprietário": "lailla",
+        "local_compra": "carrefour",
+    }
+    return SpendingDetails(**{**fields, **overrides})
+
+
+def test_split_keeps_window_and_folds_older_unsummarized_messages():
+    memory = ConversationMemory(window=4)
+
+    recent, folded = memory.split(_messages(6), summarized_through=0)
+
+    assert [m.id for m in recent] == [6, 5, 4, 3]
+    assert [m.id for m in folded] == [1, 2]
+
+
+def test_split_skips_messages_already_in_the_summary():
+    memory = ConversationMemory(window=4)
+
+    _, folded = memory.split(_messages(6), summarized_through=1)
+
+    assert [m.id for m in folded] == [2]
+
+
+def test_fold_appends_clipped_lines():
+    memory = ConversationMemory(line_max_chars=20)
+    long_message = ChatMessage(id=3, role="user", content="gastei   50 reais\nno mercado hoje")
+
+    summary = memory.fold("Assistente: oi", [long_message])
+
+    assert summary == "Assistente: oi\nUsuário: gastei 50 reais no…"
+
+
+def test_fold_drops_oldest_lines_past_the_size_limit():
+    memory = ConversationMemory(summary_max_chars=40)
+    summary = None
+
+    for message in reversed(_messages(10)):
+        summary = memory.fold(summary, [message])
+
+    assert len(summary) <= 40
+    assert summary.splitlines()[-1] == "Assistente: msg 10"
+
+
+def test_fold_without_messages_keeps_summary():
+    assert ConversationMemory().fold("Usuário: oi", []) == "Usuário: oi"
+
+
+def test_update_state_merges_extracted_slots():
+    memory = ConversationMemory()
+    response = AssistantResponse(
+        response_message="Confirma?", spending_details=_spending(), is_complete=True
+    )
+
+    state = memory.update_state({"limit": {"categoria": "lazer"}}, response)
+
+    assert state["spending"]["valor"] == 50.0
+    assert state["limit"] == {"categoria": "lazer"}
+
+
+def test_update_state_resets_after_confirmed_action():
+    memory = ConversationMemory()
+    response = AssistantResponse(
+        response_message="Registrado!",
+        limit_details=LimitDetails(categoria="lazer", valor=300),
+        is_complete=True,
+        is_confirmed=True,
+    )
+
+    assert memory.update_state({"limit": {"categoria": "lazer"}}, response) == {}
+
+
+def test_update_state_records_what_awaits_confirmation():
+    memory = ConversationMemory()
+    spending = AssistantResponse(
+        response_message="Confirma?", spending_details=_spending(), is_complete=True
+    )
+    limit = AssistantResponse(
+        response_message="Confirma?",
+        limit_details=LimitDetails(categoria="lazer", valor=300),
+        is_complete=True,
+    )
+
+    assert memory.update_state({}, spending)["awaiting_confirmation"] == "spending"
+    assert memory.update_state({}, limit)["awaiting_confirmation"] == "limit"
+
+
+def test_update_state_drops_spending_draft_when_llm_moves_on():
+    memory = ConversationMemory()
+    state = {"spending": {"valor": 50.0}, "awaiting_confirmation": "spending"}
+
+    updated = memory.update_state(state, AssistantResponse(response_message="Cancelado."))
+
+    assert updated == {}
+
+
+def test_render_includes_summary_and_slots():
+    memory = ConversationMemory()
+
+    context = memory.render("Usuário: oi", {"spending": {"valor": 50.0, "categoria": "mercado"}})
+
+    assert "Usuário: oi" in context
+    assert "- valor: 50.0" in context
+    assert "- categoria: mercado" in context
+
+
+def test_render_without_memory_is_none():
+    assert ConversationMemory().render(None, {}) is None
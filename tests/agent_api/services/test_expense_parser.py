@@ -0,0 +1,226 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from agent_api.core.metrics import metrics
+from agent_api.schemas.assistant import AssistantResponse
+from agent_api.schemas.limit import LimitDetails
+from agent_api.services.conversation_memory import ConversationMemory
+from agent_api.services.expense_parser import (
+    ExpenseFastPath,
+    Vocabulary,
+    parse_amount,
+    parse_expense,
+)
+from agent_api.services.reference_data import ReferenceData
+
+DATA = ReferenceData(
+    categories=("mercado", "transporte", "comer_fora", "farmacia", "moradia", "lazer"),
+    payment_methods=("nubank", "itau", "c6", "pix", "xp"),
+    owners=("joao_lucas", "lailla"),
+    version=1,
+)
+
+
+@pytest.fixture
+def vocabulary():
+    return Vocabulary(DATA)
+
+
+@pytest.fixture
+def reference_data():
+    cache = MagicMock()
+    cache.get = AsyncMock(return_value=DATA)
+    return cache
+
+
+@pytest.fixture
+def fast_path(reference_data):
+    metrics.reset()
+    return ExpenseFastPath(reference_data)
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("42,90", 42.9),
+        ("42.90", 42.9),
+        ("1.500", 1500.0),
+        ("1.500,00", 1500.0),
+        ("1.234.567", 1234567.0),
+        ("30.", 30.0),
+        ("1,2,3", None),
+    ],
+)
+def test_parse_amount(raw, expected):
+    assert parse_amount(raw) == expected
+
+
+def test_parse_reference_keys_and_amount(vocabulary):
+    parsed = parse_expense("Gastei R$ 42,90 no mercado no Nubank da Lailla", vocabulary)
+
+    assert not parsed.ambiguous
+    assert parsed.slots == {
+        "valor": 42.9,
+        "categoria": "mercado",
+        "metodo_pagamento": "nubank",
+        "proprietário": "lailla",
+    }
+
+
+def test_parse_item_and_location(vocabulary):
+    parsed = parse_expense("comprei pão por 12,50 na padaria do zé no pix do joao", vocabulary)
+
+    assert parsed.slots == {
+        "valor": 12.5,
+        "item_comprado": "pão",
+        "local_compra": "padaria do zé",
+        "metodo_pagamento": "pix",
+        "proprietário": "joao_lucas",
+    }
+
+
+def test_parse_category_alias_is_also_text(vocabulary):
+    parsed = parse_expense("gastei 30 de gasolina no posto ipiranga", vocabulary)
+
+    assert parsed.slots["categoria"] == "transporte"
+    assert parsed.slots["item_comprado"] == "gasolina"
+    assert parsed.slots["local_compra"] == "posto ipiranga"
+
+
+def test_parse_fuzzy_matches_typos(vocabulary):
+    parsed = parse_expense("gastei 200 no mercado no nubamk da laila", vocabulary)
+
+    assert parsed.slots["metodo_pagamento"] == "nubank"
+    assert parsed.slots["proprietário"] == "lailla"
+    assert "local_compra" not in parsed.slots
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        "gastei 20 e 30 no mercado",
+        "gastei 20 no mercado no lazer",
+        "gastei 20 na padaria na farmácia central",
+    ],
+    ids=["two amounts", "two categories", "two locations"],
+)
+def test_parse_flags_ambiguous_messages(vocabulary, message):
+    assert parse_expense(message, vocabulary).ambiguous
+
+
+@pytest.mark.asyncio
+async def test_fast_path_drafts_and_confirms_expense(fast_path):
+    response, slots = await fast_path.answer("gastei 42,90 no mercado no nubank da lailla", {})
+    assert not response.is_complete
+    assert response.response_message == "Por favor, me diga:\n- item comprado\n- local da compra"
+    state = {"spending": slots}
+
+    response, slots = await fast_path.answer("no atacadão", state)
+    assert response.response_message == "Por favor, me diga:\n- item comprado"
+    state = {"spending": slots}
+
+    response, slots = await fast_path.answer("arroz", state)
+    assert response.is_complete and not response.is_confirmed
+    assert response.spending_details.local_compra == "atacadão"
+    assert response.spending_details.item_comprado == "arroz"
+    assert "- valor: R$ 42,90" in response.response_message
+    assert response.response_message.endswith("Posso registrar?")
+    state = {"spending": slots, "awaiting_confirmation": "spending"}
+
+    response, slots = await fast_path.answer("Sim, pode registrar", state)
+    assert response.is_complete and response.is_confirmed
+    assert response.spending_details.valor == 42.9
+    assert slots == {}
+    assert metrics.counters["chat.fast_path.hits"] == 4
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "message",
+    [
+        "quanto gastei no mercado?",
+        "define um limite de 500 para o mercado",
+        "gastei 300 em 3x no nubank",
+        "oi, tudo bem",
+        "gastei 20 e 30 no mercado",
+        "gastei 15 no bistrô no pix em promoção",
+        "gastei 50 no mercado ontem no pix do joao",
+        "gastei 50 no mercado semana passada no pix do joao",
+        "paguei 80 dia 12 na farmácia",
+    ],
+    ids=[
+        "question",
+        "limit",
+        "installments",
+        "no amount",
+        "ambiguous",
+        "two locations",
+        "yesterday",
+        "last week",
+        "day of month",
+    ],
+)
+async def test_fast_path_leaves_message_to_llm(fast_path, message):
+    assert await fast_path.answer(message, {}) is None
+
+
+@pytest.mark.asyncio
+async def test_fast_path_leaves_corrections_to_llm(fast_path):
+    state = {"spending": {"valor": 42.9, "categoria": "mercado"}}
+
+    assert await fast_path.answer("foi 50", state) is None
+    assert await fast_path.answer("no lazer", state) is None
+    assert metrics.counters["chat.fast_path.misses"] == 2
+
+
+@pytest.mark.asyncio
+async def test_fast_path_affirmative_needs_pending_confirmation(fast_path):
+    state = {"spending": {"valor": 42.9, "categoria": "mercado"}}
+
+    assert await fast_path.answer("sim", state) is None
+
+
+@pytest.mark.asyncio
+async def test_fast_path_never_confirms_cancelled_draft_for_a_pending_limit(fast_path):
+    memory = ConversationMemory()
+    state = {}
+
+    async def turn(message, llm_response=None):
+        nonlocal state
+        local = await fast_path.answer(message, state)
+        response, slots = local if local is not None else (llm_response, None)
+        state = memory.update_state(state, response, slots)
+        return local
+
+    await turn("gastei 42,90 de arroz no atacadão no mercado no nubank da lailla")
+    assert state["awaiting_confirmation"] == "spending"
+
+    # The user cancels and asks for a limit instead; both turns are answered by the LLM
+    cancelled = AssistantResponse(response_message="Ok, cancelei o gasto.")
+    assert await turn("cancela", cancelled) is None
+    assert "spending" not in state
+    limit = AssistantResponse(
+        response_message="Confirma o limite de R$ 300 para lazer?",
+        limit_details=LimitDetails(categoria="lazer", valor=300),
+        is_complete=True,
+    )
+    assert await turn("quero um limite de 300 para lazer", limit) is None
+    assert state["awaiting_confirmation"] == "limit"
+
+    # "sim" confirms the limit through the LLM, not the old expense locally
+    assert await fast_path.answer("sim", state) is None
+
+
+@pytest.mark.asyncio
+async def test_vocabulary_is_rebuilt_when_reference_data_changes(fast_path, reference_data):
+    first = await fast_path.vocabulary()
+    assert await fast_path.vocabulary() is first
+
+    reference_data.get.return_value = ReferenceData(
+        categories=DATA.categories + ("pets",),
+        payment_methods=DATA.payment_methods,
+        owners=DATA.owners,
+        version=2,
+    )
+    assert await fast_path.vocabulary() is not first
@@ -1,3 +1,4 @@
+import asyncio
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
@@ -5,10 +6,25 @@ from langchain_core.exceptions import OutputParserException
 from google.api_core.exceptions import GoogleAPIError
 
 from agent_api.schemas.assistant import AssistantResponse
-from agent_api.services.llm import get_llm_response
+from agent_api.core.metrics import metrics
+from agent_api.services.llm import (
+    FakeLLMProvider,
+    LLMClientRegistry,
+    _google_structured_llm,
+    get_llm_response,
+    llm_registry,
+)
 from agent_api.core.exceptions import LLMParsingError, LLMProviderError
 
 
+@pytest.fixture(autouse=True)
+def reset_llm_registry():
+    """Runnables are cached per model; drop them so each test sees its own patched client."""
+    llm_registry.reset()
+    yield
+    llm_registry.reset()
+
+
 @pytest.mark.asyncio
 async def test_get_llm_response_success(mocker):
     """
@@ -138,3 +154,79 @@ async def test_get_system_prompt_default():
     prompt = await get_system_prompt(platform=None)
     assert "**Formatação para Telegram**" not in prompt
     assert "**Formatação para Web**" not in prompt
+
+
+@pytest.mark.asyncio
+async def test_structured_llm_is_built_once_per_model(mocker):
+    """The client and its structured output are reused across requests."""
+    mock_llm_instance = MagicMock()
+    mock_structured_output = MagicMock()
+    mock_structured_output.ainvoke = AsyncMock(
+        return_value=AssistantResponse(response_message="ok")
+    )
+    mock_llm_instance.with_structured_output.return_value = mock_structured_output
+    mock_class = mocker.patch(
+        "agent_api.services.llm.ChatGoogleGenerativeAI", return_value=mock_llm_instance
+    )
+
+    await get_llm_response([{"role": "user", "content": "oi"}])
+    await get_llm_response([{"role": "user", "content": "oi de novo"}])
+
+    mock_class.assert_called_once()
+    mock_llm_instance.with_structured_output.assert_called_once_with(AssistantResponse)
+    assert mock_structured_output.ainvoke.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_registry_caps_in_flight_calls():
+    """At most max_concurrency calls run at once; the rest wait for a slot."""
+    registry = LLMClientRegistry(factory=lambda model: provider, max_concurrency=2)
+    in_flight = 0
+    peak = 0
+
+    class SlowProvider(FakeLLMProvider):
+        async def ainvoke(self, messages):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return await super().ainvoke(messages)
+
+    provider = SlowProvider()
+
+    await asyncio.gather(*(registry.ainvoke([("human", str(i))]) for i in range(6)))
+
+    assert peak == 2
+    assert provider.calls == 6
+
+
+@pytest.mark.asyncio
+async def test_registry_rejects_when_queue_is_full():
+    provider = FakeLLMProvider(latency_seconds=0.05)
+    registry = LLMClientRegistry(factory=provider, max_concurrency=1, max_queue=1)
+
+    results = await asyncio.gather(
+        *(registry.ainvoke([("human", "oi")]) for _ in range(3)), return_exceptions=True
+    )
+
+    assert sum(isinstance(r, LLMProviderError) for r in results) == 1
+    assert provider.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_get_llm_response_with_fake_provider_reports_phases(mocker):
+    fake = FakeLLMProvider()
+    llm_registry.use(fake)
+    mocker.patch("agent_api.services.llm.get_system_prompt", AsyncMock(return_value="prompt"))
+    metrics.reset()
+
+    try:
+        result = await get_llm_response([{"role": "user", "content": "gastei 10 reais"}])
+    finally:
+        llm_registry.use(_google_structured_llm)
+
+    assert result.response_message == "gastei 10 reais"
+    timings = metrics.snapshot()["timings"]
+    assert {"llm.prompt", "llm.queue", "llm.network"} <= set(timings)
+    assert metrics.counters["llm.calls"] == 1
@@ -0,0 +1,80 @@
+"""Unit tests for NFC-e QR code parsing."""
+
+from datetime import date
+
+import pytest
+
+from agent_api.services.nfce import access_key_check_digit, format_nfce_summary, parse_nfce_qr
+
+
+def make_access_key(emission_type: str = "9") -> str:
+    # PR, 2025-06, CNPJ 12.345.678/0001-90, model 65, series 001, number 12345
+    body = "".join(
+        ["41", "2506", "12345678000190", "65", "001", "000012345", emission_type, "12345678"]
+    )
+    return body + str(access_key_check_digit(body))
+
+
+BASE_URL = "https://www.fazenda.pr.gov.br/nfce/qrcode"
+
+
+def test_parses_offline_v2_code_with_total_and_day():
+    key = make_access_key()
+
+    receipt = parse_nfce_qr(f"{BASE_URL}?p={key}|2|1|15|45.90|6a6b|1|ABCDEF")
+
+    assert receipt.access_key == key
+    assert receipt.issuer_cnpj == "12345678000190"
+    assert receipt.model == "65"
+    assert receipt.number == "000012345"
+    assert receipt.emission_type == "9"
+    assert receipt.issue_date == date(2025, 6, 15)
+    assert receipt.total == 45.90
+
+
+def test_parses_online_v2_code_without_total():
+    key = make_access_key(emission_type="1")
+
+    receipt = parse_nfce_qr(f"{BASE_URL}?p={key}|2|1|1|ABCDEF0123")
+
+    assert receipt.total is None
+    assert receipt.issue_date is None
+    assert receipt.issue_year_month == "2025-06"
+
+
+def test_parses_v1_code():
+    key = make_access_key(emission_type="1")
+    issued = "2025-06-20T10:15:00-03:00".encode().hex()
+
+    receipt = parse_nfce_qr(
+        f"{BASE_URL}?chNFe={key}&nVersao=100&tpAmb=1&dhEmi={issued}&vNF=132.07&cIdToken=1"
+    )
+
+    assert receipt.total == 132.07
+    assert receipt.issue_date == date(2025, 6, 20)
+
+
+def _with_wrong_check_digit(key: str) -> str:
+    return key[:-1] + str((int(key[-1]) + 1) % 10)
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        "https://example.com/promo",
+        f"{BASE_URL}?p=4125061234|2|1",
+        f"{BASE_URL}?p={_with_wrong_check_digit(make_access_key())}|2|1|15|45.90|x|1|y",
+    ],
+)
+def test_ignores_codes_that_are_not_nfce(payload):
+    assert parse_nfce_qr(payload) is None
+
+
+def test_summary_lists_total_date_and_issuer():
+    receipt = parse_nfce_qr(f"{BASE_URL}?p={make_access_key()}|2|1|15|45.90|6a6b|1|ABCDEF")
+
+    summary = format_nfce_summary(receipt)
+
+    assert "Valor total: R$ 45,90" in summary
+    assert "15/06/2025" in summary
+    assert "12.345.678/0001-90" in summary
@@ -1,13 +1,46 @@
 """Unit tests for OCR service."""
 
+import asyncio
+import os
+import threading
+import time
+
+import cv2
 import pytest
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 import numpy as np
 from PIL import Image
 import io
 
-from agent_api.services.ocr import OCRService
-from agent_api.core.exceptions import InvalidImageError, OCRProcessingError
+from agent_api.core.metrics import metrics
+from agent_api.services.ocr import (
+    OCRService,
+    OCRWorkerPool,
+    PreprocessPipeline,
+    _image_dhash,
+    _words_to_text,
+    ocr_pool,
+)
+from agent_api.core.exceptions import InvalidImageError, OCRBusyError, OCRProcessingError
+from agent_api.services.nfce import access_key_check_digit
+from agent_api.services.result_cache import result_cache
+
+# PR, 2025-06, CNPJ 12.345.678/0001-90, NFC-e 12345 issued in offline contingency
+NFCE_KEY_BODY = "4125061234567800019065001000012345912345678"
+NFCE_ACCESS_KEY = NFCE_KEY_BODY + str(access_key_check_digit(NFCE_KEY_BODY))
+
+
+@pytest.fixture(autouse=True)
+def in_process_ocr_pool(monkeypatch):
+    """Run OCR jobs on threads so the pytesseract patches below apply."""
+    ocr_pool.shutdown()
+    monkeypatch.setattr(ocr_pool, "use_processes", False)
+    # Every test starts from an empty, memory-only result cache
+    result_cache.clear()
+    monkeypatch.setattr(result_cache, "persist", False)
+    yield
+    ocr_pool.shutdown()
+    result_cache.clear()
 
 
 @pytest.fixture
@@ -80,15 +113,15 @@ class TestOCRService:
         OCRService.validate_image_file("image.png", 500000)
 
     @pytest.mark.asyncio
-    @patch("agent_api.services.ocr.pytesseract.image_to_string")
     @patch("agent_api.services.ocr.pytesseract.image_to_data")
     async def test_extract_text_returns_text_and_confidence(
-        self, mock_image_to_data, mock_image_to_string, sample_image_bytes
+        self, mock_image_to_data, sample_image_bytes
     ):
         """Test that extract_text returns both text and confidence."""
         # Arrange
-        mock_image_to_string.return_value = "Sample Receipt Text"
-        mock_image_to_data.return_value = {"conf": ["75.5", "80.0", "90.5"]}
+        mock_image_to_data.return_value = _tesseract_data(
+            [("Sample", "75.5", 1), ("Receipt", "80.0", 1), ("Text", "90.5", 1)]
+        )
 
         # Act
         text, confidence = await OCRService.extract_text(sample_image_bytes)
@@ -101,13 +134,30 @@ class TestOCRService:
     @pytest.mark.asyncio
     @patch("agent_api.services.ocr.pytesseract.image_to_string")
     @patch("agent_api.services.ocr.pytesseract.image_to_data")
-    async def test_extract_text_calculates_average_confidence(
+    async def test_extract_text_runs_tesseract_once(
         self, mock_image_to_data, mock_image_to_string, sample_image_bytes
+    ):
+        """Text and confidences come from a single image_to_data pass."""
+        # Arrange
+        mock_image_to_data.return_value = _tesseract_data([("Text", "80", 1)])
+
+        # Act
+        await OCRService.extract_text(sample_image_bytes)
+
+        # Assert
+        mock_image_to_data.assert_called_once()
+        mock_image_to_string.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("agent_api.services.ocr.pytesseract.image_to_data")
+    async def test_extract_text_calculates_average_confidence(
+        self, mock_image_to_data, sample_image_bytes
     ):
         """Test confidence score calculation."""
         # Arrange
-        mock_image_to_string.return_value = "Text"
-        mock_image_to_data.return_value = {"conf": ["80", "90", "70"]}  # Average should be 80
+        mock_image_to_data.return_value = _tesseract_data(
+            [("a", "80", 1), ("b", "90", 1), ("c", "70", 1)]  # Average should be 80
+        )
 
         # Act
         _, confidence = await OCRService.extract_text(sample_image_bytes)
@@ -116,17 +166,15 @@ class TestOCRService:
         assert confidence == 80.0
 
     @pytest.mark.asyncio
-    @patch("agent_api.services.ocr.pytesseract.image_to_string")
     @patch("agent_api.services.ocr.pytesseract.image_to_data")
     async def test_extract_text_ignores_invalid_confidence_values(
-        self, mock_image_to_data, mock_image_to_string, sample_image_bytes
+        self, mock_image_to_data, sample_image_bytes
     ):
         """Test that -1 confidence values are ignored."""
         # Arrange
-        mock_image_to_string.return_value = "Text"
-        mock_image_to_data.return_value = {
-            "conf": ["80", "-1", "60"]  # Should only average 80 and 60
-        }
+        mock_image_to_data.return_value = _tesseract_data(
+            [("a", "80", 1), ("", "-1", 1), ("b", 60, 1), ("", -1, 2)]
+        )
 
         # Act
         _, confidence = await OCRService.extract_text(sample_image_bytes)
@@ -135,69 +183,307 @@ class TestOCRService:
         assert confidence == 70.0  # (80 + 60) / 2
 
     @pytest.mark.asyncio
-    @patch("agent_api.services.ocr.pytesseract.image_to_string")
     @patch("agent_api.services.ocr.pytesseract.image_to_data")
-    async def test_extract_text_uses_correct_language(
-        self, mock_image_to_data, mock_image_to_string, sample_image_bytes
-    ):
+    async def test_extract_text_uses_correct_language(self, mock_image_to_data, sample_image_bytes):
         """Test that language parameter is passed to Tesseract."""
         # Arrange
-        mock_image_to_string.return_value = "Text"
-        mock_image_to_data.return_value = {"conf": ["80"]}
+        mock_image_to_data.return_value = _tesseract_data([("Text", "80", 1)])
 
         # Act
         await OCRService.extract_text(sample_image_bytes, lang="por")
 
         # Assert
-        mock_image_to_string.assert_called_once()
-        call_kwargs = mock_image_to_string.call_args[1]
+        call_kwargs = mock_image_to_data.call_args[1]
         assert call_kwargs["lang"] == "por"
 
     @pytest.mark.asyncio
-    @patch("agent_api.services.ocr.pytesseract.image_to_string")
     @patch("agent_api.services.ocr.pytesseract.image_to_data")
-    async def test_extract_text_strips_whitespace(
-        self, mock_image_to_data, mock_image_to_string, sample_image_bytes
+    async def test_extract_text_rebuilds_lines_and_paragraphs(
+        self, mock_image_to_data, sample_image_bytes
     ):
-        """Test that extracted text has whitespace stripped."""
+        """Words are grouped into lines, paragraphs are separated by a blank line."""
         # Arrange
-        mock_image_to_string.return_value = "  \n  Text with spaces  \n  "
-        mock_image_to_data.return_value = {"conf": ["80"]}
+        mock_image_to_data.return_value = _tesseract_data(
+            [("MERCADO", "90", 1), ("XYZ", "90", 1), ("Total:", "90", 2), ("50,00", "90", 2)],
+            paragraphs=[1, 1, 2, 2],
+        )
 
         # Act
         text, _ = await OCRService.extract_text(sample_image_bytes)
 
         # Assert
-        assert text == "Text with spaces"
+        assert text == "MERCADO XYZ\n\nTotal: 50,00"
 
     @pytest.mark.asyncio
-    @patch("agent_api.services.ocr.pytesseract.image_to_string")
     @patch("agent_api.services.ocr.pytesseract.image_to_data")
-    async def test_extract_text_raises_on_empty_text(
-        self, mock_image_to_data, mock_image_to_string, sample_image_bytes
-    ):
+    async def test_extract_text_raises_on_empty_text(self, mock_image_to_data, sample_image_bytes):
         """Test error when no text is extracted."""
         # Arrange
-        mock_image_to_string.return_value = "   "  # Only whitespace
-        mock_image_to_data.return_value = {"conf": ["80"]}
+        mock_image_to_data.return_value = _tesseract_data([("   ", "80", 1)])  # Only whitespace
 
         # Act & Assert
         with pytest.raises(OCRProcessingError):
             await OCRService.extract_text(sample_image_bytes)
 
-    @pytest.mark.asyncio
-    @patch("agent_api.services.ocr.pytesseract.image_to_string")
-    @patch("agent_api.services.ocr.pytesseract.image_to_data")
-    async def test_extract_text_handles_empty_confidence_list(
-        self, mock_image_to_data, mock_image_to_string, sample_image_bytes
-    ):
+    def test_words_to_text_handles_empty_confidence_list(self):
         """Test handling when no confidence values are available."""
-        # Arrange
-        mock_image_to_string.return_value = "Text"
-        mock_image_to_data.return_value = {"conf": []}
-
         # Act
-        _, confidence = await OCRService.extract_text(sample_image_bytes)
+        text, confidence = _words_to_text(_tesseract_data([]))
 
         # Assert
+        assert text == ""
         assert confidence == 0.0
+
+
+def _tesseract_data(words, paragraphs=None):
+    """Build an ``image_to_data`` DICT for (text, conf, line) tuples."""
+    paragraphs = paragraphs or [1] * len(words)
+    return {
+        "page_num": [1] * len(words),
+        "block_num": [1] * len(words),
+        "par_num": paragraphs,
+        "line_num": [line for _, _, line in words],
+        "text": [text for text, _, _ in words],
+        "conf": [conf for _, conf, _ in words],
+    }
+
+
+def _process_id() -> int:
+    return os.getpid()
+
+
+def _blocking_job(release: threading.Event) -> str:
+    release.wait(timeout=2)
+    return "done"
+
+
+class TestOCRWorkerPool:
+    """Test suite for the OCR worker pool."""
+
+    @pytest.mark.asyncio
+    async def test_runs_jobs_in_worker_processes(self):
+        """Jobs run in a separate process, off the event loop."""
+        pool = OCRWorkerPool(workers=1, use_processes=True)
+        try:
+            assert await pool.run(_process_id) != os.getpid()
+        finally:
+            pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_rejects_jobs_beyond_the_queue(self):
+        """Jobs beyond workers + max_queue are rejected with OCRBusyError."""
+        release = threading.Event()
+        pool = OCRWorkerPool(workers=1, max_queue=1, use_processes=False)
+        metrics.reset()
+
+        running = [asyncio.create_task(pool.run(_blocking_job, release)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert pool.queue_depth == 2
+
+        with pytest.raises(OCRBusyError):
+            await pool.run(_blocking_job, release)
+
+        release.set()
+        assert await asyncio.gather(*running) == ["done", "done"]
+        assert pool.queue_depth == 0
+        assert metrics.counters["ocr.rejected"] == 1
+        assert metrics.timings["ocr.run"].count == 2
+        assert metrics.timings["ocr.wait"].count == 2
+        pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_times_out_slow_jobs(self):
+        """A job over the timeout raises OCRProcessingError and frees its slot."""
+        release = threading.Event()
+        pool = OCRWorkerPool(workers=1, timeout=0.05, use_processes=False)
+        metrics.reset()
+
+        with pytest.raises(OCRProcessingError):
+            await pool.run(_blocking_job, release)
+
+        # The worker is still busy, so its slot is not handed to a new request yet
+        assert pool.queue_depth == 1
+        release.set()
+        await asyncio.sleep(0.05)
+        assert pool.queue_depth == 0
+        assert metrics.counters["ocr.timeouts"] == 1
+        pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_timed_out_jobs_keep_counting_against_the_cap(self):
+        """Repeated timeouts cannot push running work past workers + max_queue."""
+        release = threading.Event()
+        pool = OCRWorkerPool(workers=1, max_queue=0, timeout=0.05, use_processes=False)
+
+        with pytest.raises(OCRProcessingError):
+            await pool.run(_blocking_job, release)
+        with pytest.raises(OCRBusyError):
+            await pool.run(_blocking_job, release)
+
+        release.set()
+        await asyncio.sleep(0.05)
+        assert await pool.run(_process_id) == os.getpid()
+        pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_timeout_counts_from_job_start(self):
+        """Time spent waiting in the queue does not count against the timeout."""
+        pool = OCRWorkerPool(workers=1, max_queue=1, timeout=0.3, use_processes=False)
+
+        results = await asyncio.gather(pool.run(time.sleep, 0.2), pool.run(time.sleep, 0.2))
+
+        assert results == [None, None]
+        pool.shutdown()
+
+
+class TestOCREngines:
+    """Test suite for OCR engine selection."""
+
+    def test_unknown_engine_is_rejected(self):
+        with pytest.raises(ValueError):
+            OCRWorkerPool(engine="easyocr")
+
+    def test_tesserocr_falls_back_to_cli_when_missing(self, monkeypatch):
+        monkeypatch.setattr("agent_api.services.ocr.tesserocr", None)
+
+        assert OCRWorkerPool(engine="tesserocr").engine == "tesseract"
+
+    @pytest.mark.asyncio
+    async def test_tesserocr_engine_is_reused_across_images(self, monkeypatch, sample_image_bytes):
+        api = MagicMock()
+        api.GetUTF8Text.return_value = " Total 50,00 \n"
+        api.AllWordConfidences.return_value = [90, 70]
+        fake_tesserocr = MagicMock()
+        fake_tesserocr.PyTessBaseAPI.return_value = api
+        monkeypatch.setattr("agent_api.services.ocr.tesserocr", fake_tesserocr)
+        monkeypatch.setattr("agent_api.services.ocr._tesserocr_apis", {})
+        monkeypatch.setattr(ocr_pool, "engine", "tesserocr")
+
+        for _ in range(2):
+            result_cache.clear()
+            text, confidence = await OCRService.extract_text(sample_image_bytes, lang="por")
+
+        assert (text, confidence) == ("Total 50,00", 80.0)
+        fake_tesserocr.PyTessBaseAPI.assert_called_once()
+        assert api.GetUTF8Text.call_count == 2
+
+
+def _receipt_photo(angle: float = 0.0) -> bytes:
+    """Dark table with a white receipt holding rows of glyph-sized marks."""
+    receipt = np.full((900, 400), 255, np.uint8)
+    for row in range(60, 840, 60):
+        for col in range(30, 370, 28):
+            cv2.rectangle(receipt, (col, row), (col + 18, row + 40), 0, -1)
+    canvas = np.full((1400, 1000), 40, np.uint8)
+    canvas[250:1150, 300:700] = receipt
+    matrix = cv2.getRotationMatrix2D((500, 700), angle, 1.0)
+    canvas = cv2.warpAffine(canvas, matrix, (1000, 1400), borderValue=40)
+    return cv2.imencode(".png", canvas)[1].tobytes()
+
+
+class TestPreprocessPipeline:
+    """Test suite for the receipt preprocessing stages."""
+
+    def test_unknown_stage_is_rejected(self):
+        with pytest.raises(ValueError):
+            PreprocessPipeline.parse("crop,sharpen")
+
+    def test_every_stage_is_timed(self):
+        pipeline = PreprocessPipeline.parse("crop,deskew,downscale,adaptive")
+
+        image, timings = pipeline.run(_receipt_photo())
+
+        assert list(timings) == ["decode", "crop", "deskew", "downscale", "adaptive"]
+        assert set(np.unique(image)) <= {0, 255}
+
+    def test_crop_keeps_only_the_receipt(self):
+        image, _ = PreprocessPipeline(stages=("crop",)).run(_receipt_photo(angle=8))
+
+        height, width = image.shape
+        assert abs(height - 900) < 40 and abs(width - 400) < 40
+        # The table (gray 40) is gone: the border is white paper
+        assert image[5:-5, 5:-5].max() == 255 and np.median(image[5:-5, 5]) > 200
+
+    def test_deskew_straightens_rotated_text(self):
+        receipt = cv2.imdecode(np.frombuffer(_receipt_photo(), np.uint8), cv2.IMREAD_GRAYSCALE)
+        page = np.full((1300, 900), 255, np.uint8)
+        page[200:1100, 250:650] = receipt[250:1150, 300:700]
+        matrix = cv2.getRotationMatrix2D((450, 650), 6, 1.0)
+        skewed = cv2.warpAffine(page, matrix, (900, 1300), borderValue=255)
+        skewed_bytes = cv2.imencode(".png", skewed)[1].tobytes()
+
+        image, _ = PreprocessPipeline(stages=("deskew",)).run(skewed_bytes)
+
+        ink = cv2.findNonZero(255 - image)
+        angle = cv2.minAreaRect(ink)[-1]
+        assert min(angle % 90, 90 - angle % 90) < 0.5
+
+    def test_downscale_targets_text_height(self):
+        pipeline = PreprocessPipeline(stages=("crop", "downscale"), target_text_height=20)
+
+        image, _ = pipeline.run(_receipt_photo())
+
+        # Glyphs were 40 px tall, so the receipt is shrunk to about half
+        assert abs(image.shape[0] - 450) < 30
+
+    def test_downscale_never_enlarges(self):
+        pipeline = PreprocessPipeline(stages=("crop", "downscale"), target_text_height=80)
+
+        image, _ = pipeline.run(_receipt_photo())
+
+        assert abs(image.shape[0] - 900) < 40
+
+
+class TestQRCodeFastPath:
+    """Test suite for NFC-e QR code detection."""
+
+    def _qr_photo(self, payload: str) -> bytes:
+        code = cv2.QRCodeEncoder.create().encode(payload)
+        code = cv2.resize(code, None, fx=10, fy=10, interpolation=cv2.INTER_NEAREST)
+        page = np.full((2000, 1400), 255, np.uint8)
+        page[1200 : 1200 + code.shape[0], 400 : 400 + code.shape[1]] = code
+        return cv2.imencode(".jpg", page)[1].tobytes()
+
+    @pytest.mark.asyncio
+    async def test_reads_nfce_fields_from_qr_code(self):
+        key = NFCE_ACCESS_KEY
+        payload = f"https://www.fazenda.pr.gov.br/nfce/qrcode?p={key}|2|1|15|45.90|6a6b|1|ABCDEF"
+        metrics.reset()
+
+        receipt = await OCRService.read_qr_code(self._qr_photo(payload))
+
+        assert receipt.access_key == key
+        assert receipt.total == 45.90
+        assert metrics.counters["ocr.qr_hits"] == 1
+        assert metrics.timings["ocr.stage.qr"].count == 1
+
+    @pytest.mark.asyncio
+    async def test_returns_none_without_qr_code(self, sample_image_bytes):
+        metrics.reset()
+
+        assert await OCRService.read_qr_code(sample_image_bytes) is None
+        assert metrics.counters["ocr.qr_misses"] == 1
+
+
+class TestOCRResultCache:
+    """Resent receipts are answered from the result cache."""
+
+    @pytest.mark.asyncio
+    @patch("agent_api.services.ocr.pytesseract.image_to_data")
+    async def test_resent_image_skips_tesseract(self, mock_image_to_data, sample_image_bytes):
+        mock_image_to_data.return_value = _tesseract_data([("Text", "80", 1)])
+
+        first = await OCRService.extract_text(sample_image_bytes, lang="por")
+        second = await OCRService.extract_text(sample_image_bytes, lang="por")
+
+        assert first == second == ("Text", 80.0)
+        mock_image_to_data.assert_called_once()
+
+    def test_perceptual_hash_survives_reencoding(self):
+        photo = cv2.imdecode(np.frombuffer(_receipt_photo(), np.uint8), cv2.IMREAD_GRAYSCALE)
+        png = cv2.imencode(".png", photo)[1].tobytes()
+        jpeg = cv2.imencode(".jpg", photo, [cv2.IMWRITE_JPEG_QUALITY, 60])[1].tobytes()
+        other = cv2.imencode(".png", cv2.flip(photo, 1))[1].tobytes()
+
+        assert _image_dhash(png) == _image_dhash(jpeg)
+        assert _image_dhash(png) != _image_dhash(other)
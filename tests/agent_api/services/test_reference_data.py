@@ -0,0 +1,132 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+
+from agent_api.services import llm
+from agent_api.services.reference_data import (
+    FALLBACK_CATEGORIES,
+    ReferenceData,
+    ReferenceDataCache,
+)
+
+
+def _response(keys: list[str]) -> MagicMock:
+    response = MagicMock(status_code=200)
+    response.json.return_value = {"items": [{"key": key} for key in keys]}
+    return response
+
+
+@pytest.fixture
+def mock_client(mocker):
+    client = MagicMock()
+    client.get = AsyncMock()
+    mocker.patch(
+        "agent_api.services.reference_data.http_client_manager.get_client", return_value=client
+    )
+    return client
+
+
+def _route(client: MagicMock, categories: list[str], methods: list[str]) -> None:
+    async def get(url, **kwargs):
+        return _response(categories if "/categories/" in url else methods)
+
+    client.get.side_effect = get
+
+
+@pytest.mark.asyncio
+async def test_first_get_loads_both_lists(mock_client):
+    _route(mock_client, ["mercado", "lazer"], ["nubank"])
+    cache = ReferenceDataCache(ttl_seconds=60, owners=["joao_lucas"])
+
+    data = await cache.get()
+
+    assert data.categories == ("mercado", "lazer")
+    assert data.payment_methods == ("nubank",)
+    assert data.owners == ("joao_lucas",)
+    assert data.version == 1
+    assert mock_client.get.await_count == 2
+
+    # Fresh data is served from memory
+    await cache.get()
+    assert mock_client.get.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_data_is_served_while_refreshing(mock_client):
+    _route(mock_client, ["mercado"], ["nubank"])
+    cache = ReferenceDataCache(ttl_seconds=0, owners=[])
+    first = await cache.get()
+
+    _route(mock_client, ["mercado", "pets"], ["nubank"])
+    stale = await cache.get()
+    assert stale is first
+
+    await cache._refresh_task
+    refreshed = await cache.get()
+    assert refreshed.categories == ("mercado", "pets")
+    assert refreshed.version == 2
+
+
+@pytest.mark.asyncio
+async def test_version_only_changes_with_the_values(mock_client):
+    _route(mock_client, ["mercado"], ["nubank"])
+    cache = ReferenceDataCache(ttl_seconds=60, owners=[])
+    await cache.get()
+
+    cache.invalidate()
+    await cache._refresh_task
+
+    assert (await cache.get()).version == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_previous_values(mock_client):
+    _route(mock_client, ["mercado"], ["nubank"])
+    cache = ReferenceDataCache(ttl_seconds=60, owners=[])
+    await cache.get()
+
+    mock_client.get.side_effect = httpx.ConnectError("down")
+    cache.invalidate()
+    await cache._refresh_task
+
+    data = await cache.get()
+    assert data.categories == ("mercado",)
+    assert data.version == 1
+
+
+@pytest.mark.asyncio
+async def test_fallback_when_finance_api_is_down(mock_client):
+    mock_client.get.side_effect = httpx.ConnectError("down")
+    cache = ReferenceDataCache(ttl_seconds=60, owners=[])
+
+    data = await cache.get()
+
+    assert list(data.categories) == FALLBACK_CATEGORIES
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_gets_fetch_once(mock_client):
+    _route(mock_client, ["mercado"], ["nubank"])
+    cache = ReferenceDataCache(ttl_seconds=60, owners=[])
+
+    await asyncio.gather(*(cache.get() for _ in range(5)))
+
+    assert mock_client.get.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_system_prompt_built_once_per_version(mocker):
+    data = ReferenceData(categories=("mercado",), payment_methods=("pix",), owners=(), version=7)
+    mocker.patch.object(llm.reference_data_cache, "get", AsyncMock(return_value=data))
+    build = mocker.spy(llm, "build_system_prompt")
+    llm._prompt_cache.clear()
+
+    first = await llm.get_system_prompt("telegram")
+    second = await llm.get_system_prompt("telegram")
+    await llm.get_system_prompt("web")
+
+    assert first is second
+    assert "[mercado]" in first
+    assert build.call_count == 2
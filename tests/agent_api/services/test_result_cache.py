@@ -0,0 +1,112 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from agent_api.core.metrics import metrics
+from agent_api.services.result_cache import ResultCache, content_key
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+
+
+def _computer(value: dict):
+    return AsyncMock(return_value=value)
+
+
+@pytest.mark.asyncio
+async def test_same_content_is_computed_once():
+    cache = ResultCache(persist=False)
+    compute = _computer({"text": "MERCADO"})
+
+    first = await cache.get_or_compute("ocr:por", b"photo", compute)
+    second = await cache.get_or_compute("ocr:por", b"photo", compute)
+
+    assert first == second == {"text": "MERCADO"}
+    compute.assert_awaited_once()
+    assert metrics.counters["result_cache.hits"] == 1
+    assert metrics.counters["result_cache.misses"] == 1
+    assert metrics.counters["result_cache.ocr.hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_kind_is_part_of_the_key():
+    cache = ResultCache(persist=False)
+    compute = _computer({"text": "x"})
+
+    await cache.get_or_compute("ocr:por", b"photo", compute)
+    await cache.get_or_compute("ocr:eng", b"photo", compute)
+
+    assert compute.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_entry_is_evicted():
+    cache = ResultCache(max_entries=2, persist=False)
+    compute = _computer({"text": "x"})
+
+    for content in (b"a", b"b", b"a", b"c"):
+        await cache.get_or_compute("qr", content, compute)
+    await cache.get_or_compute("qr", b"a", compute)
+    await cache.get_or_compute("qr", b"b", compute)
+
+    # a, b, c computed; a stays (recently used), b was evicted by c
+    assert compute.await_count == 4
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_ttl(mocker):
+    cache = ResultCache(ttl_seconds=60, persist=False)
+    clock = mocker.patch("agent_api.services.result_cache.time.time", return_value=1000.0)
+    compute = _computer({"text": "x"})
+
+    await cache.get_or_compute("qr", b"a", compute)
+    clock.return_value = 1061.0
+    await cache.get_or_compute("qr", b"a", compute)
+
+    assert compute.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_fingerprint_matches_reencoded_copies():
+    cache = ResultCache(persist=False)
+    compute = _computer({"text": "MERCADO"})
+
+    async def fingerprint():
+        return "f0f0f0f0f0f0f0f0"
+
+    await cache.get_or_compute("ocr:por", b"original.jpg", compute, fingerprint)
+    result = await cache.get_or_compute("ocr:por", b"recompressed.jpg", compute, fingerprint)
+
+    assert result == {"text": "MERCADO"}
+    compute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_postgres_tier_backfills_memory(mocker):
+    repo = mocker.patch("agent_api.services.result_cache.MediaCacheRepository").return_value
+    repo.get = AsyncMock(return_value={"text": "stored"})
+    mocker.patch("agent_api.services.result_cache.AsyncSessionLocal")
+    cache = ResultCache()
+    compute = _computer({"text": "fresh"})
+
+    assert await cache.get_or_compute("ocr:por", b"photo", compute) == {"text": "stored"}
+    assert await cache.get_or_compute("ocr:por", b"photo", compute) == {"text": "stored"}
+
+    compute.assert_not_awaited()
+    repo.get.assert_awaited_once_with(content_key("ocr:por", b"photo"))
+
+
+@pytest.mark.asyncio
+async def test_postgres_errors_degrade_to_memory_only(mocker):
+    session_factory = mocker.patch("agent_api.services.result_cache.AsyncSessionLocal")
+    session_factory.side_effect = OSError("connection refused")
+    cache = ResultCache()
+    compute = _computer({"text": "fresh"})
+
+    assert await cache.get_or_compute("ocr:por", b"photo", compute) == {"text": "fresh"}
+    assert await cache.get_or_compute("ocr:por", b"photo", compute) == {"text": "fresh"}
+
+    compute.assert_awaited_once()
+    assert metrics.counters["result_cache.store_errors"] == 2
@@ -0,0 +1,73 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from agent_api.core.metrics import metrics
+from agent_api.services.session_purge import SessionPurgeJob
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+
+
+@pytest.fixture
+def purge_sessions(mocker):
+    repository = mocker.patch("agent_api.services.session_purge.ChatRepository").return_value
+    repository.purge_sessions = AsyncMock()
+    return repository.purge_sessions
+
+
+def _job(**kwargs) -> SessionPurgeJob:
+    defaults = {
+        "idle_ttl_seconds": 3600,
+        "completed_retention_seconds": 60,
+        "batch_size": 2,
+        "pause_seconds": 0,
+        "session_factory": MagicMock(),
+    }
+    return SessionPurgeJob(**{**defaults, **kwargs})
+
+
+@pytest.mark.asyncio
+async def test_run_once_deletes_batches_until_a_short_one(purge_sessions):
+    purge_sessions.side_effect = [2, 2, 1]
+
+    assert await _job().run_once() == 5
+
+    assert purge_sessions.await_count == 3
+    idle_before, completed_before, batch_size = purge_sessions.call_args.args
+    assert (completed_before - idle_before).total_seconds() == 3600 - 60
+    assert batch_size == 2
+    assert metrics.counters["chat.purged_sessions"] == 5
+
+
+@pytest.mark.asyncio
+async def test_run_once_pauses_between_full_batches(purge_sessions, mocker):
+    purge_sessions.side_effect = [2, 0]
+    sleep = mocker.patch("agent_api.services.session_purge.asyncio.sleep", new=AsyncMock())
+
+    await _job(pause_seconds=0.25).run_once()
+
+    sleep.assert_awaited_once_with(0.25)
+
+
+@pytest.mark.asyncio
+async def test_disabled_job_does_not_start():
+    job = _job(interval_seconds=0)
+
+    job.start()
+
+    assert job._task is None
+    await job.stop()
+
+
+@pytest.mark.asyncio
+async def test_stop_cancels_the_background_task(purge_sessions):
+    job = _job(interval_seconds=3600)
+
+    job.start()
+    await job.stop()
+
+    assert job._task is None
+    purge_sessions.assert_not_awaited()
@@ -0,0 +1,122 @@
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from asgi_lifespan import LifespanManager
+from httpx import ASGITransport, AsyncClient
+
+from finance_api.core.cache import SPENDING_LIMITS, TableVersions, table_versions
+from finance_api.core.database import get_db
+from finance_api.main import app
+from finance_api.repositories.limits import SpendingLimitRepository
+from finance_api.repositories.spents import SpentRepository
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+async def test_client():
+    async with LifespanManager(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            yield client
+
+
+@pytest.fixture
+def mock_limit_repository(mocker):
+    async def override_get_db():
+        yield MagicMock()
+
+    app.dependency_overrides[get_db] = override_get_db
+    repo = MagicMock(spec=SpendingLimitRepository)
+    repo.list = AsyncMock(
+        return_value=([MagicMock(id=uuid4(), category="mercado", amount=100.0)], 1)
+    )
+    mocker.patch("finance_api.routers.limits.SpendingLimitRepository", return_value=repo)
+    yield repo
+    app.dependency_overrides.clear()
+
+
+async def test_table_versions_key_changes_on_bump():
+    versions = TableVersions()
+    before = versions.key(("categories", "spents"))
+
+    versions.bump("spents")
+
+    assert versions.get("spents") == 1
+    assert versions.key(("categories", "spents")) != before
+
+
+async def test_conditional_get_returns_304_until_table_changes(test_client, mock_limit_repository):
+    """
+    Test that a matching If-None-Match skips the route until the table version is bumped.
+    """
+    # First fetch returns the body and a strong ETag
+    first = await test_client.get("/limits/?page=1&size=10")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('"') and not etag.startswith("W/")
+
+    # Revalidation answers 304 without running the route
+    second = await test_client.get("/limits/?page=1&size=10", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert mock_limit_repository.list.await_count == 1
+
+    # Other query strings have their own ETag
+    other = await test_client.get("/limits/?page=2&size=10", headers={"If-None-Match": etag})
+    assert other.status_code == 200
+
+    # A write to the table invalidates the ETag
+    table_versions.bump(SPENDING_LIMITS)
+    third = await test_client.get("/limits/?page=1&size=10", headers={"If-None-Match": etag})
+    assert third.status_code == 200
+    assert third.headers["etag"] != etag
+
+
+async def test_large_responses_are_gzipped(test_client, mock_limit_repository):
+    mock_limit_repository.list.return_value = (
+        [MagicMock(id=uuid4(), category=f"categoria_{i}", amount=float(i)) for i in range(100)],
+        100,
+    )
+
+    response = await test_client.get("/limits/?size=100", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()["items"]) == 100
+
+
+async def test_etag_changes_across_days(test_client, mock_limit_repository, mocker):
+    today = mocker.patch("finance_api.core.cache._today", return_value=date(2026, 3, 31))
+    first = await test_client.get("/limits/?page=1&size=10")
+    etag = first.headers["etag"]
+
+    same_day = await test_client.get("/limits/?page=1&size=10", headers={"If-None-Match": etag})
+    assert same_day.status_code == 304
+
+    today.return_value = date(2026, 4, 1)
+    next_day = await test_client.get("/limits/?page=1&size=10", headers={"If-None-Match": etag})
+    assert next_day.status_code == 200
+    assert next_day.headers["etag"] != etag
+
+
+async def test_installments_summary_is_never_revalidated(test_client, mocker):
+    async def override_get_db():
+        yield MagicMock()
+
+    app.dependency_overrides[get_db] = override_get_db
+    repo = MagicMock(spec=SpentRepository)
+    repo.get_installments_summary = AsyncMock(return_value=[])
+    mocker.patch("finance_api.routers.spents.SpentRepository", return_value=repo)
+    try:
+        first = await test_client.get("/spents/installments-summary")
+        second = await test_client.get(
+            "/spents/installments-summary", headers={"If-None-Match": '"anything"'}
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert first.status_code == second.status_code == 200
+    assert "etag" not in first.headers
+    assert repo.get_installments_summary.await_count == 2
@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import AsyncMock, MagicMock
 from uuid import uuid4
 
+from finance_api.core.cache import CATEGORIES, table_versions
 from finance_api.repositories.categories import CategoryRepository
 from finance_api.schemas.categories import CategoryCreate, CategoryUpdate
 
@@ -36,6 +37,18 @@ async def test_create_category(mock_db_session):
     mock_db_session.refresh.assert_awaited_once()
 
 
+@pytest.mark.asyncio
+async def test_writes_bump_table_version(mock_db_session):
+    """Test that committed writes bump the categories version used for ETags."""
+    repo = CategoryRepository(mock_db_session)
+    before = table_versions.get(CATEGORIES)
+
+    await repo.create(CategoryCreate(key="pets", display_name="Pets"))
+    await repo.delete(uuid4())
+
+    assert table_versions.get(CATEGORIES) == before + 2
+
+
 @pytest.mark.asyncio
 async def test_list_categories(mock_db_session):
     """Test listing all categories."""
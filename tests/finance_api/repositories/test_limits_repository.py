@@ -0,0 +1,30 @@
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+
+from finance_api.repositories.limits import SpendingLimitRepository
+
+
+async def test_get_status_totals_single_statement():
+    """
+    Test that limits, spent rollups and active subscriptions are joined in one query.
+    """
+    # Arrange
+    db = AsyncMock()
+    row = MagicMock(category="mercado", amount=1000, spent_total=300.0, subscription_total=None)
+    result = MagicMock()
+    result.fetchall.return_value = [row]
+    db.execute.return_value = result
+    repo = SpendingLimitRepository(db)
+
+    # Act
+    totals = await repo.get_status_totals([("nubank", date(2026, 1, 26), date(2026, 2, 25))])
+
+    # Assert
+    db.execute.assert_awaited_once()
+    query_str = str(db.execute.await_args[0][0])
+    assert "FROM spending_limits LEFT OUTER JOIN" in query_str
+    assert "spend_rollups" in query_str
+    assert "subscriptions" in query_str
+    assert totals == [
+        {"category": "mercado", "limit": 1000.0, "spent_total": 300.0, "subscription_total": 0.0}
+    ]
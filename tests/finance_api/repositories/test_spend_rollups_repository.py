@@ -0,0 +1,121 @@
+from datetime import date, datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from finance_api.repositories.spend_rollups import SpendRollupRepository, local_day
+from finance_api.repositories.spents import SpentRepository
+
+
+def test_local_day_uses_sao_paulo_timezone():
+    # 01:30 UTC on March 1st is still February 28th in São Paulo
+    assert local_day(datetime(2026, 3, 1, 1, 30, tzinfo=timezone.utc)) == date(2026, 2, 28)
+
+
+async def test_apply_merges_deltas_into_one_upsert():
+    """
+    Test that changes on the same day/category/payment method are merged before the upsert.
+    """
+    # Arrange
+    db = AsyncMock()
+    upsert_result = MagicMock()
+    upsert_result.all.return_value = [
+        (date(2026, 3, 10), "mercado", "nubank", 2),
+        (date(2026, 3, 10), "lazer", "nubank", 0),
+    ]
+    db.execute.return_value = upsert_result
+    repo = SpendRollupRepository(db)
+    created_at = datetime(2026, 3, 10, 15, 0, tzinfo=timezone.utc)
+
+    # Act
+    await repo.apply(
+        [
+            (created_at, "mercado", "nubank", 10.0, 1),
+            (created_at, "mercado", "nubank", 5.0, 1),
+            (created_at, "lazer", "nubank", 7.0, -1),
+        ]
+    )
+
+    # Assert
+    upsert = db.execute.await_args_list[0][0][0]
+    compiled = upsert.compile(dialect=postgresql.dialect())
+    assert "ON CONFLICT (spend_day, category, payment_method) DO UPDATE" in str(compiled)
+    params = compiled.params
+    assert (params["category_m0"], params["total_m0"], params["count_m0"]) == ("mercado", 15.0, 2)
+    assert (params["category_m1"], params["total_m1"], params["count_m1"]) == ("lazer", -7.0, -1)
+    assert params["spend_day_m0"] == date(2026, 3, 10)
+    assert "RETURNING" in str(compiled)
+
+    # Only the emptied key is deleted, never the whole table
+    cleanup = db.execute.await_args_list[1][0][0].compile(dialect=postgresql.dialect())
+    assert "DELETE FROM spend_rollups WHERE (spend_rollups.spend_day" in str(cleanup)
+    assert "count" not in str(cleanup.statement.whereclause)
+    assert list(cleanup.params.values()) == [[(date(2026, 3, 10), "lazer", "nubank")]]
+
+
+async def test_apply_skips_cleanup_when_no_key_is_emptied():
+    db = AsyncMock()
+    upsert_result = MagicMock()
+    upsert_result.all.return_value = [(date(2026, 3, 10), "mercado", "nubank", 3)]
+    db.execute.return_value = upsert_result
+
+    await SpendRollupRepository(db).apply(
+        [(datetime(2026, 3, 10, 15, 0, tzinfo=timezone.utc), "mercado", "nubank", 10.0, 1)]
+    )
+
+    assert db.execute.await_count == 1
+
+
+async def test_apply_without_changes_is_a_noop():
+    db = AsyncMock()
+
+    await SpendRollupRepository(db).apply([])
+
+    db.execute.assert_not_awaited()
+
+
+async def test_delete_spent_subtracts_from_rollups():
+    """
+    Test that deleting a spent removes its amount from the rollups in the same transaction.
+    """
+    # Arrange
+    db = AsyncMock()
+    created_at = datetime(2026, 3, 10, 15, 0, tzinfo=timezone.utc)
+    delete_result = MagicMock()
+    delete_result.all.return_value = [(created_at, "mercado", "nubank", 42.0)]
+    db.execute.return_value = delete_result
+    repo = SpentRepository(db)
+    repo.rollups.apply = AsyncMock()
+
+    # Act
+    deleted = await repo.delete(uuid4())
+
+    # Assert
+    assert deleted is True
+    assert "RETURNING" in str(db.execute.await_args[0][0])
+    changes = list(repo.rollups.apply.await_args[0][0])
+    assert changes == [(created_at, "mercado", "nubank", 42.0, -1)]
+    db.commit.assert_awaited_once()
+
+
+async def test_rebuild_recomputes_from_spents():
+    """
+    Test that rebuild clears the table and refills it with one INSERT ... SELECT.
+    """
+    # Arrange
+    db = AsyncMock()
+    count_result = MagicMock()
+    count_result.scalar.return_value = 12
+    db.execute.side_effect = [MagicMock(), MagicMock(), count_result]
+
+    # Act
+    rebuilt = await SpendRollupRepository(db).rebuild()
+
+    # Assert
+    assert rebuilt == 12
+    statements = [str(call[0][0]) for call in db.execute.await_args_list]
+    assert statements[0].startswith("DELETE FROM spend_rollups")
+    assert "INSERT INTO spend_rollups" in statements[1]
+    assert "GROUP BY" in statements[1]
+    db.commit.assert_awaited_once()
@@ -1,9 +1,13 @@
+from datetime import date, datetime
 from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+from zoneinfo import ZoneInfo
 
 import pytest
 
 from finance_api.repositories.spents import SpentRepository
 from finance_api.schemas.enums import CardEnum, NameEnum
+from finance_api.schemas.pagination import PageCursor, TotalMode
 from finance_api.schemas.spents import SpentCreate
 
 
@@ -108,3 +112,133 @@ async def test_get_installments_summary(mock_db_session):
     assert result[0]["amount"] == 100.0
     assert result[0]["total_installments"] == 10
     assert result[0]["passed_installments"] == 2
+
+
+async def test_get_dashboard_totals(mock_db_session):
+    """
+    Test that get_dashboard_totals runs a single aggregate query and maps its rows.
+    """
+    # Arrange
+    repo = SpentRepository(mock_db_session)
+    mock_row = MagicMock()
+    mock_row.category = "mercado"
+    mock_row.payment_method = "nubank"
+    mock_row.spent_total = 150.5
+    mock_row.spent_count = 3
+    mock_row.subscription_total = 0.0
+    mock_row.limit_amount = None
+
+    mock_result = MagicMock()
+    mock_result.fetchall.return_value = [mock_row]
+    mock_db_session.execute.return_value = mock_result
+
+    # Act
+    result = await repo.get_dashboard_totals([("nubank", date(2026, 1, 26), date(2026, 2, 25))])
+
+    # Assert
+    mock_db_session.execute.assert_awaited_once()
+    query_str = str(mock_db_session.execute.call_args[0][0])
+    assert "GROUP BY" in query_str
+    assert "UNION ALL" in query_str
+    assert result == [
+        {
+            "category": "mercado",
+            "payment_method": "nubank",
+            "spent_total": 150.5,
+            "spent_count": 3,
+            "subscription_total": 0.0,
+            "limit_amount": None,
+        }
+    ]
+
+
+async def test_list_spents_keyset_without_total(mock_db_session):
+    """
+    Test that cursor mode seeks on (created_at, id) and skips the count query.
+    """
+    # Arrange
+    repo = SpentRepository(mock_db_session)
+    cursor = PageCursor(value="2026-03-10T12:00:00+00:00", id=uuid4())
+
+    # Act
+    items, total = await repo.list(limit=20, cursor=cursor, total_mode=TotalMode.NONE)
+
+    # Assert
+    assert total is None
+    assert items == []
+    mock_db_session.execute.assert_awaited_once()
+    query_str = str(mock_db_session.execute.call_args[0][0])
+    assert "(spents.created_at, spents.id) <" in query_str
+    assert "ORDER BY spents.created_at DESC, spents.id DESC" in query_str
+    assert "OFFSET" not in query_str
+
+
+async def test_list_spents_date_filter_is_sargable(mock_db_session):
+    """
+    Test that local-date filters compare the raw created_at column against half-open
+    America/Sao_Paulo day boundaries instead of wrapping it in date(... AT TIME ZONE ...).
+    """
+    # Arrange
+    repo = SpentRepository(mock_db_session)
+
+    # Act
+    await repo.list(
+        start_date=date(2026, 3, 1), end_date=date(2026, 3, 31), total_mode=TotalMode.NONE
+    )
+
+    # Assert
+    query = mock_db_session.execute.call_args[0][0]
+    query_str = str(query)
+    assert "AT TIME ZONE" not in query_str
+    assert "spents.created_at >=" in query_str
+    assert "spents.created_at <" in query_str
+
+    bounds = sorted(
+        value for value in query.compile().params.values() if isinstance(value, datetime)
+    )
+    sao_paulo = ZoneInfo("America/Sao_Paulo")
+    assert bounds == [
+        datetime(2026, 3, 1, tzinfo=sao_paulo),
+        datetime(2026, 4, 1, tzinfo=sao_paulo),
+    ]
+
+
+async def test_create_many_uses_single_returning_statement(mock_db_session):
+    """
+    Test that create_many writes every row through one INSERT ... RETURNING and one commit.
+    """
+    # Arrange
+    repo = SpentRepository(mock_db_session)
+    rows = [
+        {
+            "id": uuid4(),
+            "category": "mercado",
+            "amount": 1.0,
+            "item_bought": "a",
+            "payment_method": "itau",
+            "location": "A",
+            "created_at": datetime.now(ZoneInfo("UTC")),
+        },
+        {
+            "id": uuid4(),
+            "category": "mercado",
+            "amount": 2.0,
+            "item_bought": "b",
+            "payment_method": "itau",
+            "location": "A",
+            "created_at": datetime.now(ZoneInfo("UTC")),
+        },
+    ]
+    mock_db_session.scalars.return_value = MagicMock(all=MagicMock(return_value=["s1", "s2"]))
+
+    # Act
+    created = await repo.create_many(rows)
+
+    # Assert
+    assert created == ["s1", "s2"]
+    mock_db_session.scalars.assert_awaited_once()
+    stmt, params = mock_db_session.scalars.call_args[0]
+    assert "RETURNING" in str(stmt)
+    assert params == rows
+    mock_db_session.commit.assert_awaited_once()
+    mock_db_session.add.assert_not_called()
@@ -1,3 +1,4 @@
+from datetime import date
 from unittest.mock import AsyncMock, MagicMock
 from uuid import uuid4
 
@@ -7,6 +8,7 @@ from httpx import ASGITransport, AsyncClient
 
 from finance_api.core.database import get_db
 from finance_api.main import app
+from finance_api.schemas.pagination import TotalMode
 from finance_api.repositories.limits import SpendingLimitRepository
 from sqlalchemy.exc import IntegrityError
 
@@ -121,8 +123,8 @@ async def test_list_limits_success(test_client, mock_limit_repository, mocker):
     assert response_data["page"] == 1
     assert response_data["size"] == 10
     assert response_data["pages"] == 1
-    # Repository list now has 4 params: skip, limit, start_date, end_date
-    mock_limit_repository.list.assert_awaited_once_with(0, 10, None, None)
+    # Repository list params: skip, limit, start_date, end_date, cursor, total_mode
+    mock_limit_repository.list.assert_awaited_once_with(0, 10, None, None, None, TotalMode.EXACT)
 
     # Cleanup
     app.dependency_overrides.clear()
@@ -309,8 +311,59 @@ async def test_list_limits_pagination(test_client, mock_limit_repository, mocker
     assert response_data["page"] == 1
     assert response_data["size"] == 1
     assert response_data["pages"] == 2
-    # Repository list now has 4 params: skip, limit, start_date, end_date
-    mock_limit_repository.list.assert_awaited_once_with(0, 1, None, None)
+    # Repository list params: skip, limit, start_date, end_date, cursor, total_mode
+    mock_limit_repository.list.assert_awaited_once_with(0, 1, None, None, None, TotalMode.EXACT)
+
+    # Cleanup
+    app.dependency_overrides.clear()
+
+
+async def test_get_limits_status(test_client, mock_limit_repository, mocker):
+    """
+    Test that the limits status returns spent, remaining and percent used per category.
+    """
+
+    # Arrange
+    async def override_get_db():
+        yield MagicMock()
+
+    app.dependency_overrides[get_db] = override_get_db
+    mocker.patch(
+        "finance_api.routers.limits.SpendingLimitRepository",
+        return_value=mock_limit_repository,
+    )
+    mock_limit_repository.get_status_totals = AsyncMock(
+        return_value=[
+            {"category": "lazer", "limit": 200.0, "spent_total": 250.0, "subscription_total": 0.0},
+            {
+                "category": "mercado",
+                "limit": 1000.0,
+                "spent_total": 300.0,
+                "subscription_total": 50.0,
+            },
+        ]
+    )
+
+    # Act
+    response = await test_client.get(
+        "/limits/status?reference_month=2026-02&mode=CIVIL_MONTH&category=Mercado"
+    )
+
+    # Assert
+    assert response.status_code == 200
+    data = response.json()
+    assert data["reference_month"] == "2026-02"
+    categories = {c["category"]: c for c in data["categories"]}
+    assert categories["mercado"]["spent"] == 350.0
+    assert categories["mercado"]["remaining"] == 650.0
+    assert categories["mercado"]["percent_used"] == 35.0
+    assert categories["mercado"]["exceeded"] is False
+    assert categories["lazer"]["remaining"] == -50.0
+    assert categories["lazer"]["exceeded"] is True
+
+    periods, category = mock_limit_repository.get_status_totals.await_args[0]
+    assert periods == [(None, date(2026, 2, 1), date(2026, 2, 28))]
+    assert category == "mercado"
 
     # Cleanup
     app.dependency_overrides.clear()
@@ -1,3 +1,5 @@
+import json
+from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock
 from uuid import uuid4
 
@@ -7,6 +9,7 @@ from httpx import ASGITransport, AsyncClient
 
 from finance_api.core.database import get_db
 from finance_api.main import app
+from finance_api.schemas.pagination import PageCursor, TotalMode
 from finance_api.repositories.spents import SpentRepository
 
 # Mark all tests in this file as async
@@ -153,8 +156,8 @@ async def test_list_spents_success(test_client, mock_spent_repository, mocker):
     assert response_data["page"] == 1
     assert response_data["size"] == 10
     assert response_data["pages"] == 1
-    # Repository list now has 4 params: skip, limit, start_date, end_date
-    mock_spent_repository.list.assert_awaited_once_with(0, 10, None, None)
+    # Repository list params: skip, limit, start_date, end_date, cursor, total_mode
+    mock_spent_repository.list.assert_awaited_once_with(0, 10, None, None, None, TotalMode.EXACT)
 
     # Cleanup
     app.dependency_overrides.clear()
@@ -379,8 +382,8 @@ async def test_list_spents_pagination(test_client, mock_spent_repository, mocker
     assert response_data["page"] == 1
     assert response_data["size"] == 1
     assert response_data["pages"] == 2
-    # Repository list now has 4 params: skip, limit, start_date, end_date
-    mock_spent_repository.list.assert_awaited_once_with(0, 1, None, None)
+    # Repository list params: skip, limit, start_date, end_date, cursor, total_mode
+    mock_spent_repository.list.assert_awaited_once_with(0, 1, None, None, None, TotalMode.EXACT)
 
     # Cleanup
     app.dependency_overrides.clear()
@@ -425,3 +428,376 @@ async def test_get_installments_summary_success(test_client, mock_spent_reposito
 
     # Cleanup dependency override
     app.dependency_overrides.clear()
+
+
+async def test_get_dashboard_summary_civil_month(test_client, mock_spent_repository, mocker):
+    """
+    Test that the dashboard summary aggregates totals per category and payment method.
+    """
+
+    # Arrange
+    async def override_get_db():
+        yield MagicMock()
+
+    app.dependency_overrides[get_db] = override_get_db
+    mocker.patch("finance_api.routers.spents.SpentRepository", return_value=mock_spent_repository)
+
+    mock_spent_repository.get_dashboard_totals = AsyncMock(
+        return_value=[
+            {
+                "category": "mercado",
+                "payment_method": "nubank",
+                "spent_total": 300.0,
+                "spent_count": 3,
+                "subscription_total": 0.0,
+                "limit_amount": None,
+            },
+            {
+                "category": "mercado",
+                "payment_method": "itau",
+                "spent_total": 100.0,
+                "spent_count": 1,
+                "subscription_total": 50.0,
+                "limit_amount": None,
+            },
+            {
+                "category": "mercado",
+                "payment_method": None,
+                "spent_total": 0.0,
+                "spent_count": 0,
+                "subscription_total": 0.0,
+                "limit_amount": 400.0,
+            },
+            {
+                "category": "lazer",
+                "payment_method": None,
+                "spent_total": 0.0,
+                "spent_count": 0,
+                "subscription_total": 0.0,
+                "limit_amount": 200.0,
+            },
+        ]
+    )
+
+    # Act
+    response = await test_client.get(
+        "/spents/dashboard/summary?reference_month=2026-02&mode=CIVIL_MONTH"
+    )
+
+    # Assert
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 450.0
+    assert data["periods"] == [
+        {"payment_method": None, "start_date": "2026-02-01", "end_date": "2026-02-28"}
+    ]
+
+    categories = {c["category"]: c for c in data["categories"]}
+    assert categories["mercado"]["spent_total"] == 400.0
+    assert categories["mercado"]["spent_count"] == 4
+    assert categories["mercado"]["subscription_total"] == 50.0
+    assert categories["mercado"]["total"] == 450.0
+    assert categories["mercado"]["limit"] == 400.0
+    assert categories["mercado"]["remaining"] == 0.0
+    assert categories["lazer"]["total"] == 0.0
+    assert categories["lazer"]["remaining"] == 200.0
+
+    payment_methods = {p["payment_method"]: p for p in data["payment_methods"]}
+    assert payment_methods["nubank"]["total"] == 300.0
+    assert payment_methods["itau"]["total"] == 150.0
+    assert len(data["breakdown"]) == 2
+
+    mock_spent_repository.get_dashboard_totals.assert_awaited_once()
+
+    app.dependency_overrides.clear()
+
+
+async def test_list_spents_cursor_mode(test_client, mock_spent_repository, mocker):
+    """
+    Test keyset pagination: an empty cursor starts the listing, skips the total
+    when include_total=false and returns an opaque next_cursor for the next page.
+    """
+
+    # Arrange
+    async def override_get_db():
+        yield MagicMock()
+
+    app.dependency_overrides[get_db] = override_get_db
+    mocker.patch("finance_api.routers.spents.SpentRepository", return_value=mock_spent_repository)
+
+    last_id = uuid4()
+    mock_spent = MagicMock(
+        id=last_id,
+        category="mercado",
+        amount=100.0,
+        item_bought="item1",
+        created_at=datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc),
+        payment_method="itau",
+        location="A",
+        installment_id=None,
+        current_installment=None,
+        total_installments=None,
+    )
+    mock_spent_repository.list.return_value = ([mock_spent], None)
+
+    # Act
+    response = await test_client.get("/spents/?size=1&cursor=&include_total=false")
+
+    # Assert
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] is None
+    assert data["pages"] is None
+    assert data["next_cursor"] is not None
+
+    next_cursor = PageCursor.decode(data["next_cursor"])
+    assert next_cursor.id == last_id
+    assert datetime.fromisoformat(next_cursor.value) == mock_spent.created_at
+    mock_spent_repository.list.assert_awaited_once_with(
+        0, 1, None, None, PageCursor(), TotalMode.NONE
+    )
+
+    app.dependency_overrides.clear()
+
+
+async def test_list_spents_invalid_cursor(test_client, mock_spent_repository, mocker):
+    """Test that a malformed cursor is rejected with 422."""
+
+    # Arrange
+    async def override_get_db():
+        yield MagicMock()
+
+    app.dependency_overrides[get_db] = override_get_db
+    mocker.patch("finance_api.routers.spents.SpentRepository", return_value=mock_spent_repository)
+
+    # Act
+    response = await test_client.get("/spents/?cursor=not-a-cursor")
+
+    # Assert
+    assert response.status_code == 422
+    mock_spent_repository.list.assert_not_awaited()
+
+    app.dependency_overrides.clear()
+
+
+def _bulk_spent(**overrides):
+    row = {
+        "category": "mercado",
+        "amount": 10.0,
+        "item_bought": "item",
+        "payment_method": "itau",
+        "location": "A",
+    }
+    row.update(overrides)
+    return row
+
+
+async def test_create_spents_bulk_reports_row_errors(test_client, mock_spent_repository, mocker):
+    """Test bulk creation inserts valid rows in one call and reports the invalid ones."""
+
+    # Arrange
+    async def override_get_db():
+        yield MagicMock()
+
+    app.dependency_overrides[get_db] = override_get_db
+    mocker.patch("finance_api.routers.spents.SpentRepository", return_value=mock_spent_repository)
+    mocker.patch("finance_api.services.spents.CategoryRepository").return_value.list_keys = (
+        AsyncMock(return_value={"mercado"})
+    )
+    mocker.patch("finance_api.services.spents.PaymentMethodRepository").return_value.list_keys = (
+        AsyncMock(return_value={"itau"})
+    )
+
+    async def fake_create_many(rows):
+        return [MagicMock(**row, installment_id=None) for row in rows]
+
+    mock_spent_repository.create_many = AsyncMock(side_effect=fake_create_many)
+
+    payload = [
+        _bulk_spent(),
+        _bulk_spent(category="viagem"),
+        _bulk_spent(amount="abc"),
+        _bulk_spent(payment_method="nubank"),
+        _bulk_spent(item_bought="second", created_at="2026-01-10T10:00:00-03:00"),
+    ]
+
+    # Act
+    response = await test_client.post("/spents/bulk", json=payload)
+
+    # Assert
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 2
+    assert [item["item_bought"] for item in data["items"]] == ["item", "second"]
+    assert [error["index"] for error in data["errors"]] == [1, 2, 3]
+    assert "viagem" in data["errors"][0]["error"]
+    assert "amount" in data["errors"][1]["error"]
+    assert "nubank" in data["errors"][2]["error"]
+    mock_spent_repository.create_many.assert_awaited_once()
+
+    app.dependency_overrides.clear()
+
+
+async def test_create_spents_bulk_ndjson(test_client, mock_spent_repository, mocker):
+    """Test NDJSON bodies are parsed line by line and bad lines become row errors."""
+
+    # Arrange
+    async def override_get_db():
+        yield MagicMock()
+
+    app.dependency_overrides[get_db] = override_get_db
+    mocker.patch("finance_api.routers.spents.SpentRepository", return_value=mock_spent_repository)
+    mocker.patch("finance_api.services.spents.CategoryRepository").return_value.list_keys = (
+        AsyncMock(return_value={"mercado"})
+    )
+    mocker.patch("finance_api.services.spents.PaymentMethodRepository").return_value.list_keys = (
+        AsyncMock(return_value={"itau"})
+    )
+    mock_spent_repository.create_many = AsyncMock(
+        side_effect=lambda rows: [MagicMock(**row, installment_id=None) for row in rows]
+    )
+
+    body = "\n".join([json.dumps(_bulk_spent()), "{not json", "", json.dumps(_bulk_spent())])
+
+    # Act
+    response = await test_client.post(
+        "/spents/bulk", content=body, headers={"Content-Type": "application/x-ndjson"}
+    )
+
+    # Assert
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 2
+    assert data["errors"][0]["index"] == 1
+    inserted_rows = mock_spent_repository.create_many.call_args[0][0]
+    assert len(inserted_rows) == 2
+    assert all(row["created_at"] is not None and row["id"] for row in inserted_rows)
+
+    app.dependency_overrides.clear()
+
+
+async def test_create_spents_bulk_rejects_non_list(test_client, mock_spent_repository, mocker):
+    """Test a JSON body that is not an array is rejected with 422."""
+
+    # Arrange
+    async def override_get_db():
+        yield MagicMock()
+
+    app.dependency_overrides[get_db] = override_get_db
+    mocker.patch("finance_api.routers.spents.SpentRepository", return_value=mock_spent_repository)
+
+    # Act
+    response = await test_client.post("/spents/bulk", json=_bulk_spent())
+
+    # Assert
+    assert response.status_code == 422
+
+    app.dependency_overrides.clear()
+
+
+async def test_create_installment_series(test_client, mock_spent_repository, mocker):
+    """Test an installment purchase is written in one create_many call and returned whole."""
+
+    # Arrange
+    async def override_get_db():
+        yield MagicMock()
+
+    app.dependency_overrides[get_db] = override_get_db
+    mocker.patch("finance_api.routers.spents.SpentRepository", return_value=mock_spent_repository)
+    mock_spent_repository.create_many = AsyncMock(
+        side_effect=lambda rows: [MagicMock(**row) for row in rows]
+    )
+
+    payload = _bulk_spent(
+        is_installment=True,
+        current_installment=2,
+        total_installments=12,
+        created_at="2026-01-31T10:00:00-03:00",
+    )
+
+    # Act
+    response = await test_client.post("/spents/?return_series=true", json=payload)
+
+    # Assert
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["current_installment"] for item in data] == list(range(2, 13))
+    assert len({item["installment_id"] for item in data}) == 1
+    assert data[0]["created_at"].startswith("2026-01-31")
+    assert data[1]["created_at"].startswith("2026-02-28")
+    assert data[-1]["created_at"].startswith("2026-11-30")
+    mock_spent_repository.create_many.assert_awaited_once()
+    mock_spent_repository.create.assert_not_awaited()
+
+    # Without return_series only the first installment is returned
+    mock_spent_repository.create_many.reset_mock()
+    response = await test_client.post("/spents/", json=payload)
+    assert response.json()["current_installment"] == 2
+
+    app.dependency_overrides.clear()
+
+
+async def test_create_spents_bulk_ndjson_stops_reading_at_row_cap(
+    test_client, mock_spent_repository, mocker
+):
+    """Test NDJSON reading stops at BULK_MAX_ROWS instead of buffering the whole body."""
+
+    # Arrange
+    async def override_get_db():
+        yield MagicMock()
+
+    app.dependency_overrides[get_db] = override_get_db
+    mocker.patch("finance_api.routers.spents.SpentRepository", return_value=mock_spent_repository)
+    mocker.patch("finance_api.services.spents.BULK_MAX_ROWS", 2)
+    sent = []
+
+    async def body():
+        for _ in range(100):
+            sent.append(1)
+            yield (json.dumps(_bulk_spent()) + "\n").encode()
+
+    # Act
+    response = await test_client.post(
+        "/spents/bulk", content=body(), headers={"Content-Type": "application/x-ndjson"}
+    )
+
+    # Assert
+    assert response.status_code == 422
+    assert len(sent) < 100
+    mock_spent_repository.create_many.assert_not_awaited()
+
+    app.dependency_overrides.clear()
+
+
+async def test_create_spents_bulk_rejects_oversized_json_array(
+    test_client, mock_spent_repository, mocker
+):
+    """Test a JSON array body is capped at BULK_MAX_BYTES."""
+
+    # Arrange
+    async def override_get_db():
+        yield MagicMock()
+
+    app.dependency_overrides[get_db] = override_get_db
+    mocker.patch("finance_api.routers.spents.SpentRepository", return_value=mock_spent_repository)
+    mocker.patch("finance_api.services.spents.BULK_MAX_BYTES", 100)
+
+    # Act
+    response = await test_client.post("/spents/bulk", json=[_bulk_spent()] * 3)
+
+    # Assert
+    assert response.status_code == 422
+    assert "NDJSON" in response.text
+
+    app.dependency_overrides.clear()
+
+
+async def test_create_spents_bulk_documents_both_body_types(test_client):
+    """Test the OpenAPI schema declares the JSON and NDJSON request bodies."""
+    schema = (await test_client.get("/openapi.json")).json()
+
+    content = schema["paths"]["/spents/bulk"]["post"]["requestBody"]["content"]
+
+    assert set(content) == {"application/json", "application/x-ndjson"}
+    assert content["application/json"]["schema"]["items"]["$ref"].endswith("/SpentCreate")
+    assert "SpentCreate" in schema["components"]["schemas"]
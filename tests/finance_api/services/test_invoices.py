@@ -2,6 +2,7 @@ import pytest
 from datetime import date
 from unittest.mock import AsyncMock, MagicMock
 
+from finance_api.core.business_calendar import BusinessCalendar
 from finance_api.services.invoices import compute_real_date, InvoiceService
 
 
@@ -38,3 +39,93 @@ async def test_get_invoice_dates():
 
     assert start_d == date(2026, 9, 26)
     assert end_d == date(2026, 10, 26)
+
+
+@pytest.mark.asyncio
+async def test_get_invoice_periods_single_query():
+    repo = AsyncMock()
+    pm_repo = AsyncMock()
+    service = InvoiceService(repo, pm_repo)
+
+    nubank = MagicMock(is_credit_card=True, closing_day=25, key="nubank")
+    itau = MagicMock(is_credit_card=True, closing_day=25, key="itau")
+    pix = MagicMock(is_credit_card=False, closing_day=None, key="pix")
+
+    # Only nubank has a manually adjusted closing date for October.
+    repo.list_by_months.return_value = [
+        MagicMock(
+            payment_method_key="nubank",
+            reference_month="2026-10",
+            real_closing_date=date(2026, 10, 28),
+        )
+    ]
+
+    periods = await service.get_invoice_periods([nubank, itau, pix], "2026-10")
+
+    repo.list_by_months.assert_awaited_once_with(["2026-10", "2026-09"])
+    repo.get_by_payment_method_and_month.assert_not_awaited()
+    assert periods == {
+        "nubank": (date(2026, 9, 26), date(2026, 10, 28)),
+        "itau": (date(2026, 9, 26), date(2026, 10, 26)),
+        "pix": (date(2026, 10, 1), date(2026, 10, 31)),
+    }
+
+
+def test_business_calendar_next_business_day():
+    cal = BusinessCalendar(today=date(2026, 1, 1))
+
+    # Friday stays, Saturday/Sunday roll to Monday.
+    assert cal.next_business_day(date(2026, 9, 25)) == date(2026, 9, 25)
+    assert cal.next_business_day(date(2026, 10, 25)) == date(2026, 10, 26)
+    # Finados (Mon 02/11/2026) is skipped together with the weekend.
+    assert cal.next_business_day(date(2026, 11, 1)) == date(2026, 11, 3)
+    assert not cal.is_business_day(date(2026, 11, 2))
+
+
+def test_business_calendar_extra_holidays_and_window_extension():
+    # 25/01/2027 (Monday) is the São Paulo city anniversary, configured as a municipal holiday.
+    cal = BusinessCalendar(
+        extra_holidays=[date(2027, 1, 25)], years_back=0, years_ahead=0, today=date(2026, 1, 1)
+    )
+
+    assert cal.next_business_day(date(2027, 1, 23)) == date(2027, 1, 26)
+    # Dates before the precomputed window extend it on demand.
+    assert cal.next_business_day(date(2020, 12, 25)) == date(2020, 12, 28)
+    assert cal.start_year == 2020
+
+
+@pytest.mark.asyncio
+async def test_list_year_previews():
+    repo = AsyncMock()
+    pm_repo = AsyncMock()
+    service = InvoiceService(repo, pm_repo)
+
+    nubank = MagicMock(is_credit_card=True, closing_day=25, due_day=5, key="nubank")
+    pix = MagicMock(is_credit_card=False, closing_day=None, due_day=None, key="pix")
+    pm_repo.list.return_value = ([nubank, pix], None)
+    repo.list_by_months.return_value = []
+
+    previews = await service.list_year_previews(2026)
+
+    repo.list_by_months.assert_awaited_once()
+    assert len(repo.list_by_months.call_args[0][0]) == 12
+    assert [p.reference_month for p in previews] == [f"2026-{m:02d}" for m in range(1, 13)]
+    assert all(p.payment_method_key == "nubank" for p in previews)
+    assert previews[9].real_closing_date == date(2026, 10, 26)
+
+
+@pytest.mark.asyncio
+async def test_get_billing_periods():
+    repo = AsyncMock()
+    pm_repo = AsyncMock()
+    service = InvoiceService(repo, pm_repo)
+
+    civil = await service.get_billing_periods("2026-02", "CIVIL_MONTH")
+    assert civil == [(None, date(2026, 2, 1), date(2026, 2, 28))]
+    pm_repo.list.assert_not_awaited()
+
+    pix = MagicMock(is_credit_card=False, closing_day=None, key="pix")
+    pm_repo.list.return_value = ([pix], None)
+    repo.list_by_months.return_value = []
+    invoices = await service.get_billing_periods("2026-02", "INVOICES")
+    assert invoices == [("pix", date(2026, 2, 1), date(2026, 2, 28))]
@@ -0,0 +1,74 @@
+import httpx
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from telegram_api.core.http_client import send_audio_to_agent, send_message_to_agent
+
+
+def _response(status_code: int, body: dict | None = None) -> httpx.Response:
+    request = httpx.Request("POST", "http://agent/chat")
+    return httpx.Response(status_code, json=body or {}, request=request)
+
+
+@pytest.mark.asyncio
+async def test_gone_session_is_replaced_by_a_new_one():
+    responses = iter(
+        [
+            _response(404, {"detail": "Session not found"}),
+            _response(200, {"response": "Oi!", "session_id": "new-session"}),
+        ]
+    )
+    payloads = []
+
+    async def post(url, json):
+        payloads.append(dict(json))
+        return next(responses)
+
+    client = MagicMock()
+    client.post = post
+
+    with patch("telegram_api.core.http_client.get_http_client", return_value=client):
+        data = await send_message_to_agent("oi", session_id="old-session")
+
+    assert data["session_id"] == "new-session"
+    assert payloads[0]["session_id"] == "old-session"
+    assert "session_id" not in payloads[1]
+
+
+@pytest.mark.asyncio
+async def test_not_found_without_session_is_raised():
+    client = MagicMock()
+    client.post = AsyncMock(return_value=_response(404))
+
+    with (
+        patch("telegram_api.core.http_client.get_http_client", return_value=client),
+        patch("telegram_api.core.http_client.asyncio.sleep", new=AsyncMock()),
+        pytest.raises(httpx.HTTPStatusError),
+    ):
+        await send_message_to_agent("oi")
+
+    assert client.post.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_audio_stream_rejected_session_is_replaced_by_a_new_one():
+    events = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        gone = b'name="session_id"' in request.read()
+        events.append(gone)
+        body = (
+            '{"type": "error", "status": 404, "detail": "Session not found"}\n'
+            if gone
+            else '{"type": "result", "response": "Oi!", "session_id": "new-session"}\n'
+        )
+        return httpx.Response(200, text=body)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with patch("telegram_api.core.http_client.get_http_client", return_value=client):
+        data = await send_audio_to_agent(
+            b"audio", "a.ogg", "audio/ogg", session_id="old-session", on_partial=AsyncMock()
+        )
+
+    assert data == {"response": "Oi!", "session_id": "new-session"}
+    assert events == [True, False]
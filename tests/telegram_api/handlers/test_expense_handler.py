@@ -265,3 +265,26 @@ async def test_cancel(mock_update, mock_context):
     assert state == ConversationHandler.END
     assert "expense" not in mock_context.user_data
     mock_update.message.reply_text.assert_called_once_with("Registro cancelado.")
+
+
+@pytest.mark.asyncio
+@patch("telegram_api.handlers.expense_handler.save_spent")
+async def test_confirm_expense_parcelada_returns_series(mock_save_spent, mock_update, mock_context):
+    mock_context.user_data["expense"] = {
+        "purchase_type": "parcelada",
+        "item_bought": "tv",
+        "category": "cat",
+        "amount": 100,
+        "current_installment": 1,
+        "total_installments": 3,
+    }
+    mock_update.callback_query.data = "confirm"
+    mock_save_spent.return_value = [{"id": "1"}, {"id": "2"}, {"id": "3"}]
+
+    state = await confirm_expense(mock_update, mock_context)
+
+    assert state == ConversationHandler.END
+    assert mock_save_spent.call_args.kwargs["return_series"] is True
+    assert mock_save_spent.call_args.args[0]["is_installment"] is True
+    text = mock_update.callback_query.edit_message_text.call_args.kwargs["text"]
+    assert "3 parcela(s)" in text